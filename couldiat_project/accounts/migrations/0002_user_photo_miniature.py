@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='photo_miniature',
+            field=models.ImageField(blank=True, editable=False, help_text='Générée par la normalisation des images', null=True, upload_to='users/photos/miniatures/', verbose_name='miniature de la photo'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 07:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_photo_miniature'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='photo_refusee',
+            field=models.CharField(blank=True, default='', editable=False, help_text="Fichier refusé par la normalisation des images, qui n'est plus retraité", max_length=255, verbose_name='photo refusée'),
+        ),
+    ]
@@ -50,6 +50,22 @@ class User(AbstractUser):
         null=True,
         blank=True
     )
+    photo_miniature = models.ImageField(
+        _('miniature de la photo'),
+        upload_to='users/photos/miniatures/',
+        null=True,
+        blank=True,
+        editable=False,
+        help_text=_("Générée par la normalisation des images")
+    )
+    photo_refusee = models.CharField(
+        _('photo refusée'),
+        max_length=255,
+        blank=True,
+        default='',
+        editable=False,
+        help_text=_("Fichier refusé par la normalisation des images, qui n'est plus retraité")
+    )
     is_admin = models.BooleanField(
         _('statut administrateur'),
         default=False,
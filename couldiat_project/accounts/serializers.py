@@ -20,6 +20,7 @@ class UserSerializer(serializers.ModelSerializer):
             'prenom',
             'telephone',
             'photo',
+            'photo_miniature',
             'is_admin',
             'created_at',
         ]
@@ -0,0 +1,16 @@
+"""
+Signaux pour l'application Accounts
+"""
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from core.images import planifier_normalisation
+from .models import User
+
+
+@receiver(post_save, sender=User)
+def normaliser_photo_profil(sender, instance, update_fields=None, **kwargs):
+    """Normaliser la photo de profil en arrière-plan"""
+    planifier_normalisation(
+        instance, 'photo', 'photo_miniature', champ_refus='photo_refusee', update_fields=update_fields
+    )
@@ -1,3 +1,10 @@
 from django.contrib import admin
+from .models import StatistiqueJournaliere
 
-# Register your models here.
+
+@admin.register(StatistiqueJournaliere)
+class StatistiqueJournaliereAdmin(admin.ModelAdmin):
+    list_display = ['jour', 'concours', 'ville', 'inscriptions', 'inscriptions_confirmees', 'paiements_valides', 'revenus']
+    list_filter = ['concours', 'ville']
+    date_hierarchy = 'jour'
+    list_select_related = ['concours']
@@ -0,0 +1,186 @@
+"""
+Agrégation incrémentale des statistiques journalières
+
+À chaque passage, les couples (jour, concours) touchés par des inscriptions
+ou paiements modifiés depuis le curseur sont recalculés depuis les lignes
+brutes, puis le curseur avance. Le coût d'un passage dépend du volume de
+modifications, pas de la taille des tables.
+
+Limites : une suppression de ligne ne modifie pas `updated_at` et n'est
+prise en compte qu'au prochain recalcul complet (`--complet`).
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from concours.models import Inscription, Paiement
+from .models import CurseurAgregation, StatistiqueJournaliere
+
+NOM_CURSEUR = 'statistiques_journalieres'
+
+# Les transactions encore ouvertes peuvent écrire un updated_at antérieur
+# à leur commit : on ne traite que les lignes plus anciennes que cette marge.
+MARGE = timedelta(minutes=1)
+
+# Nombre de jours par requête de recalcul incrémental
+TAILLE_LOT_JOURS = 100
+
+CHAMPS = [
+    'inscriptions',
+    'inscriptions_confirmees',
+    'inscriptions_annulees',
+    'paiements',
+    'paiements_valides',
+    'revenus',
+]
+
+
+def _jours_concours_touches(depuis, jusqua):
+    """Couples (jour, concours_id) touchés par les lignes modifiées"""
+    touches = set(
+        Inscription.objects.filter(updated_at__gt=depuis, updated_at__lte=jusqua)
+        .annotate(jour=TruncDate('created_at'))
+        .values_list('jour', 'concours_id')
+        .distinct()
+    )
+    touches |= set(
+        Paiement.objects.filter(updated_at__gt=depuis, updated_at__lte=jusqua)
+        .annotate(jour=TruncDate('created_at'))
+        .values_list('jour', 'inscription__concours_id')
+        .distinct()
+    )
+    return touches
+
+
+def _lots_par_jour(touches):
+    """
+    Regrouper les couples (jour, concours_id) par jour, en lots de
+    TAILLE_LOT_JOURS jours
+    
+    Yields:
+        dict {jour: {concours_id}}
+    """
+    par_jour = {}
+    for jour, concours_id in touches:
+        par_jour.setdefault(jour, set()).add(concours_id)
+    
+    jours = sorted(par_jour)
+    for i in range(0, len(jours), TAILLE_LOT_JOURS):
+        yield {jour: par_jour[jour] for jour in jours[i:i + TAILLE_LOT_JOURS]}
+
+
+def _filtre_lignes(lot, champ_concours):
+    """
+    Lignes brutes créées exactement dans les couples du lot : un intervalle
+    created_at (indexable) par jour, restreint aux concours de ce jour
+    """
+    filtre = Q()
+    for jour, concours_ids in lot.items():
+        filtre |= Q(
+            created_at__gte=timezone.make_aware(datetime.combine(jour, time.min)),
+            created_at__lt=timezone.make_aware(datetime.combine(jour + timedelta(days=1), time.min)),
+            **{f'{champ_concours}__in': concours_ids}
+        )
+    return filtre
+
+
+def _calculer(lot=None):
+    """
+    Agrégats depuis les lignes brutes, pour les couples d'un lot de
+    `_lots_par_jour` (tous si None)
+    
+    Returns:
+        dict {(jour, concours_id, ville): {champ: valeur}}
+    """
+    inscriptions = Inscription.objects.all()
+    paiements = Paiement.objects.all()
+    
+    if lot is not None:
+        inscriptions = inscriptions.filter(_filtre_lignes(lot, 'concours_id'))
+        paiements = paiements.filter(_filtre_lignes(lot, 'inscription__concours_id'))
+    
+    resultats = {}
+    
+    lignes = inscriptions.annotate(jour=TruncDate('created_at')).values(
+        'jour', 'concours_id', 'ville'
+    ).annotate(
+        total=Count('id'),
+        confirmees=Count('id', filter=Q(statut='confirmee')),
+        annulees=Count('id', filter=Q(statut='annulee')),
+    ).order_by()
+    
+    for ligne in lignes:
+        valeurs = resultats.setdefault(
+            (ligne['jour'], ligne['concours_id'], ligne['ville']), dict.fromkeys(CHAMPS, 0)
+        )
+        valeurs['inscriptions'] = ligne['total']
+        valeurs['inscriptions_confirmees'] = ligne['confirmees']
+        valeurs['inscriptions_annulees'] = ligne['annulees']
+    
+    lignes = paiements.annotate(
+        jour=TruncDate('created_at'),
+        concours_id=F('inscription__concours_id'),
+        ville=F('inscription__ville'),
+    ).values('jour', 'concours_id', 'ville').annotate(
+        total=Count('id'),
+        valides=Count('id', filter=Q(statut='valide')),
+        revenus=Coalesce(Sum('montant', filter=Q(statut='valide')), 0),
+    ).order_by()
+    
+    for ligne in lignes:
+        valeurs = resultats.setdefault(
+            (ligne['jour'], ligne['concours_id'], ligne['ville']), dict.fromkeys(CHAMPS, 0)
+        )
+        valeurs['paiements'] = ligne['total']
+        valeurs['paiements_valides'] = ligne['valides']
+        valeurs['revenus'] = ligne['revenus']
+    
+    return resultats
+
+
+def agreger_statistiques(complet=False):
+    """
+    Mettre à jour les statistiques journalières
+    
+    Args:
+        complet: Tout recalculer au lieu de partir du curseur
+    
+    Returns:
+        Nombre de lignes d'agrégat écrites
+    """
+    jusqua = timezone.now() - MARGE
+    
+    with transaction.atomic():
+        # Le verrou sur le curseur empêche deux passages simultanés
+        curseur, cree = CurseurAgregation.objects.select_for_update().get_or_create(
+            nom=NOM_CURSEUR,
+            defaults={'derniere_modification': jusqua}
+        )
+        
+        if complet or cree:
+            StatistiqueJournaliere.objects.all().delete()
+            resultats = _calculer()
+        else:
+            # Seuls les couples touchés sont recalculés, pas le produit
+            # de leurs jours et de leurs concours
+            touches = _jours_concours_touches(curseur.derniere_modification, jusqua)
+            resultats = {}
+            for lot in _lots_par_jour(touches):
+                filtre = Q()
+                for jour, concours_ids in lot.items():
+                    filtre |= Q(jour=jour, concours_id__in=concours_ids)
+                StatistiqueJournaliere.objects.filter(filtre).delete()
+                resultats.update(_calculer(lot))
+        
+        StatistiqueJournaliere.objects.bulk_create([
+            StatistiqueJournaliere(jour=jour, concours_id=concours_id, ville=ville, **valeurs)
+            for (jour, concours_id, ville), valeurs in resultats.items()
+        ], batch_size=1000)
+        
+        curseur.derniere_modification = jusqua
+        curseur.save(update_fields=['derniere_modification'])
+    
+    return len(resultats)
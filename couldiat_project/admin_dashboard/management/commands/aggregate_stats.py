@@ -0,0 +1,23 @@
+"""
+Commande pour mettre à jour les statistiques journalières du dashboard
+Usage: python manage.py aggregate_stats [--complet]
+
+À lancer périodiquement (cron, toutes les 5 minutes par exemple).
+"""
+from django.core.management.base import BaseCommand
+from admin_dashboard.agregation import agreger_statistiques
+
+
+class Command(BaseCommand):
+    help = 'Agréger les inscriptions et paiements modifiés depuis le dernier passage'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--complet',
+            action='store_true',
+            help='Tout recalculer (prend en compte les suppressions)'
+        )
+    
+    def handle(self, *args, **options):
+        total = agreger_statistiques(complet=options['complet'])
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} lignes de statistiques mises à jour'))
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('concours', '0010_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CurseurAgregation',
+            fields=[
+                ('nom', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='nom')),
+                ('derniere_modification', models.DateTimeField(verbose_name='dernière modification traitée')),
+            ],
+            options={
+                'verbose_name': "curseur d'agrégation",
+                'verbose_name_plural': "curseurs d'agrégation",
+            },
+        ),
+        migrations.CreateModel(
+            name='StatistiqueJournaliere',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jour', models.DateField(verbose_name='jour')),
+                ('ville', models.CharField(max_length=100, verbose_name='ville')),
+                ('inscriptions', models.PositiveIntegerField(default=0, verbose_name='inscriptions')),
+                ('inscriptions_confirmees', models.PositiveIntegerField(default=0, verbose_name='inscriptions confirmées')),
+                ('inscriptions_annulees', models.PositiveIntegerField(default=0, verbose_name='inscriptions annulées')),
+                ('paiements', models.PositiveIntegerField(default=0, verbose_name='paiements soumis')),
+                ('paiements_valides', models.PositiveIntegerField(default=0, verbose_name='paiements validés')),
+                ('revenus', models.PositiveBigIntegerField(default=0, help_text='Paiements validés, en FCFA', verbose_name='revenus')),
+                ('concours', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='statistiques_journalieres', to='concours.concours', verbose_name='concours')),
+            ],
+            options={
+                'verbose_name': 'statistique journalière',
+                'verbose_name_plural': 'statistiques journalières',
+                'ordering': ['jour'],
+                'indexes': [models.Index(fields=['jour'], name='statistique_jour_idx'), models.Index(fields=['concours', 'jour'], name='statistique_concours_jour_idx')],
+                'constraints': [models.UniqueConstraint(fields=('jour', 'concours', 'ville'), name='statistique_jour_concours_ville')],
+            },
+        ),
+    ]
@@ -1,3 +1,61 @@
+"""
+Modèles pour l'Admin Dashboard
+"""
 from django.db import models
+from django.utils.translation import gettext_lazy as _
 
-# Create your models here.
+
+class StatistiqueJournaliere(models.Model):
+    """
+    Agrégat journalier des inscriptions et paiements par concours et ville
+    
+    Maintenu de façon incrémentale par la commande `aggregate_stats` : seuls
+    les jours touchés par des lignes modifiées depuis le dernier passage
+    sont recalculés. Les inscriptions sont comptées au jour de leur création,
+    les paiements au jour de leur soumission.
+    """
+    
+    jour = models.DateField(_('jour'))
+    concours = models.ForeignKey(
+        'concours.Concours',
+        on_delete=models.CASCADE,
+        related_name='statistiques_journalieres',
+        verbose_name=_('concours')
+    )
+    ville = models.CharField(_('ville'), max_length=100)
+    
+    inscriptions = models.PositiveIntegerField(_('inscriptions'), default=0)
+    inscriptions_confirmees = models.PositiveIntegerField(_('inscriptions confirmées'), default=0)
+    inscriptions_annulees = models.PositiveIntegerField(_('inscriptions annulées'), default=0)
+    paiements = models.PositiveIntegerField(_('paiements soumis'), default=0)
+    paiements_valides = models.PositiveIntegerField(_('paiements validés'), default=0)
+    revenus = models.PositiveBigIntegerField(_('revenus'), default=0, help_text=_("Paiements validés, en FCFA"))
+    
+    class Meta:
+        verbose_name = _('statistique journalière')
+        verbose_name_plural = _('statistiques journalières')
+        ordering = ['jour']
+        constraints = [
+            models.UniqueConstraint(fields=['jour', 'concours', 'ville'], name='statistique_jour_concours_ville'),
+        ]
+        indexes = [
+            models.Index(fields=['jour'], name='statistique_jour_idx'),
+            models.Index(fields=['concours', 'jour'], name='statistique_concours_jour_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.jour} - {self.concours_id} - {self.ville}"
+
+
+class CurseurAgregation(models.Model):
+    """Dernière date de modification des lignes déjà agrégées"""
+    
+    nom = models.CharField(_('nom'), max_length=50, primary_key=True)
+    derniere_modification = models.DateTimeField(_('dernière modification traitée'))
+    
+    class Meta:
+        verbose_name = _('curseur d\'agrégation')
+        verbose_name_plural = _('curseurs d\'agrégation')
+    
+    def __str__(self):
+        return f"{self.nom} ({self.derniere_modification})"
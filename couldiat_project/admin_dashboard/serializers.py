@@ -0,0 +1,94 @@
+"""
+Serializers pour l'Admin Dashboard
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import serializers
+
+from concours.models import Paiement
+from concours.rapprochement import FENETRE_JOURS
+
+# Nombre maximum d'éléments traités par requête en lot
+TAILLE_MAX_LOT = 5000
+
+
+class ValidationEnLotSerializer(serializers.Serializer):
+    """Action appliquée à une liste d'id"""
+    ACTIONS = []
+    
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=TAILLE_MAX_LOT
+    )
+    action = serializers.CharField()
+    raison_rejet = serializers.CharField(required=False, allow_blank=True)
+    
+    def validate_action(self, value):
+        if value not in self.ACTIONS:
+            raise serializers.ValidationError(
+                f'Action invalide. Utilisez {" ou ".join(repr(a) for a in self.ACTIONS)}'
+            )
+        return value
+    
+    def validate_ids(self, value):
+        # Dédoublonner en conservant l'ordre de la requête
+        return list(dict.fromkeys(value))
+    
+    def validate(self, attrs):
+        if attrs['action'] == 'rejeter' and not attrs.get('raison_rejet'):
+            raise serializers.ValidationError({
+                'raison_rejet': 'La raison du rejet est obligatoire'
+            })
+        return attrs
+
+
+class ValidationInscriptionsSerializer(ValidationEnLotSerializer):
+    """Confirmation ou rejet d'inscriptions en lot"""
+    ACTIONS = ['confirmer', 'rejeter']
+
+
+class ValidationPaiementsSerializer(ValidationEnLotSerializer):
+    """Validation ou rejet de paiements en lot"""
+    ACTIONS = ['valider', 'rejeter']
+
+
+class ReservationSerializer(serializers.Serializer):
+    """Réservation des prochains éléments de la file de revue"""
+    taille = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+
+
+class RapprochementSerializer(serializers.Serializer):
+    """Relevé d'opérateur à rapprocher avec les paiements en attente"""
+    fichier = serializers.FileField()
+    operateur = serializers.ChoiceField(choices=Paiement.METHODE_CHOICES)
+    fenetre_jours = serializers.IntegerField(min_value=0, max_value=30, default=FENETRE_JOURS)
+    simulation = serializers.BooleanField(default=False)
+
+
+class SerieTemporelleSerializer(serializers.Serializer):
+    """Paramètres de la série temporelle des statistiques journalières"""
+    # Nombre maximum de jours par requête
+    JOURS_MAX = 366
+    
+    debut = serializers.DateField(required=False)
+    fin = serializers.DateField(required=False)
+    concours = serializers.IntegerField(min_value=1, required=False)
+    ville = serializers.CharField(required=False)
+    grouper = serializers.ChoiceField(choices=['concours', 'ville'], required=False)
+    
+    def validate(self, attrs):
+        fin = attrs.setdefault('fin', timezone.localdate())
+        debut = attrs.setdefault('debut', fin - timedelta(days=29))
+        
+        if debut > fin:
+            raise serializers.ValidationError({
+                'debut': 'La date de début doit précéder la date de fin'
+            })
+        if (fin - debut).days >= self.JOURS_MAX:
+            raise serializers.ValidationError({
+                'debut': f'La période est limitée à {self.JOURS_MAX} jours'
+            })
+        return attrs
@@ -0,0 +1,93 @@
+"""
+Statistiques du dashboard admin
+
+Les compteurs sont calculés en une requête d'agrégation conditionnelle par
+table et conservés dans le cache partagé. Un instantané périmé est servi
+immédiatement pendant qu'un seul thread le recalcule en arrière-plan : le
+coût d'un affichage ne dépend ni de la taille des tables ni du nombre
+d'administrateurs connectés.
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from accounts.models import User
+from concours.models import Concours, Inscription, Paiement
+
+CLE_INSTANTANE = 'admin_dashboard:stats'
+CLE_RAFRAICHISSEMENT = 'admin_dashboard:stats:rafraichissement'
+
+# Âge au-delà duquel l'instantané est recalculé (en secondes)
+FRAICHEUR = 30
+# Durée de conservation d'un instantané périmé, servi pendant le recalcul
+CONSERVATION = 10 * 60
+
+
+def calculer_statistiques():
+    """Compteurs du dashboard : une requête par table"""
+    today = timezone.now().date()
+    
+    inscriptions = Inscription.objects.aggregate(
+        inscriptions_du_jour=Count('id', filter=Q(created_at__date=today)),
+        inscriptions_en_attente=Count('id', filter=Q(statut='en_attente')),
+        inscriptions_confirmees=Count('id', filter=Q(statut='confirmee')),
+    )
+    paiements = Paiement.objects.aggregate(
+        paiements_en_attente=Count('id', filter=Q(statut='en_attente')),
+        paiements_valides=Count('id', filter=Q(statut='valide')),
+    )
+    candidats = User.objects.filter(is_admin=False).aggregate(
+        candidats_actifs=Count('id', filter=Q(is_active=True)),
+        nouveaux_candidats_semaine=Count(
+            'id', filter=Q(created_at__gte=today - timedelta(days=7))
+        ),
+    )
+    concours = Concours.objects.aggregate(
+        concours_ouverts=Count('id', filter=Q(est_ouvert=True)),
+        concours_total=Count('id'),
+    )
+    
+    return {**inscriptions, **paiements, **candidats, **concours}
+
+
+def rafraichir_statistiques():
+    """Recalculer et enregistrer l'instantané"""
+    instantane = {
+        'stats': calculer_statistiques(),
+        'calcule_le': time.time(),
+    }
+    cache.set(CLE_INSTANTANE, instantane, CONSERVATION)
+    return instantane
+
+
+def _rafraichir_en_arriere_plan():
+    try:
+        rafraichir_statistiques()
+    finally:
+        cache.delete(CLE_RAFRAICHISSEMENT)
+        connection.close()
+
+
+def obtenir_statistiques():
+    """
+    Statistiques du dashboard depuis l'instantané en cache
+    
+    Returns:
+        (stats, date du calcul)
+    """
+    instantane = cache.get(CLE_INSTANTANE)
+    
+    if instantane is None:
+        instantane = rafraichir_statistiques()
+    elif time.time() - instantane['calcule_le'] > FRAICHEUR:
+        # cache.add() est atomique : un seul recalcul à la fois
+        if cache.add(CLE_RAFRAICHISSEMENT, True, FRAICHEUR):
+            threading.Thread(target=_rafraichir_en_arriere_plan, daemon=True).start()
+    
+    calcule_le = datetime.fromtimestamp(instantane['calcule_le'], tz=dt_timezone.utc)
+    return instantane['stats'], calcule_le
@@ -1,3 +1,791 @@
-from django.test import TestCase
+"""
+Tests pour l'Admin Dashboard
+"""
+import asyncio
+import csv
+import io
+import json
+import tempfile
+import itertools
+import threading
+import time
+import warnings
+from datetime import timedelta
+from unittest import mock
+import zipfile
+from xml.etree import ElementTree
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from concours.models import Concours, Inscription, Paiement
+from core.evenements import RESYNCHRONISER, TAILLE_FILE, LocalBroker
+from concours.evenements import CANAL_REVUE
+from concours.tests import creer_concours, creer_inscription, creer_utilisateur
+from .agregation import agreger_statistiques
+from .models import StatistiqueJournaliere
+from .stats import CLE_INSTANTANE, FRAICHEUR, _rafraichir_en_arriere_plan, rafraichir_statistiques
+
+
+class ExportInscriptionsTests(APITestCase):
+    """Export en flux des inscriptions d'un concours"""
+
+    def setUp(self):
+        self.admin = creer_utilisateur(email='admin@example.com', is_admin=True)
+        self.concours = creer_concours()
+        autre_concours = creer_concours(nom='Autre concours')
+
+        self.inscription = creer_inscription(creer_utilisateur(), self.concours)
+        self.inscription.confirmer()
+        Paiement.objects.create(
+            inscription=self.inscription,
+            methode_paiement='orange_money',
+            reference_transaction='OM123',
+            montant=5000,
+            capture_ecran='paiements/preuves/preuve.jpg',
+            statut='valide',
+        )
+        creer_inscription(
+            creer_utilisateur(email='formule@example.com'), self.concours, nom='=HYPERLINK("x")'
+        )
+        creer_inscription(creer_utilisateur(email='ailleurs@example.com'), autre_concours)
+
+        self.client.force_authenticate(self.admin)
+        self.url = reverse('admin_dashboard:export_inscriptions', args=[self.concours.pk])
+
+    def test_export_csv(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        contenu = b''.join(response.streaming_content).decode('utf-8-sig')
+        lignes = list(csv.reader(io.StringIO(contenu), delimiter=';'))
+
+        self.assertEqual(lignes[0][0], 'N° inscription')
+        self.assertEqual(len(lignes), 3)
+        self.assertEqual(lignes[1][0], self.inscription.numero_inscription)
+        self.assertEqual(lignes[1][8:10], ['Confirmée', 'Validé'])
+        # Pas de formule exécutable dans le tableur
+        self.assertEqual(lignes[2][1], '\'=HYPERLINK("x")')
+
+    def test_export_xlsx(self):
+        response = self.client.get(self.url, {'fichier': 'xlsx', 'statut': 'confirmee'})
+
+        self.assertEqual(response.status_code, 200)
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertIsNone(archive.testzip())
+
+        feuille = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+        ns = {'s': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+        lignes = feuille.findall('s:sheetData/s:row', ns)
+        self.assertEqual(len(lignes), 2)
+        self.assertEqual(
+            lignes[1].find('s:c/s:is/s:t', ns).text, self.inscription.numero_inscription
+        )
+
+    async def test_export_sous_asgi(self):
+        jeton = await sync_to_async(AccessToken.for_user)(self.admin)
+        response = await self.async_client.get(self.url, headers={'Authorization': f'Bearer {jeton}'})
+
+        self.assertEqual(response.status_code, 200)
+        # Itérateur asynchrone : pas de lecture complète avant l'envoi
+        self.assertTrue(response.is_async)
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            morceaux = [morceau async for morceau in response]
+
+        lignes = list(csv.reader(io.StringIO(b''.join(morceaux).decode('utf-8-sig')), delimiter=';'))
+        self.assertEqual(len(lignes), 3)
+        self.assertEqual(lignes[1][0], self.inscription.numero_inscription)
+
+    def test_format_invalide_et_acces(self):
+        self.assertEqual(self.client.get(self.url, {'fichier': 'pdf'}).status_code, 400)
+
+        self.client.force_authenticate(creer_utilisateur(email='candidat2@example.com'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class ValidationEnLotTests(APITestCase):
+    """Validation de listes d'inscriptions et de paiements en une transaction"""
+
+    def setUp(self):
+        self.client.force_authenticate(creer_utilisateur(email='admin@example.com', is_admin=True))
+        self.url = reverse('admin_dashboard:valider_inscriptions_en_lot')
+        self.compteur = itertools.count()
+
+    def _inscriptions(self, concours, nombre):
+        return [
+            creer_inscription(
+                creer_utilisateur(email=f'candidat{next(self.compteur)}@example.com'), concours
+            )
+            for _ in range(nombre)
+        ]
+
+    def test_confirmation_en_lot(self):
+        petit = creer_concours(places_disponibles=2)
+        grand = creer_concours(nom='Grand concours')
+        a, b, c = self._inscriptions(petit, 3)
+        d, = self._inscriptions(grand, 1)
+        d.confirmer()
+        e, = self._inscriptions(grand, 1)
+
+        response = self.client.post(self.url, {
+            'ids': [c.pk, a.pk, b.pk, d.pk, e.pk, 999999],
+            'action': 'confirmer',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        resultats = {ligne['id']: ligne for ligne in response.data['resultats']}
+        # Les places vont aux plus anciennes inscriptions du concours
+        self.assertEqual(resultats[a.pk]['resultat'], 'confirmee')
+        self.assertEqual(resultats[b.pk]['resultat'], 'confirmee')
+        self.assertEqual(resultats[c.pk], {'id': c.pk, 'resultat': 'complet'})
+        self.assertEqual(resultats[d.pk]['resultat'], 'deja_confirmee')
+        self.assertEqual(resultats[e.pk]['resultat'], 'confirmee')
+        self.assertEqual(resultats[999999]['resultat'], 'introuvable')
+        self.assertEqual(response.data['traites'], 5)
+
+        numeros = [resultats[pk]['numero_inscription'] for pk in (a.pk, b.pk, e.pk)]
+        self.assertEqual(len(set(numeros)), 3)
+        self.assertEqual(
+            sorted(Inscription.objects.filter(statut='confirmee').values_list('numero_inscription', flat=True)),
+            sorted(numeros + [Inscription.objects.get(pk=d.pk).numero_inscription])
+        )
+        self.assertEqual(Concours.objects.get(pk=petit.pk).inscrits_confirmes, 2)
+        self.assertEqual(Concours.objects.get(pk=grand.pk).inscrits_confirmes, 2)
+
+    def test_nombre_de_requetes_constant(self):
+        concours = creer_concours()
+        # Première confirmation de l'année : création de la séquence
+        self._inscriptions(concours, 1)[0].confirmer()
+        petit_lot = [i.pk for i in self._inscriptions(concours, 3)]
+        grand_lot = [i.pk for i in self._inscriptions(creer_concours(nom='Autre'), 30)]
+
+        with CaptureQueriesContext(connection) as petit:
+            self.client.post(self.url, {'ids': petit_lot, 'action': 'confirmer'}, format='json')
+        with CaptureQueriesContext(connection) as grand:
+            self.client.post(self.url, {'ids': grand_lot, 'action': 'confirmer'}, format='json')
+
+        self.assertEqual(len(petit), len(grand))
+
+    def test_rejet_en_lot_libere_les_places(self):
+        concours = creer_concours()
+        inscriptions = self._inscriptions(concours, 3)
+        inscriptions[0].confirmer()
+        ids = [i.pk for i in inscriptions]
+
+        sans_raison = self.client.post(self.url, {'ids': ids, 'action': 'rejeter'}, format='json')
+        response = self.client.post(
+            self.url, {'ids': ids, 'action': 'rejeter', 'raison_rejet': 'Dossier incomplet'},
+            format='json'
+        )
+
+        self.assertEqual(sans_raison.status_code, 400)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Inscription.objects.filter(statut='annulee').count(), 3)
+        self.assertEqual(Concours.objects.get(pk=concours.pk).inscrits_confirmes, 0)
+
+    def test_paiements_en_lot(self):
+        concours = creer_concours()
+        paiements = [
+            Paiement.objects.create(
+                inscription=inscription,
+                methode_paiement='moov_money',
+                reference_transaction=f'MM{inscription.pk}',
+                montant=5000,
+                capture_ecran='paiements/preuves/preuve.jpg',
+            )
+            for inscription in self._inscriptions(concours, 2)
+        ]
+
+        response = self.client.post(reverse('admin_dashboard:valider_paiements_en_lot'), {
+            'ids': [p.pk for p in paiements] + [999999],
+            'action': 'valider',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['traites'], 2)
+        self.assertEqual(response.data['resultats'][-1], {'id': 999999, 'resultat': 'introuvable'})
+        self.assertEqual(Paiement.objects.filter(statut='valide').count(), 2)
+
+    def test_paiement_rejete_avec_reference_reprise(self):
+        concours = creer_concours()
+        rejete, reprise, autre = [
+            Paiement.objects.create(
+                inscription=inscription,
+                methode_paiement='orange_money',
+                reference_transaction=reference,
+                montant=5000,
+                capture_ecran='paiements/preuves/preuve.jpg',
+                statut='rejete',
+            )
+            for inscription, reference in zip(self._inscriptions(concours, 3), ['OM1', 'OM1', 'OM2'])
+        ]
+        reprise.statut = 'en_attente'
+        reprise.save()
+
+        # La référence sert désormais à un autre paiement : pas de 500
+        response = self.client.patch(
+            reverse('admin_dashboard:valider_paiement', args=[rejete.pk]), {'action': 'valider'}, format='json'
+        )
+        self.assertEqual(response.status_code, 409)
+
+        response = self.client.post(reverse('admin_dashboard:valider_paiements_en_lot'), {
+            'ids': [rejete.pk, autre.pk],
+            'action': 'valider',
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['resultats'], [
+            {'id': rejete.pk, 'resultat': 'reference_utilisee'},
+            {'id': autre.pk, 'resultat': 'valide'},
+        ])
+        rejete.refresh_from_db()
+        self.assertEqual(rejete.statut, 'rejete')
+
+        # Formulaire de l'admin
+        rejete.statut = 'en_attente'
+        with self.assertRaises(ValidationError) as erreur:
+            rejete.full_clean()
+        self.assertIn('reference_transaction', erreur.exception.message_dict)
+
+        self.assertEqual(set(Paiement.objects.en_double()), {rejete, reprise})
+
+
+class FileDeRevueTests(APITestCase):
+    """Réservation des éléments en attente par plusieurs administrateurs"""
+
+    def setUp(self):
+        self.admin_a = creer_utilisateur(email='a@example.com', is_admin=True)
+        self.admin_b = creer_utilisateur(email='b@example.com', is_admin=True)
+        concours = creer_concours()
+        self.inscriptions = [
+            creer_inscription(creer_utilisateur(email=f'candidat{i}@example.com'), concours)
+            for i in range(3)
+        ]
+        self.url = reverse('admin_dashboard:reserver_inscriptions')
+
+    def _reserver(self, admin, taille):
+        self.client.force_authenticate(admin)
+        response = self.client.post(self.url, {'taille': taille}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return [inscription['id'] for inscription in response.data['resultats']]
+
+    def test_reservations_disjointes(self):
+        pour_a = self._reserver(self.admin_a, 2)
+        pour_b = self._reserver(self.admin_b, 2)
+
+        self.assertEqual(pour_a, [i.pk for i in self.inscriptions[:2]])
+        self.assertEqual(pour_b, [self.inscriptions[2].pk])
+        # Renouvellement du bail de ses propres réservations
+        self.assertEqual(self._reserver(self.admin_a, 2), pour_a)
+
+    def test_bail_expire(self):
+        pour_a = self._reserver(self.admin_a, 3)
+        Inscription.objects.filter(pk__in=pour_a[:1]).update(
+            reserve_jusqua=Inscription.objects.get(pk=pour_a[0]).reserve_jusqua - timedelta(hours=1)
+        )
+
+        self.assertEqual(self._reserver(self.admin_b, 3), pour_a[:1])
+
+    def test_validation_libere_et_compte(self):
+        pour_a = self._reserver(self.admin_a, 3)
+
+        self.client.patch(
+            reverse('admin_dashboard:valider_inscription', args=[pour_a[0]]),
+            {'action': 'confirmer'}, format='json'
+        )
+        self.client.post(reverse('admin_dashboard:valider_inscriptions_en_lot'), {
+            'ids': pour_a[1:], 'action': 'rejeter', 'raison_rejet': 'Photo illisible'
+        }, format='json')
+
+        inscription = Inscription.objects.get(pk=pour_a[0])
+        self.assertIsNone(inscription.reserve_par)
+        self.assertEqual(inscription.traite_par, self.admin_a)
+
+        response = self.client.get(reverse('admin_dashboard:statistiques_revision'))
+        self.assertEqual(response.data['en_cours']['inscriptions'], 0)
+        self.assertEqual(len(response.data['administrateurs']), 1)
+        self.assertEqual(response.data['administrateurs'][0]['email'], 'a@example.com')
+        self.assertEqual(response.data['administrateurs'][0]['inscriptions'], 3)
+
+
+@skipUnlessDBFeature('has_select_for_update_skip_locked')
+class FileDeRevueConcurrenceTests(TransactionTestCase):
+    """Des réservations simultanées ne se chevauchent jamais"""
+
+    def test_reservations_concurrentes(self):
+        concours = creer_concours()
+        for i in range(40):
+            creer_inscription(creer_utilisateur(email=f'candidat{i}@example.com'), concours)
+        admins = [creer_utilisateur(email=f'admin{i}@example.com', is_admin=True) for i in range(8)]
+
+        reservations = {}
+        depart = threading.Barrier(len(admins))
+
+        def reserver(admin):
+            try:
+                depart.wait()
+                reservations[admin.pk], _ = Inscription.objects.reserver(admin, 5)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=reserver, args=[admin]) for admin in admins]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        ids = [pk for lot in reservations.values() for pk in lot]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(
+            Inscription.objects.filter(reserve_par__isnull=False).count(), len(ids)
+        )
+
+
+class DashboardStatsTests(APITestCase):
+    """Statistiques agrégées servies depuis un instantané partagé"""
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(creer_utilisateur(email='admin@example.com', is_admin=True))
+        self.url = reverse('admin_dashboard:dashboard_stats')
+        concours = creer_concours()
+        creer_inscription(creer_utilisateur(), concours).confirmer()
+        creer_inscription(creer_utilisateur(email='autre@example.com'), concours)
+
+    def test_une_requete_par_table_puis_cache(self):
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.data['inscriptions_du_jour'], 2)
+        self.assertEqual(response.data['inscriptions_en_attente'], 1)
+        self.assertEqual(response.data['inscriptions_confirmees'], 1)
+        self.assertEqual(response.data['candidats_actifs'], 2)
+        self.assertEqual(response.data['concours_total'], 1)
+
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+    def test_instantane_perime_recalcule_en_arriere_plan(self):
+        self.client.get(self.url)
+        instantane = cache.get(CLE_INSTANTANE)
+        instantane['calcule_le'] = time.time() - FRAICHEUR - 1
+        cache.set(CLE_INSTANTANE, instantane)
+        creer_inscription(creer_utilisateur(email='nouveau@example.com'), creer_concours())
+
+        with mock.patch('admin_dashboard.stats.threading.Thread') as thread:
+            perime = self.client.get(self.url)
+            self.client.get(self.url)
+
+        # Réponse immédiate avec l'instantané périmé, un seul recalcul lancé
+        self.assertEqual(perime.data['inscriptions_du_jour'], 2)
+        self.assertEqual(thread.call_count, 1)
+
+        self.assertIs(thread.call_args.kwargs['target'], _rafraichir_en_arriere_plan)
+        rafraichir_statistiques()
+        self.assertEqual(self.client.get(self.url).data['inscriptions_du_jour'], 3)
+
+
+
+@mock.patch('admin_dashboard.agregation.MARGE', timedelta(0))
+class StatistiquesJournalieresTests(APITestCase):
+    """Agrégats journaliers incrémentaux et série temporelle"""
+
+    def setUp(self):
+        self.client.force_authenticate(creer_utilisateur(email='admin@example.com', is_admin=True))
+        self.url = reverse('admin_dashboard:stats_timeseries')
+        self.concours = creer_concours()
+        self.emails = (f'candidat{i}@example.com' for i in itertools.count())
+
+    def inscrire(self, concours=None, **extra):
+        return creer_inscription(creer_utilisateur(email=next(self.emails)), concours or self.concours, **extra)
+
+    def payer(self, inscription, statut='valide'):
+        return Paiement.objects.create(
+            inscription=inscription,
+            methode_paiement='orange_money',
+            reference_transaction=f'OM{inscription.pk}',
+            montant=5000,
+            capture_ecran='paiements/preuves/preuve.jpg',
+            statut=statut,
+        )
+
+    def test_agregation_initiale(self):
+        self.payer(self.inscrire())
+        self.inscrire(ville='Bobo-Dioulasso', statut='annulee')
+
+        self.assertEqual(agreger_statistiques(), 2)
+
+        ouaga = StatistiqueJournaliere.objects.get(ville='Ouagadougou')
+        self.assertEqual(ouaga.inscriptions, 1)
+        self.assertEqual(ouaga.paiements_valides, 1)
+        self.assertEqual(ouaga.revenus, 5000)
+        bobo = StatistiqueJournaliere.objects.get(ville='Bobo-Dioulasso')
+        self.assertEqual(bobo.inscriptions_annulees, 1)
+
+    def test_passage_incremental(self):
+        hier = timezone.now() - timedelta(days=1)
+        ancienne = self.inscrire()
+        Inscription.objects.filter(pk=ancienne.pk).update(created_at=hier)
+        ancienne.refresh_from_db()
+        agreger_statistiques()
+        ligne_hier = StatistiqueJournaliere.objects.get(jour=timezone.localdate(hier))
+
+        # Rien de modifié : aucune ligne réécrite
+        self.assertEqual(agreger_statistiques(), 0)
+
+        self.inscrire()
+        self.assertEqual(agreger_statistiques(), 1)
+
+        # Le jour précédent n'a pas été recalculé
+        self.assertTrue(StatistiqueJournaliere.objects.filter(pk=ligne_hier.pk).exists())
+        self.assertEqual(
+            StatistiqueJournaliere.objects.get(jour=timezone.localdate()).inscriptions, 1
+        )
+
+        # Une modification d'une ancienne ligne recalcule son jour
+        ancienne.confirmer()
+        agreger_statistiques()
+        self.assertEqual(
+            StatistiqueJournaliere.objects.get(jour=timezone.localdate(hier)).inscriptions_confirmees, 1
+        )
+
+    def test_seuls_les_couples_touches_sont_recalcules(self):
+        autre_concours = creer_concours(nom='Concours B')
+        il_y_a_un_mois = timezone.now() - timedelta(days=30)
+        ancienne = self.inscrire()
+        Inscription.objects.filter(pk=ancienne.pk).update(created_at=il_y_a_un_mois)
+        ancienne.refresh_from_db()
+        self.inscrire()
+        recente = self.inscrire(concours=autre_concours)
+        agreger_statistiques()
+
+        # (aujourd'hui, concours) n'est pas touché : sa ligne, faussée
+        # volontairement, ne doit être ni supprimée ni recalculée
+        StatistiqueJournaliere.objects.filter(
+            jour=timezone.localdate(), concours=self.concours
+        ).update(inscriptions=99)
+
+        ancienne.confirmer()
+        recente.confirmer()
+        with CaptureQueriesContext(connection) as requetes:
+            self.assertEqual(agreger_statistiques(), 2)
+
+        self.assertEqual(
+            StatistiqueJournaliere.objects.get(
+                jour=timezone.localdate(il_y_a_un_mois)
+            ).inscriptions_confirmees, 1
+        )
+        self.assertEqual(
+            StatistiqueJournaliere.objects.get(concours=autre_concours).inscriptions_confirmees, 1
+        )
+        self.assertEqual(
+            StatistiqueJournaliere.objects.get(
+                jour=timezone.localdate(), concours=self.concours
+            ).inscriptions, 99
+        )
+        # Pas d'intervalle de created_at couvrant le mois écoulé
+        lendemain = timezone.localdate(il_y_a_un_mois) + timedelta(days=2)
+        self.assertNotIn(str(lendemain), ' '.join(r['sql'] for r in requetes.captured_queries))
+
+    def test_changement_de_ville(self):
+        inscription = self.inscrire()
+        agreger_statistiques()
+
+        inscription.ville = 'Koudougou'
+        inscription.save()
+        agreger_statistiques()
+
+        self.assertEqual(
+            list(StatistiqueJournaliere.objects.values_list('ville', 'inscriptions')),
+            [('Koudougou', 1)]
+        )
+
+    def test_serie_temporelle_complete_les_jours(self):
+        self.payer(self.inscrire())
+        self.inscrire(ville='Bobo-Dioulasso')
+        agreger_statistiques()
+        aujourdhui = timezone.localdate()
+
+        response = self.client.get(self.url, {
+            'debut': aujourdhui - timedelta(days=2), 'fin': aujourdhui
+        })
+
+        self.assertEqual(response.status_code, 200)
+        points = response.data['points']
+        self.assertEqual([p['jour'] for p in points], [aujourdhui - timedelta(days=i) for i in (2, 1, 0)])
+        self.assertEqual(points[0]['inscriptions'], 0)
+        self.assertEqual(points[2]['inscriptions'], 2)
+        self.assertEqual(points[2]['revenus'], 5000)
+        self.assertIsNotNone(response.data['a_jour_le'])
+
+        response = self.client.get(self.url, {'grouper': 'ville', 'ville': 'Bobo-Dioulasso'})
+        self.assertEqual(len(response.data['series']), 1)
+        self.assertEqual(response.data['series'][0]['ville'], 'Bobo-Dioulasso')
+        self.assertEqual(len(response.data['series'][0]['points']), 30)
+
+    def test_periode_invalide(self):
+        aujourdhui = timezone.localdate()
+        response = self.client.get(self.url, {'debut': aujourdhui, 'fin': aujourdhui - timedelta(days=1)})
+        self.assertEqual(response.status_code, 400)
+
+    def test_requetes_independantes_du_volume(self):
+        for _ in range(5):
+            self.inscrire()
+        agreger_statistiques()
+
+        # Agrégats et curseur
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+
+class EvenementsRevueTests(APITestCase):
+    """Publication des événements de la file de revue après commit"""
+
+    def setUp(self):
+        self.concours = creer_concours()
+        self.inscription = creer_inscription(creer_utilisateur(), self.concours)
+        patcher = mock.patch('core.evenements.get_broker')
+        self.broker = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+    def evenements(self):
+        return [appel.args for appel in self.broker.publier.call_args_list]
+
+    def test_creation_et_changement_de_statut(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            inscription = creer_inscription(creer_utilisateur(email='autre@example.com'), self.concours)
+        with self.captureOnCommitCallbacks(execute=True):
+            inscription.telephone = '71000000'
+            inscription.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            inscription.confirmer()
+
+        self.assertEqual(self.evenements(), [
+            (CANAL_REVUE, {'objet': 'inscription', 'action': 'creation', 'ids': [inscription.pk], 'statut': 'en_attente'}),
+            (CANAL_REVUE, {'objet': 'inscription', 'action': 'statut', 'ids': [inscription.pk], 'statut': 'confirmee'}),
+        ])
+
+    def test_rien_publie_sans_commit(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            self.inscription.confirmer()
+        self.broker.publier.assert_not_called()
+
+    def test_lot_publie_un_seul_evenement(self):
+        autre = creer_inscription(creer_utilisateur(email='autre@example.com'), self.concours)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Inscription.objects.filter(pk__in=[self.inscription.pk, autre.pk]).rejeter_en_lot('Dossier incomplet')
+
+        self.assertEqual(self.evenements(), [
+            (CANAL_REVUE, {'objet': 'inscription', 'action': 'statut', 'ids': [self.inscription.pk, autre.pk], 'statut': 'annulee'}),
+        ])
+
+
+class FluxRevueTests(APITestCase):
+    """Flux Server-Sent Events de la file de revue"""
+
+    def setUp(self):
+        self.url = reverse('admin_dashboard:flux_revue')
+        self.jeton = str(AccessToken.for_user(creer_utilisateur(email='admin@example.com', is_admin=True)))
+        self.jeton_candidat = str(AccessToken.for_user(creer_utilisateur()))
+        self.broker = LocalBroker()
+        patcher = mock.patch('admin_dashboard.views.get_broker', return_value=self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_evenement_pousse_au_client(self):
+        response = await self.async_client.get(self.url, {'token': self.jeton})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        flux = aiter(response.streaming_content)
+        self.assertEqual(await anext(flux), b'retry: 3000\n\n')
+
+        # Publication depuis un autre thread, comme après un commit
+        evenement = {'objet': 'paiement', 'action': 'creation', 'ids': [1], 'statut': 'en_attente'}
+        await asyncio.to_thread(self.broker.publier, CANAL_REVUE, evenement)
+
+        message = await asyncio.wait_for(anext(flux), 1)
+        self.assertEqual(json.loads(message.decode().removeprefix('data: ')), evenement)
+
+    def test_premier_evenement_sous_wsgi(self):
+        # Client de test synchrone : requête WSGI, flux borné
+        response = self.client.get(self.url, {'token': self.jeton})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        flux = iter(response.streaming_content)
+        self.assertEqual(next(flux), b'retry: 3000\n\n')
+
+        # Publier jusqu'à ce que le flux, abonné pendant next(), reçoive l'événement
+        evenement = {'objet': 'inscription', 'action': 'statut', 'ids': [2], 'statut': 'confirmee'}
+        recu = threading.Event()
+
+        def publier():
+            while not recu.wait(0.05):
+                self.broker.publier(CANAL_REVUE, evenement)
+
+        thread = threading.Thread(target=publier)
+        thread.start()
+        try:
+            message = next(flux)
+        finally:
+            recu.set()
+            thread.join()
+        self.assertEqual(json.loads(message.decode().removeprefix('data: ')), evenement)
+
+        # Fin du flux : le thread est libéré, EventSource se reconnecte
+        self.assertEqual(list(flux), [])
+
+    def test_flux_borne_sous_wsgi_sans_evenement(self):
+        with mock.patch('admin_dashboard.views.INTERVALLE_PING', 0.05):
+            response = self.client.get(self.url, {'token': self.jeton})
+            self.assertEqual(list(response.streaming_content), [b'retry: 3000\n\n', b': ping\n\n'])
+
+    async def test_reserve_aux_administrateurs(self):
+        response = await self.async_client.get(self.url, {'token': self.jeton_candidat})
+        self.assertEqual(response.status_code, 403)
+
+        response = await self.async_client.get(self.url, {'token': 'invalide'})
+        self.assertEqual(response.status_code, 403)
+
+    async def test_client_lent_resynchronise(self):
+        abonnement = self.broker.abonner(CANAL_REVUE)
+        for i in range(TAILLE_FILE + 1):
+            self.broker.publier(CANAL_REVUE, {'ids': [i]})
+        await asyncio.sleep(0)
+
+        self.assertEqual(await abonnement.recevoir(0.1), RESYNCHRONISER)
+        self.assertIsNone(await abonnement.recevoir(0.01))
+
+
+class RapprochementPaiementsTests(APITestCase):
+    """Rapprochement des paiements en attente avec un relevé d'opérateur"""
+
+    def setUp(self):
+        self.admin = creer_utilisateur(email='admin@example.com', is_admin=True)
+        self.client.force_authenticate(self.admin)
+        self.url = reverse('admin_dashboard:rapprocher_paiements')
+        self.concours = creer_concours()
+        self.compteur = itertools.count()
+        self.aujourdhui = timezone.localtime().strftime('%d/%m/%Y %H:%M')
+
+    def paiement(self, reference, montant=5000, **extra):
+        inscription = creer_inscription(
+            creer_utilisateur(email=f'candidat{next(self.compteur)}@example.com'), self.concours
+        )
+        return Paiement.objects.create(
+            inscription=inscription,
+            methode_paiement=extra.pop('methode_paiement', 'orange_money'),
+            reference_transaction=reference,
+            montant=montant,
+            capture_ecran='paiements/preuves/preuve.jpg',
+            **extra
+        )
+
+    def releve(self, lignes, entete='Date;ID Transaction;Montant (FCFA);Statut'):
+        contenu = '\n'.join([entete] + [';'.join(ligne) for ligne in lignes])
+        return SimpleUploadedFile('releve.csv', contenu.encode('utf-8-sig'), content_type='text/csv')
+
+    def test_rapprochement(self):
+        exact = self.paiement('om123')
+        montant = self.paiement('OM456', montant=4000)
+        ancien = self.paiement('OM789')
+        absent = self.paiement('OM000')
+        moov = self.paiement('OM321', methode_paiement='moov_money')
+        deja_valide = self.paiement('OM555', statut='valide')
+        il_y_a_un_mois = (timezone.localtime() - timedelta(days=30)).strftime('%d/%m/%Y %H:%M')
+
+        response = self.client.post(self.url, {
+            'fichier': self.releve([
+                (self.aujourdhui, ' OM123 ', '5 000', 'Succès'),
+                (self.aujourdhui, 'OM456', '5000', 'Succès'),
+                (il_y_a_un_mois, 'OM789', '5000', 'Succès'),
+                (self.aujourdhui, 'OM321', '5000', 'Succès'),
+                (self.aujourdhui, 'OM555', '5000', 'Succès'),
+            ]),
+            'operateur': 'orange_money',
+        }, format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['lignes'], 5)
+        self.assertEqual(response.data['valides'], 1)
+        self.assertEqual(response.data['sans_correspondance'], 1)
+        anomalies = {a['id']: a['anomalie'] for a in response.data['anomalies']}
+        self.assertEqual(set(anomalies), {montant.pk, ancien.pk})
+        self.assertIn('5000 FCFA', anomalies[montant.pk])
+
+        exact.refresh_from_db()
+        self.assertEqual(exact.statut, 'valide')
+        self.assertEqual(exact.traite_par, self.admin)
+        montant.refresh_from_db()
+        self.assertEqual(montant.statut, 'en_attente')
+        self.assertEqual(montant.anomalie_rapprochement, anomalies[montant.pk])
+        for paiement in (absent, moov):
+            paiement.refresh_from_db()
+            self.assertEqual(paiement.statut, 'en_attente')
+        deja_valide.refresh_from_db()
+        self.assertEqual(deja_valide.statut, 'valide')
+
+    def test_reference_en_double_dans_le_releve(self):
+        paiement = self.paiement('OM123')
+
+        response = self.client.post(self.url, {
+            'fichier': self.releve([
+                (self.aujourdhui, 'OM123', '5000', 'Succès'),
+                (self.aujourdhui, 'om-123', '5000', 'Succès'),
+            ]),
+            'operateur': 'orange_money',
+        }, format='multipart')
+
+        self.assertEqual(response.data['valides'], 0)
+        self.assertEqual(response.data['anomalies'], [{
+            'id': paiement.pk, 'reference': 'OM123', 'anomalie': 'Référence présente plusieurs fois dans le relevé'
+        }])
+
+    def test_simulation(self):
+        paiement = self.paiement('OM123', montant=4000)
+
+        response = self.client.post(self.url, {
+            'fichier': self.releve([(self.aujourdhui, 'OM123', '5000', 'Succès')]),
+            'operateur': 'orange_money',
+            'simulation': True,
+        }, format='multipart')
+
+        self.assertEqual(len(response.data['anomalies']), 1)
+        paiement.refresh_from_db()
+        self.assertEqual(paiement.anomalie_rapprochement, '')
+
+    def test_colonnes_manquantes(self):
+        response = self.client.post(self.url, {
+            'fichier': self.releve([('x', 'y')], entete='Date,Montant'),
+            'operateur': 'orange_money',
+        }, format='multipart')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('reference', response.data['error'])
+
+    def test_commande(self):
+        paiement = self.paiement('OM123')
+        contenu = f'reference,montant,date\nOM123,5000,{timezone.localdate():%Y-%m-%d}\n'
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='cp1252') as fichier:
+            fichier.write(contenu)
+            fichier.flush()
+            sortie = io.StringIO()
+            call_command('reconcile_payments', fichier.name, operateur='orange_money', stdout=sortie)
+
+        self.assertIn('1 paiements validés', sortie.getvalue())
+        paiement.refresh_from_db()
+        self.assertEqual(paiement.statut, 'valide')
+        self.assertIsNone(paiement.traite_par)
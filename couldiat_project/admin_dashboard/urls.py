@@ -9,12 +9,23 @@ app_name = 'admin_dashboard'
 urlpatterns = [
     # Dashboard
     path('dashboard/stats/', views.dashboard_stats, name='dashboard_stats'),
+    path('stats/timeseries/', views.stats_timeseries, name='stats_timeseries'),
     
     # Gestion des inscriptions
     path('inscriptions/en-attente/', views.inscriptions_en_attente, name='inscriptions_en_attente'),
     path('inscriptions/<int:pk>/valider/', views.valider_inscription, name='valider_inscription'),
+    path('inscriptions/valider-en-lot/', views.valider_inscriptions_en_lot, name='valider_inscriptions_en_lot'),
+    path('inscriptions/reserver/', views.reserver_inscriptions, name='reserver_inscriptions'),
+    path('concours/<int:pk>/inscriptions/export/', views.export_inscriptions, name='export_inscriptions'),
     
     # Gestion des paiements
     path('paiements/en-attente/', views.paiements_en_attente, name='paiements_en_attente'),
     path('paiements/<int:pk>/valider/', views.valider_paiement, name='valider_paiement'),
+    path('paiements/valider-en-lot/', views.valider_paiements_en_lot, name='valider_paiements_en_lot'),
+    path('paiements/reserver/', views.reserver_paiements, name='reserver_paiements'),
+    path('paiements/rapprochement/', views.rapprocher_paiements, name='rapprocher_paiements'),
+    
+    # File de revue
+    path('revision/statistiques/', views.statistiques_revision, name='statistiques_revision'),
+    path('revision/flux/', views.flux_revue, name='flux_revue'),
 ]
\ No newline at end of file
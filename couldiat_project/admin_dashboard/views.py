@@ -3,21 +3,45 @@ Views pour l'Admin Dashboard
 """
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.response import Response
-from django.db.models import Count, Q
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
 from django.utils import timezone
 from datetime import timedelta
+import json
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+from core.evenements import get_broker
+from core.export import flux_asynchrone
+from core.pagination import KeysetPagination
 from core.permissions import IsAdminUser
+from concours.evenements import CANAL_REVUE
+from concours.export import FORMATS, exporter_inscriptions
 from concours.models import Concours, Inscription, Paiement
+from concours.rapprochement import ReleveInvalide, rapprocher
 from concours.serializers import (
     InscriptionDetailSerializer,
     PaiementDetailSerializer,
     ConcoursDetailSerializer
 )
-from accounts.models import User
+from .agregation import CHAMPS, NOM_CURSEUR
+from .models import CurseurAgregation, StatistiqueJournaliere
+from .stats import obtenir_statistiques
+from .serializers import (
+    RapprochementSerializer,
+    ReservationSerializer,
+    SerieTemporelleSerializer,
+    ValidationInscriptionsSerializer,
+    ValidationPaiementsSerializer
+)
 
 
 @swagger_auto_schema(
@@ -29,47 +53,80 @@ from accounts.models import User
 def dashboard_stats(request):
     """
     Statistiques générales du dashboard admin
+    
+    Instantané partagé recalculé en arrière-plan toutes les 30 secondes
+    au plus (voir admin_dashboard.stats) ; `calcule_le` indique sa date.
     """
-    today = timezone.now().date()
-    
-    stats = {
-        # Inscriptions
-        'inscriptions_du_jour': Inscription.objects.filter(
-            created_at__date=today
-        ).count(),
-        'inscriptions_en_attente': Inscription.objects.filter(
-            statut='en_attente'
-        ).count(),
-        'inscriptions_confirmees': Inscription.objects.filter(
-            statut='confirmee'
-        ).count(),
-        
-        # Paiements
-        'paiements_en_attente': Paiement.objects.filter(
-            statut='en_attente'
-        ).count(),
-        'paiements_valides': Paiement.objects.filter(
-            statut='valide'
-        ).count(),
-        
-        # Candidats
-        'candidats_actifs': User.objects.filter(
-            is_active=True,
-            is_admin=False
-        ).count(),
-        'nouveaux_candidats_semaine': User.objects.filter(
-            created_at__gte=today - timedelta(days=7),
-            is_admin=False
-        ).count(),
-        
-        # Concours
-        'concours_ouverts': Concours.objects.filter(
-            est_ouvert=True
-        ).count(),
-        'concours_total': Concours.objects.count(),
+    stats, calcule_le = obtenir_statistiques()
+    
+    return Response({**stats, 'calcule_le': calcule_le})
+
+
+@swagger_auto_schema(
+    method='get',
+    query_serializer=SerieTemporelleSerializer,
+    responses={200: 'Série journalière des inscriptions et paiements'}
+)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def stats_timeseries(request):
+    """
+    Évolution journalière des inscriptions et paiements
+    
+    Servie depuis les agrégats journaliers (commande `aggregate_stats`) :
+    le coût dépend du nombre de jours, pas du nombre d'inscriptions. Les
+    jours sans activité sont renvoyés à zéro.
+    
+    Query Parameters:
+    - debut, fin: Période au format AAAA-MM-JJ (défaut: 30 derniers jours)
+    - concours: Filtrer par concours
+    - ville: Filtrer par ville
+    - grouper: concours ou ville, une série par valeur
+    """
+    serializer = SerieTemporelleSerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    parametres = serializer.validated_data
+    debut, fin = parametres['debut'], parametres['fin']
+    
+    lignes = StatistiqueJournaliere.objects.filter(jour__range=(debut, fin))
+    if 'concours' in parametres:
+        lignes = lignes.filter(concours_id=parametres['concours'])
+    if 'ville' in parametres:
+        lignes = lignes.filter(ville=parametres['ville'])
+    
+    grouper = parametres.get('grouper')
+    colonnes = ['jour', grouper] if grouper else ['jour']
+    lignes = lignes.values(*colonnes).annotate(
+        **{champ: Sum(champ) for champ in CHAMPS}
+    ).order_by(*colonnes)
+    
+    jours = [debut + timedelta(days=i) for i in range((fin - debut).days + 1)]
+    valeurs = {}
+    for ligne in lignes:
+        valeurs.setdefault(ligne.get(grouper), {})[ligne['jour']] = ligne
+    
+    def serie(par_jour):
+        return [
+            {'jour': jour, **{champ: par_jour.get(jour, {}).get(champ, 0) for champ in CHAMPS}}
+            for jour in jours
+        ]
+    
+    curseur = CurseurAgregation.objects.filter(nom=NOM_CURSEUR).first()
+    reponse = {
+        'debut': debut,
+        'fin': fin,
+        'a_jour_le': curseur.derniere_modification if curseur else None,
     }
     
-    return Response(stats)
+    if grouper:
+        reponse['series'] = [
+            {grouper: cle, 'points': serie(par_jour)}
+            for cle, par_jour in valeurs.items()
+        ]
+    else:
+        reponse['points'] = serie(valeurs.get(None, {}))
+    
+    return Response(reponse)
 
 
 @swagger_auto_schema(
@@ -81,14 +138,54 @@ def dashboard_stats(request):
 def inscriptions_en_attente(request):
     """
     Liste de toutes les inscriptions en attente de validation
+    
+    Query Parameters:
+    - cursor, page_size, count: Pagination par curseur (voir KeysetPagination)
     """
     inscriptions = Inscription.objects.filter(
         statut='en_attente'
     ).select_related('user', 'concours').order_by('-created_at')
     
-    serializer = InscriptionDetailSerializer(inscriptions, many=True)
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(inscriptions, request)
+    serializer = InscriptionDetailSerializer(page, many=True)
     
-    return Response(serializer.data)
+    return paginator.get_paginated_response(serializer.data)
+
+
+@swagger_auto_schema(
+    method='post',
+    request_body=ReservationSerializer,
+    responses={200: InscriptionDetailSerializer(many=True)}
+)
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def reserver_inscriptions(request):
+    """
+    Réserver les prochaines inscriptions en attente à traiter
+    
+    Plusieurs administrateurs peuvent appeler cet endpoint en parallèle :
+    chacun reçoit des inscriptions différentes, réservées jusqu'à
+    `reserve_jusqua`. Confirmer ou rejeter une inscription libère sa
+    réservation ; passé le délai, elle retourne dans la file.
+    
+    Body:
+    {
+        "taille": 20 (max 100)
+    }
+    """
+    serializer = ReservationSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    
+    ids, expiration = Inscription.objects.reserver(request.user, serializer.validated_data['taille'])
+    inscriptions = Inscription.objects.filter(pk__in=ids).select_related(
+        'user', 'concours'
+    ).order_by('created_at', 'id')
+    
+    return Response({
+        'reserve_jusqua': expiration,
+        'resultats': InscriptionDetailSerializer(inscriptions, many=True).data
+    })
 
 
 @swagger_auto_schema(
@@ -128,8 +225,12 @@ def valider_inscription(request, pk):
     action = request.data.get('action')
     
     if action == 'confirmer':
-        inscription.statut = 'confirmee'
-        inscription.save()
+        if not inscription.confirmer():
+            return Response({
+                'error': 'Ce concours est complet'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        Inscription.objects.filter(pk=inscription.pk).marquer_traites(request.user)
         
         return Response({
             'message': 'Inscription confirmée avec succès',
@@ -145,9 +246,9 @@ def valider_inscription(request, pk):
                 'error': 'La raison du rejet est obligatoire'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        inscription.statut = 'annulee'
-        inscription.raison_rejet = raison_rejet
-        inscription.save()
+        inscription.rejeter(raison_rejet)
+        
+        Inscription.objects.filter(pk=inscription.pk).marquer_traites(request.user)
         
         return Response({
             'message': 'Inscription rejetée',
@@ -160,6 +261,55 @@ def valider_inscription(request, pk):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
+@swagger_auto_schema(
+    method='post',
+    request_body=ValidationInscriptionsSerializer,
+    responses={200: 'Résultat par inscription'}
+)
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def valider_inscriptions_en_lot(request):
+    """
+    Confirmer ou rejeter plusieurs inscriptions en une transaction
+    
+    Body:
+    {
+        "ids": [1, 2, 3],
+        "action": "confirmer" | "rejeter",
+        "raison_rejet": "..." (si rejet)
+    }
+    
+    Résultat par id : confirmee (avec numero_inscription), deja_confirmee,
+    complet (plus de place), annulee ou introuvable.
+    """
+    serializer = ValidationInscriptionsSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    ids = serializer.validated_data['ids']
+    
+    inscriptions = Inscription.objects.filter(id__in=ids)
+    if serializer.validated_data['action'] == 'confirmer':
+        resultats = inscriptions.confirmer_en_lot()
+    else:
+        resultats = inscriptions.rejeter_en_lot(serializer.validated_data['raison_rejet'])
+    
+    Inscription.objects.filter(pk__in=[
+        pk for pk, (resultat, _) in resultats.items() if resultat in ('confirmee', 'annulee')
+    ]).marquer_traites(request.user)
+    
+    reponse = []
+    for pk in ids:
+        resultat, numero = resultats.get(pk, ('introuvable', None))
+        ligne = {'id': pk, 'resultat': resultat}
+        if numero:
+            ligne['numero_inscription'] = numero
+        reponse.append(ligne)
+    
+    return Response({
+        'traites': sum(1 for ligne in reponse if ligne['resultat'] != 'introuvable'),
+        'resultats': reponse
+    })
+
+
 @swagger_auto_schema(
     method='get',
     responses={200: PaiementDetailSerializer(many=True)}
@@ -169,14 +319,51 @@ def valider_inscription(request, pk):
 def paiements_en_attente(request):
     """
     Liste de tous les paiements en attente de validation
+    
+    Query Parameters:
+    - cursor, page_size, count: Pagination par curseur (voir KeysetPagination)
     """
     paiements = Paiement.objects.filter(
         statut='en_attente'
     ).select_related('inscription', 'inscription__user', 'inscription__concours').order_by('-created_at')
     
-    serializer = PaiementDetailSerializer(paiements, many=True)
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(paiements, request)
+    serializer = PaiementDetailSerializer(page, many=True)
+    
+    return paginator.get_paginated_response(serializer.data)
+
+
+@swagger_auto_schema(
+    method='post',
+    request_body=ReservationSerializer,
+    responses={200: PaiementDetailSerializer(many=True)}
+)
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def reserver_paiements(request):
+    """
+    Réserver les prochains paiements en attente à traiter
+    
+    Même fonctionnement que la réservation des inscriptions.
+    
+    Body:
+    {
+        "taille": 20 (max 100)
+    }
+    """
+    serializer = ReservationSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    
+    ids, expiration = Paiement.objects.reserver(request.user, serializer.validated_data['taille'])
+    paiements = Paiement.objects.filter(pk__in=ids).select_related(
+        'inscription', 'inscription__user', 'inscription__concours'
+    ).order_by('created_at', 'id')
     
-    return Response(serializer.data)
+    return Response({
+        'reserve_jusqua': expiration,
+        'resultats': PaiementDetailSerializer(paiements, many=True).data
+    })
 
 
 @swagger_auto_schema(
@@ -217,7 +404,15 @@ def valider_paiement(request, pk):
     
     if action == 'valider':
         paiement.statut = 'valide'
-        paiement.save()
+        try:
+            with transaction.atomic():
+                paiement.save()
+        except IntegrityError:
+            # Paiement rejeté dont la référence a été resoumise depuis
+            return Response({
+                'error': 'Cette référence de transaction est utilisée par un autre paiement'
+            }, status=status.HTTP_409_CONFLICT)
+        Paiement.objects.filter(pk=paiement.pk).marquer_traites(request.user)
         
         return Response({
             'message': 'Paiement validé avec succès',
@@ -235,6 +430,7 @@ def valider_paiement(request, pk):
         paiement.statut = 'rejete'
         paiement.raison_rejet = raison_rejet
         paiement.save()
+        Paiement.objects.filter(pk=paiement.pk).marquer_traites(request.user)
         
         return Response({
             'message': 'Paiement rejeté',
@@ -244,4 +440,315 @@ def valider_paiement(request, pk):
     else:
         return Response({
             'error': 'Action invalide. Utilisez "valider" ou "rejeter"'
-        }, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+
+@swagger_auto_schema(
+    method='post',
+    request_body=ValidationPaiementsSerializer,
+    responses={200: 'Résultat par paiement'}
+)
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def valider_paiements_en_lot(request):
+    """
+    Valider ou rejeter plusieurs paiements en une transaction
+    
+    Body:
+    {
+        "ids": [1, 2, 3],
+        "action": "valider" | "rejeter",
+        "raison_rejet": "..." (si rejet)
+    }
+    
+    Résultat par id : valide, rejete, introuvable ou reference_utilisee
+    (paiement rejeté dont la référence sert à un autre paiement).
+    """
+    serializer = ValidationPaiementsSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    ids = serializer.validated_data['ids']
+    
+    if serializer.validated_data['action'] == 'valider':
+        statut, raison_rejet = 'valide', None
+    else:
+        statut, raison_rejet = 'rejete', serializer.validated_data['raison_rejet']
+    
+    paiements = Paiement.objects.filter(id__in=ids)
+    reprises = set()
+    if statut == 'valide':
+        reprises = set(paiements.reference_reprise().values_list('pk', flat=True))
+        paiements = paiements.exclude(pk__in=reprises)
+    
+    try:
+        modifies = set(paiements.changer_statut_en_lot(statut, raison_rejet))
+    except IntegrityError:
+        # Référence reprise entre-temps, ou partagée par deux paiements du lot
+        return Response({
+            'error': 'Certains paiements ont une référence de transaction utilisée par un autre paiement'
+        }, status=status.HTTP_409_CONFLICT)
+    Paiement.objects.filter(pk__in=modifies).marquer_traites(request.user)
+    
+    resultats = []
+    for pk in ids:
+        if pk in modifies:
+            resultat = statut
+        elif pk in reprises:
+            resultat = 'reference_utilisee'
+        else:
+            resultat = 'introuvable'
+        resultats.append({'id': pk, 'resultat': resultat})
+    
+    return Response({
+        'traites': len(modifies),
+        'resultats': resultats
+    })
+
+
+@swagger_auto_schema(
+    method='post',
+    request_body=RapprochementSerializer,
+    responses={200: 'Paiements validés et anomalies'}
+)
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def rapprocher_paiements(request):
+    """
+    Rapprocher un relevé Orange Money / Moov Money avec les paiements en attente
+    
+    Les paiements dont la référence, le montant et la date correspondent au
+    relevé sont validés ; les correspondances partielles sont signalées
+    dans `anomalie_rapprochement`.
+    
+    Body (multipart):
+    - fichier: Relevé CSV (colonnes référence, montant, date)
+    - operateur: orange_money ou moov_money
+    - fenetre_jours: Écart maximal entre relevé et soumission (défaut: 3)
+    - simulation: true pour ne rien enregistrer
+    """
+    serializer = RapprochementSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    donnees = serializer.validated_data
+    
+    try:
+        resultat = rapprocher(
+            donnees['fichier'],
+            donnees['operateur'],
+            fenetre_jours=donnees['fenetre_jours'],
+            simulation=donnees['simulation'],
+            user=request.user
+        )
+    except ReleveInvalide as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'lignes': resultat['lignes'],
+        'valides': len(resultat['valides']),
+        'sans_correspondance': resultat['sans_correspondance'],
+        'anomalies': resultat['anomalies'],
+    })
+
+
+@swagger_auto_schema(
+    method='get',
+    manual_parameters=[
+        openapi.Parameter('fichier', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=list(FORMATS)),
+        openapi.Parameter('statut', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                          enum=[statut for statut, _ in Inscription.STATUT_CHOICES]),
+    ],
+    responses={200: 'Fichier CSV ou XLSX'}
+)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def export_inscriptions(request, pk):
+    """
+    Exporter les inscriptions d'un concours (avec statut du paiement)
+    
+    Le fichier est produit en flux : la mémoire utilisée ne dépend pas du
+    nombre de candidats, sous WSGI comme sous ASGI (flux asynchrone).
+    
+    Query Parameters:
+    - fichier: csv (défaut) ou xlsx
+    - statut: en_attente, confirmee ou annulee (optionnel)
+    """
+    format_export = request.query_params.get('fichier', 'csv')
+    if format_export not in FORMATS:
+        return Response({
+            'error': 'Format invalide. Utilisez csv ou xlsx'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    if not Concours.objects.filter(id=pk).exists():
+        return Response({
+            'error': 'Concours non trouvé'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    content_type, contenu = exporter_inscriptions(
+        pk, format_export, statut=request.query_params.get('statut')
+    )
+    if isinstance(request._request, ASGIRequest):
+        contenu = flux_asynchrone(contenu)
+    
+    response = StreamingHttpResponse(contenu, content_type=content_type)
+    response['Content-Disposition'] = (
+        f'attachment; filename="inscriptions-concours-{pk}.{format_export}"'
+    )
+    return response
+
+
+@swagger_auto_schema(
+    method='get',
+    manual_parameters=[
+        openapi.Parameter('heures', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, default=24),
+    ],
+    responses={200: 'Débit de revue par administrateur'}
+)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def statistiques_revision(request):
+    """
+    Débit de traitement des inscriptions et paiements par administrateur
+    
+    Query Parameters:
+    - heures: Fenêtre d'observation en heures (défaut: 24)
+    """
+    try:
+        heures = max(1, int(request.query_params.get('heures', 24)))
+    except ValueError:
+        return Response({
+            'error': 'Le paramètre heures doit être un entier'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    depuis = timezone.now() - timedelta(hours=heures)
+    administrateurs = {}
+    
+    for cle, Model in (('inscriptions', Inscription), ('paiements', Paiement)):
+        lignes = Model.objects.filter(
+            traite_le__gte=depuis,
+            traite_par__isnull=False
+        ).values('traite_par', 'traite_par__email').annotate(
+            total=Count('id'),
+            premier=Min('traite_le'),
+            dernier=Max('traite_le')
+        )
+        
+        for ligne in lignes:
+            administrateur = administrateurs.setdefault(ligne['traite_par'], {
+                'id': ligne['traite_par'],
+                'email': ligne['traite_par__email'],
+                'inscriptions': 0,
+                'paiements': 0,
+                'premier': ligne['premier'],
+                'dernier': ligne['dernier'],
+            })
+            administrateur[cle] = ligne['total']
+            administrateur['premier'] = min(administrateur['premier'], ligne['premier'])
+            administrateur['dernier'] = max(administrateur['dernier'], ligne['dernier'])
+    
+    resultats = []
+    for administrateur in administrateurs.values():
+        total = administrateur['inscriptions'] + administrateur['paiements']
+        # Débit sur la période d'activité effective (au moins une minute)
+        duree = max((administrateur.pop('dernier') - administrateur.pop('premier')).total_seconds(), 60)
+        resultats.append({
+            **administrateur,
+            'total': total,
+            'par_heure': round(total * 3600 / duree, 1),
+        })
+    
+    return Response({
+        'heures': heures,
+        'en_cours': {
+            'inscriptions': Inscription.objects.filter(
+                statut='en_attente', reserve_jusqua__gt=timezone.now()
+            ).count(),
+            'paiements': Paiement.objects.filter(
+                statut='en_attente', reserve_jusqua__gt=timezone.now()
+            ).count(),
+        },
+        'administrateurs': sorted(resultats, key=lambda a: a['total'], reverse=True),
+    })
+
+
+
+# Commentaire SSE envoyé sans événement, pour garder la connexion ouverte
+INTERVALLE_PING = 15
+
+
+def _authentifier_flux(request):
+    """
+    Administrateur authentifié par l'en-tête Authorization ou par le
+    paramètre `token` (EventSource ne permet pas d'envoyer d'en-têtes)
+    """
+    authentification = JWTAuthentication()
+    try:
+        jeton = request.GET.get('token')
+        if jeton:
+            user = authentification.get_user(authentification.get_validated_token(jeton))
+        else:
+            resultat = authentification.authenticate(request)
+            user = resultat[0] if resultat else None
+    except (AuthenticationFailed, InvalidToken):
+        return None
+    
+    return user if user and user.is_active and user.is_admin else None
+
+
+def _message(evenement):
+    if evenement is None:
+        return ': ping\n\n'
+    return f'data: {json.dumps(evenement, cls=DjangoJSONEncoder)}\n\n'
+
+
+async def _evenements():
+    """Flux continu (ASGI) : un message par événement, un ping sinon"""
+    async with get_broker().abonner(CANAL_REVUE) as abonnement:
+        yield 'retry: 3000\n\n'
+        while True:
+            yield _message(await abonnement.recevoir(INTERVALLE_PING))
+
+
+async def _prochain_evenement():
+    async with get_broker().abonner(CANAL_REVUE) as abonnement:
+        return await abonnement.recevoir(INTERVALLE_PING)
+
+
+def _evenements_bornes():
+    """Flux borné (WSGI) : le thread est libéré après INTERVALLE_PING au plus"""
+    yield 'retry: 3000\n\n'
+    yield _message(async_to_sync(_prochain_evenement)())
+
+
+async def flux_revue(request):
+    """
+    Flux Server-Sent Events de la file de revue
+    
+    Chaque message est un objet JSON {objet, action, ids, statut} publié à
+    la création d'une inscription ou d'un paiement et à chaque changement
+    de statut. {"action": "resynchroniser"} signale des événements perdus :
+    le client recharge alors les listes en attente.
+    
+    Vue asynchrone : servie par ASGI (couldiat_project.asgi, worker uvicorn)
+    pour qu'un client connecté n'occupe pas un worker. Sous WSGI (runserver,
+    gunicorn sans worker ASGI), la réponse est bornée : au plus un événement
+    ou un ping, puis fin du flux ; EventSource se reconnecte après `retry`.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    
+    user = await sync_to_async(_authentifier_flux)(request)
+    if user is None:
+        return JsonResponse({
+            'error': 'Vous devez être administrateur pour effectuer cette action.'
+        }, status=status.HTTP_403_FORBIDDEN)
+    
+    if isinstance(request, ASGIRequest):
+        contenu = _evenements()
+    else:
+        contenu = _evenements_bornes()
+    
+    response = StreamingHttpResponse(contenu, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Désactiver la mise en tampon de nginx
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,7 +1,7 @@
 """
 Configuration de l'interface admin pour Concours
 """
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.utils.html import format_html
 from .models import Concours, Inscription, Paiement
 
@@ -114,6 +114,28 @@ class InscriptionAdmin(admin.ModelAdmin):
         }),
     )
     
+    def save_model(self, request, obj, form, change):
+        """Passer par confirmer()/rejeter() pour maintenir le compteur de places"""
+        statut_initial = form.initial.get('statut', 'en_attente') if change else 'en_attente'
+        nouveau_statut = obj.statut
+        
+        if nouveau_statut == statut_initial:
+            return super().save_model(request, obj, form, change)
+        
+        obj.statut = statut_initial
+        super().save_model(request, obj, form, change)
+        
+        if nouveau_statut == 'confirmee':
+            if not obj.confirmer():
+                messages.error(request, "Ce concours est complet : l'inscription n'a pas été confirmée.")
+        elif nouveau_statut == 'annulee':
+            obj.rejeter(obj.raison_rejet)
+        else:
+            if statut_initial == 'confirmee':
+                obj.concours.liberer_place()
+            obj.statut = nouveau_statut
+            obj.save()
+    
     def get_candidat(self, obj):
         return f"{obj.prenom} {obj.nom}"
     get_candidat.short_description = 'Candidat'
@@ -146,6 +168,20 @@ class InscriptionAdmin(admin.ModelAdmin):
     a_paye_badge.short_description = 'Paiement'
 
 
+class ReferenceEnDoubleFilter(admin.SimpleListFilter):
+    """Paiements dont la référence est déclarée par un autre paiement, rejeté compris"""
+    title = 'référence en double'
+    parameter_name = 'reference_en_double'
+    
+    def lookups(self, request, model_admin):
+        return [('oui', 'Oui')]
+    
+    def queryset(self, request, queryset):
+        if self.value() == 'oui':
+            return queryset.en_double()
+        return queryset
+
+
 @admin.register(Paiement)
 class PaiementAdmin(admin.ModelAdmin):
     """Admin pour les paiements"""
@@ -158,14 +194,20 @@ class PaiementAdmin(admin.ModelAdmin):
         'statut_badge',
         'created_at'
     ]
-    list_filter = ['statut', 'methode_paiement', 'created_at']
+    list_filter = [
+        'statut',
+        'methode_paiement',
+        ReferenceEnDoubleFilter,
+        ('capture_similaire', admin.EmptyFieldListFilter),
+        'created_at'
+    ]
     search_fields = [
         'reference_transaction',
         'inscription__nom',
         'inscription__prenom',
         'inscription__user__email'
     ]
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['capture_similaire', 'distance_capture', 'created_at', 'updated_at']
     ordering = ['-created_at']
     
     fieldsets = (
@@ -178,10 +220,10 @@ class PaiementAdmin(admin.ModelAdmin):
             )
         }),
         ('Preuve', {
-            'fields': ('capture_ecran',)
+            'fields': ('capture_ecran', 'capture_similaire', 'distance_capture')
         }),
         ('Validation', {
-            'fields': ('statut', 'raison_rejet')
+            'fields': ('statut', 'raison_rejet', 'anomalie_rapprochement')
         }),
         ('Métadonnées', {
             'fields': ('created_at', 'updated_at'),
@@ -0,0 +1,62 @@
+"""
+Cache versionné du catalogue des concours
+
+Le corps de la réponse est partagé entre tous les utilisateurs : la clé ne
+dépend que des paramètres de la requête (filtres, recherche, tri, page) et
+d'une version du catalogue. Toute modification d'un concours ou de son
+compteur de places incrémente la version, ce qui rend les anciennes
+entrées inaccessibles sans avoir à les supprimer.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'concours:catalogue:version'
+CATALOGUE_TIMEOUT = 60 * 15  # 15 minutes
+
+
+def version_catalogue():
+    """Retourne la version courante du catalogue"""
+    version = cache.get(VERSION_KEY)
+    
+    if version is None:
+        # Partir de l'horodatage pour ne pas réutiliser une version évincée
+        cache.add(VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(VERSION_KEY)
+    
+    return version
+
+
+def invalider_catalogue():
+    """Incrémenter la version du catalogue après le commit de la transaction"""
+    transaction.on_commit(_incrementer_version)
+
+
+def _incrementer_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        version_catalogue()
+
+
+def cle_catalogue(request):
+    """Clé de cache d'une page du catalogue"""
+    parametres = sorted(
+        (cle, sorted(valeurs)) for cle, valeurs in request.query_params.lists()
+    )
+    empreinte = hashlib.sha256(
+        repr((request.get_host(), request.path, parametres)).encode()
+    ).hexdigest()
+    
+    return f'concours:catalogue:{version_catalogue()}:{empreinte}'
+
+
+def etag_catalogue(cle, concours_inscrits):
+    """ETag fort d'une page du catalogue pour un utilisateur"""
+    empreinte = hashlib.sha256(
+        f'{cle}:{sorted(concours_inscrits)}'.encode()
+    ).hexdigest()
+    
+    return f'"{empreinte}"'
@@ -0,0 +1,28 @@
+"""
+Événements de la file de revue
+
+Publiés après commit à la création d'une inscription ou d'un paiement et à
+chaque changement de statut, pour les administrateurs abonnés au flux
+`/api/admin/revision/flux/`.
+"""
+from core.evenements import publier_apres_commit
+
+CANAL_REVUE = 'revue'
+
+
+def publier_revue(objet, action, ids, statut):
+    """
+    Args:
+        objet: 'inscription' ou 'paiement'
+        action: 'creation' ou 'statut'
+        ids: Identifiants concernés
+        statut: Nouveau statut
+    """
+    ids = list(ids)
+    if ids:
+        publier_apres_commit(CANAL_REVUE, {
+            'objet': objet,
+            'action': action,
+            'ids': ids,
+            'statut': statut,
+        })
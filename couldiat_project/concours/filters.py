@@ -0,0 +1,66 @@
+"""
+Filtres pour l'application Concours
+"""
+import re
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db import connection
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast, Greatest
+from rest_framework import filters
+
+
+class ConcoursSearchFilter(filters.SearchFilter):
+    """
+    Recherche plein texte PostgreSQL sur les concours (paramètre `?search=`)
+    
+    - Index `tsvector` (nom, lieu, description) avec la configuration
+      `french_unaccent` : insensible aux accents, racinisation française,
+      correspondance sur les préfixes des mots
+    - Résultats classés par pertinence (`ts_rank`)
+    - Si la recherche plein texte ne trouve rien, repli trigramme sur `nom`
+      et `lieu` pour tolérer les fautes de frappe, classé par similarité
+    
+    Hors PostgreSQL, le filtre se comporte comme SearchFilter (`search_fields`).
+    """
+    
+    config = 'french_unaccent'
+    
+    def filter_queryset(self, request, queryset, view):
+        if connection.vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+        
+        mots = re.findall(r'\w+', ' '.join(self.get_search_terms(request)))
+        if not mots:
+            return queryset
+        
+        terme = ' '.join(mots)
+        query = SearchQuery(
+            ' & '.join(f'{mot}:*' for mot in mots),
+            config=self.config,
+            search_type='raw'
+        )
+        
+        resultats = queryset.filter(search_vector=query)
+        if resultats.exists():
+            # Cast en double precision : valeur exacte dans le curseur de pagination
+            return resultats.annotate(
+                rang=Cast(SearchRank(F('search_vector'), query), FloatField())
+            ).order_by('-rang', '-created_at')
+        
+        # Aucun résultat plein texte : repli trigramme (fautes de frappe)
+        return queryset.annotate(
+            similarite=Cast(
+                Greatest(
+                    TrigramWordSimilarity(terme, 'nom'),
+                    TrigramWordSimilarity(terme, 'lieu'),
+                ),
+                FloatField()
+            ),
+        ).filter(
+            Q(nom__trigram_word_similar=terme) | Q(lieu__trigram_word_similar=terme)
+        ).order_by('-similarite', '-created_at')
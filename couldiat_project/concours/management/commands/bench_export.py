@@ -0,0 +1,112 @@
+"""
+Benchmark de l'export en flux des inscriptions d'un concours
+Usage: python manage.py bench_export [--rows 1000000]
+
+Les candidats et inscriptions synthétiques sont insérés en SQL
+(generate_series) dans une transaction annulée à la fin.
+"""
+import resource
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from concours.export import FORMATS, exporter_inscriptions
+from concours.models import Concours
+
+
+class Command(BaseCommand):
+    help = 'Mesurer le débit et la mémoire de l\'export CSV/XLSX des inscriptions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            concours = self.generer_inscriptions(options['rows'])
+            
+            for format_export in FORMATS:
+                memoire_avant = self.memoire_max()
+                debut = time.perf_counter()
+                premier_octet = None
+                taille = 0
+                
+                _, contenu = exporter_inscriptions(concours.pk, format_export)
+                for morceau in contenu:
+                    if premier_octet is None:
+                        premier_octet = time.perf_counter() - debut
+                    taille += len(morceau)
+                
+                duree = time.perf_counter() - debut
+                self.stdout.write(
+                    f'{format_export:5} {options["rows"]} lignes en {duree:6.1f} s '
+                    f'({options["rows"] / duree:8.0f} lignes/s)   '
+                    f'premier octet: {premier_octet * 1000:5.0f} ms   '
+                    f'fichier: {taille / (1024 * 1024):6.1f} Mo   '
+                    f'pic mémoire: +{self.memoire_max() - memoire_avant:.1f} Mo'
+                )
+            
+            transaction.set_rollback(True)
+        
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark terminé'))
+
+    def memoire_max(self):
+        """Pic de mémoire résidente du processus (Mo)"""
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    def generer_inscriptions(self, nombre):
+        self.stdout.write(f'Création de {nombre} inscriptions synthétiques...')
+        today = timezone.now().date()
+        concours = Concours.objects.create(
+            nom='Concours benchmark export',
+            type='Direct',
+            description='Benchmark',
+            date_inscription=today,
+            date_concours=today,
+            lieu='Ouagadougou',
+            frais_inscription=5000,
+            places_disponibles=nombre,
+        )
+        
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COALESCE(MAX(id), 0) FROM accounts_user')
+            premier = cursor.fetchone()[0] + 1
+            cursor.execute('''
+                INSERT INTO accounts_user (
+                    id, password, is_superuser, first_name, last_name, is_staff,
+                    is_active, date_joined, email, nom, prenom, telephone,
+                    is_admin, created_at, updated_at
+                )
+                SELECT i, '!', false, '', '', false, true, now(),
+                       'bench' || i || '@example.com', 'Nom ' || i, 'Prénom', '70000000',
+                       false, now(), now()
+                FROM generate_series(%s, %s) AS i
+            ''', [premier, premier + nombre - 1])
+            cursor.execute('''
+                INSERT INTO concours_inscription (
+                    user_id, concours_id, nom, prenom, date_naissance, ville, sexe,
+                    cni, photo, telephone, statut, numero_inscription,
+                    created_at, updated_at
+                )
+                SELECT i, %s, 'Nom ' || i, 'Prénom', DATE '2000-01-01', 'Ouagadougou',
+                       CASE WHEN i %% 2 = 0 THEN 'F' ELSE 'M' END,
+                       'inscriptions/cni/cni.pdf', 'inscriptions/photos/photo.jpg', '70000000',
+                       CASE WHEN i %% 3 = 0 THEN 'confirmee' ELSE 'en_attente' END,
+                       CASE WHEN i %% 3 = 0 THEN 'BENCH-' || i END,
+                       now(), now()
+                FROM generate_series(%s, %s) AS i
+            ''', [concours.pk, premier, premier + nombre - 1])
+            cursor.execute('''
+                INSERT INTO concours_paiement (
+                    inscription_id, methode_paiement, reference_transaction, montant,
+                    capture_ecran, statut, created_at, updated_at
+                )
+                SELECT id, 'orange_money', 'OM' || id, 5000,
+                       'paiements/preuves/preuve.jpg', 'valide', now(), now()
+                FROM concours_inscription
+                WHERE concours_id = %s AND id %% 2 = 0
+            ''', [concours.pk])
+            cursor.execute('ANALYZE accounts_user, concours_inscription, concours_paiement')
+        
+        return concours
@@ -0,0 +1,73 @@
+"""
+Benchmark de la normalisation des images (WebP + miniature)
+Usage: python manage.py bench_images [--images 24] [--workers 1 2 4]
+
+Les images synthétiques imitent des photos de téléphone (4032x3024, EXIF).
+"""
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from core.images import normaliser_image
+
+
+class Command(BaseCommand):
+    help = 'Mesurer le débit de la normalisation des images par nombre de threads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--images', type=int, default=24)
+        parser.add_argument('--largeur', type=int, default=4032)
+        parser.add_argument('--hauteur', type=int, default=3024)
+        parser.add_argument(
+            '--workers',
+            type=int,
+            nargs='+',
+            default=sorted({1, 2, os.cpu_count() or 1})
+        )
+
+    def handle(self, *args, **options):
+        images = self.generer_images(options['images'], options['largeur'], options['hauteur'])
+        taille_moyenne = sum(len(image) for image in images) / len(images) / (1024 * 1024)
+        self.stdout.write(
+            f'{len(images)} JPEG de {options["largeur"]}x{options["hauteur"]} '
+            f'({taille_moyenne:.1f} Mo en moyenne), {os.cpu_count()} cœurs'
+        )
+        
+        for workers in options['workers']:
+            debut = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                resultats = list(executor.map(
+                    lambda contenu: normaliser_image(io.BytesIO(contenu)), images
+                ))
+            duree = time.perf_counter() - debut
+            
+            sortie = sum(len(image) for image, _ in resultats) / len(resultats) / 1024
+            debit = len(images) / duree
+            self.stdout.write(
+                f'{workers:3} threads : {debit:6.1f} images/s   '
+                f'{debit / min(workers, os.cpu_count() or 1):6.1f} images/s/cœur   '
+                f'WebP moyen {sortie:.0f} Ko'
+            )
+        
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark terminé'))
+
+    def generer_images(self, nombre, largeur, hauteur):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientation : photo prise en portrait
+        exif[0x010F] = 'Téléphone'
+        
+        # Bruit + dégradé : compressibilité proche d'une vraie photo
+        bruit = Image.effect_noise((largeur, hauteur), 40).convert('RGB')
+        degrade = Image.linear_gradient('L').resize((largeur, hauteur)).convert('RGB')
+        base = Image.blend(bruit, degrade, 0.5)
+        
+        images = []
+        for i in range(nombre):
+            sortie = io.BytesIO()
+            base.rotate(i % 4 * 90, expand=False).save(sortie, 'JPEG', quality=92, exif=exif)
+            images.append(sortie.getvalue())
+        return images
@@ -0,0 +1,128 @@
+"""
+Benchmark du débit de création d'inscriptions sous clients concurrents
+Usage: python manage.py bench_inscriptions [--clients 16] [--inscriptions 4000] [--doublons 0.1]
+
+Chaque client est un thread avec sa propre connexion, qui appelle la vue
+create_inscription (sérialiseur, validation, insertion) avec des documents
+déjà téléversés, distincts pour chaque candidat (un jeton ne sert qu'une
+fois). Une part des requêtes est renvoyée pour mesurer le chemin des
+doublons. Les données créées sont supprimées à la fin.
+"""
+import threading
+import time
+from datetime import date, timedelta
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models.signals import post_save
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from accounts.models import User
+from core.uploads import creer_jeton
+from concours.models import Concours, Inscription
+from concours.signals import normaliser_photo_inscription
+from concours.views import create_inscription
+
+
+class Command(BaseCommand):
+    help = 'Mesurer le nombre d\'inscriptions créées par seconde sous clients concurrents'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=16)
+        parser.add_argument('--inscriptions', type=int, default=4000)
+        parser.add_argument(
+            '--doublons',
+            type=float,
+            default=0.1,
+            help='Part des requêtes renvoyées une seconde fois (défaut: 0.1)'
+        )
+    
+    def handle(self, *args, **options):
+        nombre = options['inscriptions']
+        concours = Concours.objects.create(
+            nom='Concours benchmark',
+            type='Direct',
+            description='Benchmark',
+            date_inscription=date.today() + timedelta(days=30),
+            date_concours=date.today() + timedelta(days=60),
+            lieu='Ouagadougou',
+            frais_inscription=5000,
+            places_disponibles=nombre,
+        )
+        users = User.objects.bulk_create([
+            User(email=f'bench-inscription-{i}@example.com', nom='Bench', prenom='Candidat')
+            for i in range(nombre)
+        ])
+        fichiers = []
+        
+        factory = APIRequestFactory()
+        requetes = []
+        pas_doublon = round(1 / options['doublons']) if options['doublons'] else 0
+        for i, user in enumerate(users):
+            cni = default_storage.save('inscriptions/cni/bench.pdf', ContentFile(b'%PDF-1.4 bench'))
+            photo = default_storage.save('inscriptions/photos/bench.jpg', ContentFile(b'\xff\xd8\xff bench'))
+            fichiers += [cni, photo]
+            corps = {
+                'concours_id': concours.pk,
+                'nom': 'Bench',
+                'prenom': 'Candidat',
+                'date_naissance': '2000-01-01',
+                'ville': 'Ouagadougou',
+                'sexe': 'F',
+                'telephone': '70000000',
+                'cni_televersement': creer_jeton(user, 'cni', cni),
+                'photo_televersement': creer_jeton(user, 'photo', photo),
+            }
+            requetes.append((user, corps))
+            if pas_doublon and i % pas_doublon == 0:
+                requetes.append((user, corps))
+        
+        statuts = []
+        verrou = threading.Lock()
+        
+        def client(lot):
+            resultats = []
+            try:
+                for user, corps in lot:
+                    request = factory.post('/concours/inscriptions/create/', corps, format='json')
+                    force_authenticate(request, user=user)
+                    try:
+                        resultats.append(create_inscription(request).status_code)
+                    except Exception:
+                        resultats.append(500)
+            finally:
+                connection.close()
+            with verrou:
+                statuts.extend(resultats)
+        
+        # La normalisation des photos est asynchrone : elle n'est pas mesurée ici
+        post_save.disconnect(normaliser_photo_inscription, sender=Inscription)
+        try:
+            clients = [
+                threading.Thread(target=client, args=(requetes[i::options['clients']],))
+                for i in range(options['clients'])
+            ]
+            debut = time.perf_counter()
+            for thread in clients:
+                thread.start()
+            for thread in clients:
+                thread.join()
+            duree = time.perf_counter() - debut
+        finally:
+            post_save.connect(normaliser_photo_inscription, sender=Inscription)
+            concours.delete()
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+            for nom in fichiers:
+                default_storage.delete(nom)
+        
+        creees = statuts.count(201)
+        refusees = statuts.count(400)
+        erreurs = statuts.count(500)
+        self.stdout.write(
+            f'{options["clients"]} clients : {len(statuts)} requêtes en {duree:.1f} s, '
+            f'{creees} créées ({creees / duree:.0f} inscriptions/s), {refusees} doublons refusés, '
+            f'{erreurs} erreurs, {len(statuts) / duree:.0f} requêtes/s'
+        )
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark terminé'))
@@ -0,0 +1,105 @@
+"""
+Benchmark de la pagination : curseur (keyset) vs numéro de page (OFFSET/COUNT)
+Usage: python manage.py bench_pagination [--page-size 10] [--pages 10000] [--repeat 10]
+
+Les concours synthétiques sont créés dans une transaction annulée à la fin.
+"""
+import statistics
+import time
+from urllib.parse import parse_qs, urlparse
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from concours.models import Concours
+from core.pagination import KeysetPagination
+
+
+class Command(BaseCommand):
+    help = 'Mesurer la latence d\'une page de la page 1 à la page N (curseur vs OFFSET)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=10)
+        parser.add_argument('--pages', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=10)
+
+    @override_settings(ALLOWED_HOSTS=['testserver'])
+    def handle(self, *args, **options):
+        page_size = options['page_size']
+        pages = options['pages']
+        
+        with transaction.atomic():
+            self.generer_concours(page_size * pages)
+            
+            numero = 1
+            while numero <= pages:
+                curseur = self.mesurer_curseur(numero, page_size, options['repeat'])
+                offset = self.mesurer_offset(numero, page_size, options['repeat'])
+                self.stdout.write(
+                    f'page {numero:>6}   curseur: {curseur:7.2f} ms   OFFSET/COUNT: {offset:8.2f} ms'
+                )
+                numero *= 10
+            
+            transaction.set_rollback(True)
+
+    def generer_concours(self, nombre):
+        self.stdout.write(f'Création de {nombre} concours synthétiques...')
+        today = timezone.now().date()
+        
+        for debut in range(0, nombre, 5000):
+            Concours.objects.bulk_create([
+                Concours(
+                    nom=f'Concours {i}',
+                    type='Direct',
+                    description='Concours synthétique',
+                    date_inscription=today,
+                    date_concours=today,
+                    lieu='Ouagadougou',
+                    frais_inscription=5000,
+                    places_disponibles=100,
+                )
+                for i in range(debut, min(debut + 5000, nombre))
+            ])
+        
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE concours_concours')
+
+    def requete(self, **params):
+        return Request(APIRequestFactory().get('/concours/', params))
+
+    def mesurer_curseur(self, numero, page_size, repetitions):
+        """Temps médian (ms) pour lire la page `numero` avec le curseur qui y mène"""
+        params = {'page_size': page_size}
+        
+        if numero > 1:
+            # Curseur de la page précédente, calculé hors mesure
+            paginator = KeysetPagination()
+            paginator.paginate_queryset(Concours.objects.all(), self.requete(**params))
+            dernier = Concours.objects.order_by('-created_at', '-id')[(numero - 1) * page_size - 1]
+            lien = paginator.encode_cursor(dernier, reverse=False)
+            params['cursor'] = parse_qs(urlparse(lien).query)['cursor'][0]
+        
+        return self.chronometrer(KeysetPagination, params, repetitions)
+
+    def mesurer_offset(self, numero, page_size, repetitions):
+        """Temps médian (ms) pour lire la page `numero` avec PageNumberPagination"""
+        class Pagination(PageNumberPagination):
+            page_size_query_param = 'page_size'
+        
+        return self.chronometrer(Pagination, {'page_size': page_size, 'page': numero}, repetitions)
+
+    def chronometrer(self, pagination_class, params, repetitions):
+        durees = []
+        
+        for _ in range(repetitions):
+            request = self.requete(**params)
+            debut = time.perf_counter()
+            pagination_class().paginate_queryset(Concours.objects.all(), request)
+            durees.append((time.perf_counter() - debut) * 1000)
+        
+        return statistics.median(durees)
@@ -0,0 +1,99 @@
+"""
+Benchmark de la recherche du catalogue : plein texte PostgreSQL vs ICONTAINS
+Usage: python manage.py bench_search [--rows 100000] [--repeat 20]
+
+Les concours synthétiques sont créés dans une transaction annulée à la fin.
+"""
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework import filters
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from concours.filters import ConcoursSearchFilter
+from concours.models import Concours
+from concours.views import ConcoursListView
+
+MOTS = [
+    'inspecteur', 'contrôleur', 'trésor', 'impôts', 'douanes', 'enseignant',
+    'infirmier', 'ingénieur', 'statistiques', 'agriculture', 'santé', 'police',
+    'greffier', 'magistrat', 'professeur', 'technicien', 'administrateur',
+]
+VILLES = [
+    'Ouagadougou', 'Bobo-Dioulasso', 'Koudougou', 'Ouahigouya', 'Banfora',
+    'Dédougou', 'Kaya', 'Tenkodogo', 'Fada N\'Gourma', 'Dori',
+]
+TERMES = ['ingenieur', 'tresor', 'ouaga', 'Koudugou', 'controleur impots', 'police kaya']
+
+
+class Command(BaseCommand):
+    help = 'Comparer la recherche plein texte et SearchFilter (ICONTAINS) sur des concours synthétiques'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.generer_concours(options['rows'])
+            
+            for terme in TERMES:
+                icontains = self.mesurer(filters.SearchFilter(), terme, options['repeat'])
+                plein_texte = self.mesurer(ConcoursSearchFilter(), terme, options['repeat'])
+                self.stdout.write(
+                    f'{terme!r:22} ICONTAINS: {icontains:8.2f} ms   '
+                    f'plein texte: {plein_texte:8.2f} ms   '
+                    f'(x{icontains / plein_texte:.1f})'
+                )
+            
+            transaction.set_rollback(True)
+
+    def generer_concours(self, nombre):
+        self.stdout.write(f'Création de {nombre} concours synthétiques...')
+        aleatoire = random.Random(42)
+        today = timezone.now().date()
+        
+        lot = []
+        for i in range(nombre):
+            intitule = ' '.join(aleatoire.sample(MOTS, 3))
+            ville = aleatoire.choice(VILLES)
+            lot.append(Concours(
+                nom=f'{intitule.capitalize()} {i}',
+                type=aleatoire.choice(['Direct', 'Professionnel']),
+                description=f'Recrutement de {intitule} pour la région de {ville}. '
+                            + ' '.join(aleatoire.sample(MOTS, 8)),
+                date_inscription=today,
+                date_concours=today,
+                lieu=ville,
+                frais_inscription=5000,
+                places_disponibles=100,
+            ))
+            
+            if len(lot) == 5000:
+                Concours.objects.bulk_create(lot)
+                lot = []
+        
+        Concours.objects.bulk_create(lot)
+        
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE concours_concours')
+
+    def mesurer(self, backend, terme, repetitions):
+        """Temps médian (ms) pour compter les résultats et lire la première page"""
+        request = Request(APIRequestFactory().get('/concours/', {'search': terme}))
+        view = ConcoursListView()
+        durees = []
+        
+        for _ in range(repetitions):
+            debut = time.perf_counter()
+            queryset = backend.filter_queryset(request, Concours.objects.all(), view)
+            queryset.count()
+            list(queryset[:50])
+            durees.append((time.perf_counter() - debut) * 1000)
+        
+        return statistics.median(durees)
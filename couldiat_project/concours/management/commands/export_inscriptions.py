@@ -0,0 +1,42 @@
+"""
+Commande pour exporter les inscriptions d'un concours en CSV ou XLSX
+Usage: python manage.py export_inscriptions <concours_id> [--fichier xlsx] [--output inscriptions.xlsx]
+"""
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from concours.export import FORMATS, exporter_inscriptions
+from concours.models import Concours
+
+
+class Command(BaseCommand):
+    help = 'Exporter en flux les inscriptions d\'un concours (avec statut du paiement)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('concours_id', type=int)
+        parser.add_argument('--fichier', choices=list(FORMATS), default='csv')
+        parser.add_argument('--statut', help='Ne garder que les inscriptions de ce statut')
+        parser.add_argument('--output', help='Fichier de sortie (défaut: sortie standard)')
+
+    def handle(self, *args, **options):
+        if not Concours.objects.filter(id=options['concours_id']).exists():
+            raise CommandError(f'Concours {options["concours_id"]} introuvable')
+        
+        _, contenu = exporter_inscriptions(
+            options['concours_id'], options['fichier'], statut=options['statut']
+        )
+        
+        sortie = open(options['output'], 'wb') if options['output'] else sys.stdout.buffer
+        taille = 0
+        try:
+            for morceau in contenu:
+                sortie.write(morceau)
+                taille += len(morceau)
+        finally:
+            if options['output']:
+                sortie.close()
+        
+        if options['output']:
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ Export écrit dans {options["output"]} ({taille / 1024:.0f} Ko)'
+            ))
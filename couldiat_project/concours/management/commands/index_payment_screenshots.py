@@ -0,0 +1,54 @@
+"""
+Commande pour calculer l'empreinte des captures de paiement déjà enregistrées
+Usage: python manage.py index_payment_screenshots [--taille-lot 500]
+
+Les nouvelles captures sont indexées lors de leur normalisation ; cette
+commande traite celles qui l'ont été avant, puis signale les doublons.
+L'empreinte est calculée après la même préparation (orientation EXIF,
+RGB, dimensions) que les nouvelles captures, pour être comparable.
+"""
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from core.images import empreinte_image, image_normalisee
+from concours.models import Paiement
+
+
+class Command(BaseCommand):
+    help = 'Indexer les captures de paiement sans empreinte et signaler les captures réutilisées'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--taille-lot', type=int, default=500)
+    
+    def handle(self, *args, **options):
+        a_indexer = Paiement.objects.filter(empreinte_capture__isnull=True).exclude(capture_ecran='')
+        
+        indexees = erreurs = 0
+        dernier = 0
+        while True:
+            lot = list(
+                a_indexer.filter(pk__gt=dernier).order_by('pk')
+                .values_list('pk', 'capture_ecran')[:options['taille_lot']]
+            )
+            if not lot:
+                break
+            dernier = lot[-1][0]
+            
+            for pk, nom in lot:
+                try:
+                    with default_storage.open(nom, 'rb') as fichier:
+                        empreinte = empreinte_image(fichier)
+                except (OSError, ValueError, Image.DecompressionBombError):
+                    erreurs += 1
+                    continue
+                
+                Paiement.objects.filter(pk=pk).update(empreinte_capture=empreinte)
+                image_normalisee.send(sender=Paiement, pk=pk, champ='capture_ecran', empreinte=empreinte)
+                indexees += 1
+        
+        signalees = Paiement.objects.filter(capture_similaire__isnull=False).count()
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {indexees} captures indexées ({erreurs} illisibles), '
+            f'{signalees} paiements avec une capture similaire'
+        ))
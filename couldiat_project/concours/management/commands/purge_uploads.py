@@ -0,0 +1,35 @@
+"""
+Commande pour supprimer les téléversements par blocs abandonnés
+Usage: python manage.py purge_uploads [--heures 24]
+"""
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from concours.models import Televersement
+
+
+class Command(BaseCommand):
+    help = 'Supprimer les téléversements par blocs non terminés et leurs blocs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--heures',
+            type=int,
+            default=24,
+            help='Âge minimum des téléversements à supprimer (défaut: 24)'
+        )
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(hours=options['heures'])
+        abandonnes = Televersement.objects.filter(termine=False, updated_at__lt=limite)
+        
+        total = 0
+        for televersement in abandonnes.iterator():
+            for index in televersement.blocs_recus():
+                default_storage.delete(televersement.chemin_bloc(index))
+            televersement.delete()
+            total += 1
+        
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} téléversements abandonnés supprimés'))
@@ -0,0 +1,15 @@
+"""
+Commande pour recalculer les compteurs de places des concours
+Usage: python manage.py rebuild_seat_counters
+"""
+from django.core.management.base import BaseCommand
+from concours.models import Concours
+
+
+class Command(BaseCommand):
+    help = 'Recalculer les compteurs d\'inscrits confirmés depuis la table des inscriptions'
+
+    def handle(self, *args, **options):
+        total = Concours.objects.recalculer_inscrits()
+        
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} compteurs de places recalculés'))
@@ -0,0 +1,59 @@
+"""
+Commande pour rapprocher un relevé d'opérateur avec les paiements en attente
+Usage: python manage.py reconcile_payments <releve.csv> --operateur orange_money [--fenetre 3] [--simulation]
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from concours.models import Paiement
+from concours.rapprochement import FENETRE_JOURS, ReleveInvalide, rapprocher
+
+
+class Command(BaseCommand):
+    help = 'Valider les paiements présents dans un relevé Orange Money / Moov Money'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('releve', help='Relevé CSV de l\'opérateur')
+        parser.add_argument(
+            '--operateur',
+            required=True,
+            choices=[methode for methode, _ in Paiement.METHODE_CHOICES]
+        )
+        parser.add_argument(
+            '--fenetre',
+            type=int,
+            default=FENETRE_JOURS,
+            help=f'Écart maximal en jours entre relevé et soumission (défaut: {FENETRE_JOURS})'
+        )
+        parser.add_argument(
+            '--simulation',
+            action='store_true',
+            help='Afficher le résultat sans rien enregistrer'
+        )
+    
+    def handle(self, *args, **options):
+        debut = time.perf_counter()
+        try:
+            with open(options['releve'], 'rb') as fichier:
+                resultat = rapprocher(
+                    fichier,
+                    options['operateur'],
+                    fenetre_jours=options['fenetre'],
+                    simulation=options['simulation']
+                )
+        except (OSError, ReleveInvalide) as e:
+            raise CommandError(str(e))
+        duree = time.perf_counter() - debut
+        
+        for anomalie in resultat['anomalies']:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  Paiement {anomalie["id"]} ({anomalie["reference"]}) : {anomalie["anomalie"]}'
+            ))
+        
+        prefixe = '[simulation] ' if options['simulation'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {prefixe}{resultat["lignes"]} lignes rapprochées en {duree:.1f} s : '
+            f'{len(resultat["valides"])} paiements validés, '
+            f'{len(resultat["anomalies"])} anomalies, '
+            f'{resultat["sans_correspondance"]} sans correspondance'
+        ))
@@ -0,0 +1,49 @@
+"""
+Commande pour lister les références de transaction déclarées plusieurs fois
+Usage: python manage.py scan_payment_duplicates [--inclure-rejetes]
+
+Les références partagées par des paiements non rejetés doivent être
+tranchées (rejet des paiements en trop) avant la migration
+concours.0014, qui rend la référence unique parmi ces paiements.
+Ensuite, seules les références reprises après un rejet restent
+possibles : elles sont listées avec --inclure-rejetes.
+"""
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from concours.models import Paiement
+
+
+class Command(BaseCommand):
+    help = 'Lister les paiements qui partagent une même référence de transaction'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--inclure-rejetes',
+            action='store_true',
+            help='Compter aussi les paiements rejetés'
+        )
+    
+    def handle(self, *args, **options):
+        paiements = Paiement.objects.exclude(reference_normalisee='')
+        if not options['inclure_rejetes']:
+            paiements = paiements.exclude(statut='rejete')
+        
+        # Parcours de l'index (methode_paiement, reference_normalisee)
+        collisions = paiements.values('methode_paiement', 'reference_normalisee').annotate(
+            total=Count('id'),
+            ids=ArrayAgg('id', ordering='id'),
+            statuts=ArrayAgg('statut', ordering='id'),
+        ).filter(total__gt=1).order_by('methode_paiement', 'reference_normalisee')
+        
+        total = 0
+        for collision in collisions.iterator():
+            total += 1
+            paiements_lies = ', '.join(
+                f'#{pk} ({statut})' for pk, statut in zip(collision['ids'], collision['statuts'])
+            )
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  {collision["methode_paiement"]} {collision["reference_normalisee"]} : {paiements_lies}'
+            ))
+        
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} références en double'))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:58
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def recalculer_inscrits(apps, schema_editor):
+    Concours = apps.get_model('concours', 'Concours')
+    Inscription = apps.get_model('concours', 'Inscription')
+
+    confirmees = Inscription.objects.filter(
+        concours=OuterRef('pk'),
+        statut='confirmee'
+    ).values('concours').annotate(total=Count('id')).values('total')
+
+    Concours.objects.update(inscrits_confirmes=Coalesce(Subquery(confirmees), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('concours', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='concours',
+            name='inscrits_confirmes',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Compteur maintenu lors de la validation des inscriptions', verbose_name='inscrits confirmés'),
+        ),
+        migrations.RunPython(recalculer_inscrits, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:00
+
+from django.db import migrations, models
+
+
+def initialiser_sequences(apps, schema_editor):
+    """Reprendre les compteurs depuis les numéros déjà attribués"""
+    Inscription = apps.get_model('concours', 'Inscription')
+    SequenceInscription = apps.get_model('concours', 'SequenceInscription')
+
+    derniers = {}
+    numeros = Inscription.objects.filter(
+        numero_inscription__startswith='INS-'
+    ).values_list('numero_inscription', flat=True)
+
+    for numero in numeros.iterator():
+        try:
+            _, annee, rang = numero.split('-')
+            annee, rang = int(annee), int(rang)
+        except ValueError:
+            continue
+        derniers[annee] = max(derniers.get(annee, 0), rang)
+
+    SequenceInscription.objects.bulk_create([
+        SequenceInscription(annee=annee, dernier_numero=dernier)
+        for annee, dernier in derniers.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('concours', '0002_concours_inscrits_confirmes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SequenceInscription',
+            fields=[
+                ('annee', models.PositiveIntegerField(primary_key=True, serialize=False, verbose_name='année')),
+                ('dernier_numero', models.PositiveIntegerField(default=0, verbose_name='dernier numéro attribué')),
+            ],
+            options={
+                'verbose_name': "séquence des numéros d'inscription",
+                'verbose_name_plural': "séquences des numéros d'inscription",
+            },
+        ),
+        migrations.RunPython(initialiser_sequences, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:04
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension, UnaccentExtension
+from django.db import migrations
+
+
+CREER_CONFIGURATION = """
+CREATE TEXT SEARCH CONFIGURATION french_unaccent (COPY = french);
+ALTER TEXT SEARCH CONFIGURATION french_unaccent
+    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, french_stem;
+"""
+
+SUPPRIMER_CONFIGURATION = "DROP TEXT SEARCH CONFIGURATION IF EXISTS french_unaccent;"
+
+CREER_TRIGGER = """
+CREATE FUNCTION concours_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('french_unaccent', coalesce(NEW.nom, '')), 'A') ||
+        setweight(to_tsvector('french_unaccent', coalesce(NEW.lieu, '')), 'B') ||
+        setweight(to_tsvector('french_unaccent', coalesce(NEW.description, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER concours_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF nom, lieu, description, search_vector
+    ON concours_concours
+    FOR EACH ROW EXECUTE FUNCTION concours_search_vector_update();
+
+UPDATE concours_concours SET search_vector = NULL;
+"""
+
+SUPPRIMER_TRIGGER = """
+DROP TRIGGER IF EXISTS concours_search_vector_trigger ON concours_concours;
+DROP FUNCTION IF EXISTS concours_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('concours', '0003_sequenceinscription'),
+    ]
+
+    operations = [
+        UnaccentExtension(),
+        TrigramExtension(),
+        migrations.RunSQL(CREER_CONFIGURATION, SUPPRIMER_CONFIGURATION),
+        migrations.AddField(
+            model_name='concours',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Maintenu par un trigger PostgreSQL (nom, lieu, description)', null=True, verbose_name='index de recherche'),
+        ),
+        migrations.RunSQL(CREER_TRIGGER, SUPPRIMER_TRIGGER),
+        migrations.AddIndex(
+            model_name='concours',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='concours_search_vector_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='concours',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['nom'], name='concours_nom_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='concours',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['lieu'], name='concours_lieu_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('concours', '0004_concours_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='concours',
+            index=models.Index(fields=['-created_at', '-id'], name='concours_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inscription',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='inscription_user_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inscription',
+            index=models.Index(fields=['statut', '-created_at', '-id'], name='inscription_statut_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paiement',
+            index=models.Index(fields=['statut', '-created_at', '-id'], name='paiement_statut_recent_idx'),
+        ),
+    ]
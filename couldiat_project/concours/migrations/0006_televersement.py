@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:24
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('concours', '0005_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Televersement',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('type_document', models.CharField(choices=[('cni', 'CNI'), ('photo', 'Photo'), ('capture_ecran', "Capture d'écran")], max_length=20, verbose_name='type de document')),
+                ('nom_fichier', models.CharField(max_length=255, verbose_name='nom du fichier')),
+                ('taille', models.PositiveBigIntegerField(help_text='Taille totale en octets', verbose_name='taille')),
+                ('sha256', models.CharField(blank=True, help_text="Empreinte du fichier complet, vérifiée à l'assemblage si fournie", max_length=64, verbose_name='empreinte SHA-256')),
+                ('cle', models.CharField(help_text='Clé de stockage du fichier assemblé', max_length=255, verbose_name='emplacement')),
+                ('termine', models.BooleanField(default=False, verbose_name='terminé')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='date de création')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='date de modification')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='televersements', to=settings.AUTH_USER_MODEL, verbose_name='utilisateur')),
+            ],
+            options={
+                'verbose_name': 'téléversement',
+                'verbose_name_plural': 'téléversements',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('concours', '0006_televersement'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inscription',
+            name='photo_miniature',
+            field=models.ImageField(blank=True, editable=False, help_text='Générée par la normalisation des images', null=True, upload_to='inscriptions/photos/miniatures/', verbose_name='miniature de la photo'),
+        ),
+        migrations.AddField(
+            model_name='paiement',
+            name='capture_ecran_miniature',
+            field=models.ImageField(blank=True, editable=False, help_text='Générée par la normalisation des images', null=True, upload_to='paiements/preuves/miniatures/', verbose_name='miniature de la capture'),
+        ),
+    ]
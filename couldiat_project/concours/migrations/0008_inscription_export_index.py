@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('concours', '0007_miniatures'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inscription',
+            index=models.Index(fields=['concours', 'id'], name='inscription_concours_id_idx'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('concours', '0008_inscription_export_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inscription',
+            name='reserve_jusqua',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name="réservé jusqu'à"),
+        ),
+        migrations.AddField(
+            model_name='inscription',
+            name='reserve_par',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='réservé par'),
+        ),
+        migrations.AddField(
+            model_name='inscription',
+            name='traite_le',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='traité le'),
+        ),
+        migrations.AddField(
+            model_name='inscription',
+            name='traite_par',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='traité par'),
+        ),
+        migrations.AddField(
+            model_name='paiement',
+            name='reserve_jusqua',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name="réservé jusqu'à"),
+        ),
+        migrations.AddField(
+            model_name='paiement',
+            name='reserve_par',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='réservé par'),
+        ),
+        migrations.AddField(
+            model_name='paiement',
+            name='traite_le',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='traité le'),
+        ),
+        migrations.AddField(
+            model_name='paiement',
+            name='traite_par',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='traité par'),
+        ),
+        migrations.AddIndex(
+            model_name='inscription',
+            index=models.Index(fields=['traite_le'], name='inscription_traite_le_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paiement',
+            index=models.Index(fields=['traite_le'], name='paiement_traite_le_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('concours', '0009_file_de_revue'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inscription',
+            index=models.Index(fields=['updated_at'], name='inscription_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paiement',
+            index=models.Index(fields=['updated_at'], name='paiement_updated_at_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 05:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('concours', '0010_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paiement',
+            name='anomalie_rapprochement',
+            field=models.CharField(blank=True, default='', help_text="Écart constaté avec le relevé de l'opérateur", max_length=255, verbose_name='anomalie de rapprochement'),
+        ),
+    ]
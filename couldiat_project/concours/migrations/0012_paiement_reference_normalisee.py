@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-17 05:06
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Func, Value
+from django.db.models.functions import Upper
+
+
+def normaliser_references(apps, schema_editor):
+    Paiement = apps.get_model('concours', 'Paiement')
+
+    # Même règle que concours.models.normaliser_reference
+    Paiement.objects.update(reference_normalisee=Func(
+        Upper('reference_transaction'), Value('[^0-9A-Z]'), Value(''), Value('g'),
+        function='REGEXP_REPLACE'
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('concours', '0011_paiement_anomalie_rapprochement'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paiement',
+            name='reference_normalisee',
+            field=models.CharField(default='', editable=False, help_text='Référence sans casse ni séparateurs, pour détecter les doublons', max_length=100, verbose_name='référence normalisée'),
+        ),
+        migrations.RunPython(normaliser_references, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='paiement',
+            index=models.Index(fields=['methode_paiement', 'reference_normalisee'], name='paiement_reference_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.7 on 2026-10-17 05:10
+
+import django.db.models.deletion
+import django.db.models.expressions
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('concours', '0012_paiement_reference_normalisee'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paiement',
+            name='capture_similaire',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Autre paiement dont la preuve est presque identique', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='concours.paiement', verbose_name='capture similaire'),
+        ),
+        migrations.AddField(
+            model_name='paiement',
+            name='distance_capture',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, help_text='Nombre de bits différents entre les empreintes (0 = identiques)', null=True, verbose_name='distance à la capture similaire'),
+        ),
+        migrations.AddField(
+            model_name='paiement',
+            name='empreinte_capture',
+            field=models.BigIntegerField(blank=True, editable=False, help_text='dHash 64 bits, calculé lors de la normalisation', null=True, verbose_name='empreinte de la capture'),
+        ),
+        migrations.AddIndex(
+            model_name='paiement',
+            index=models.Index(django.db.models.expressions.CombinedExpression(models.F('empreinte_capture'), '&', models.Value(65535)), name='paiement_empreinte_0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paiement',
+            index=models.Index(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('empreinte_capture'), '>>', models.Value(16)), '&', models.Value(65535)), name='paiement_empreinte_1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paiement',
+            index=models.Index(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('empreinte_capture'), '>>', models.Value(32)), '&', models.Value(65535)), name='paiement_empreinte_2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paiement',
+            index=models.Index(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('empreinte_capture'), '>>', models.Value(48)), '&', models.Value(65535)), name='paiement_empreinte_3_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-17 07:04
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def verifier_doublons(apps, schema_editor):
+    """
+    Refuser la migration tant que des paiements non rejetés partagent une
+    référence : les doublons sont tranchés par un administrateur, pas ici
+    """
+    Paiement = apps.get_model('concours', 'Paiement')
+
+    collisions = Paiement.objects.exclude(statut='rejete').exclude(reference_normalisee='').values(
+        'methode_paiement', 'reference_normalisee'
+    ).annotate(total=Count('id')).filter(total__gt=1).order_by().count()
+    if collisions:
+        raise RuntimeError(
+            f'{collisions} références de transaction sont déclarées par plusieurs paiements '
+            'non rejetés. Listez-les avec `manage.py scan_payment_duplicates` (ou le filtre '
+            '"référence en double" de l\'admin), rejetez les paiements en trop, puis relancez '
+            'la migration.'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('concours', '0013_paiement_empreinte_capture'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(verifier_doublons, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='paiement',
+            constraint=models.UniqueConstraint(condition=models.Q(models.Q(('statut', 'rejete'), _negated=True), models.Q(('reference_normalisee', ''), _negated=True)), fields=('methode_paiement', 'reference_normalisee'), name='paiement_reference_unique'),
+        ),
+    ]
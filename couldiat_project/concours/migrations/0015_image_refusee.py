@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-17 07:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('concours', '0014_paiement_reference_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inscription',
+            name='photo_refusee',
+            field=models.CharField(blank=True, default='', editable=False, help_text="Fichier refusé par la normalisation des images, qui n'est plus retraité", max_length=255, verbose_name='photo refusée'),
+        ),
+        migrations.AddField(
+            model_name='paiement',
+            name='capture_ecran_refusee',
+            field=models.CharField(blank=True, default='', editable=False, help_text="Fichier refusé par la normalisation des images, qui n'est plus retraité", max_length=255, verbose_name='capture refusée'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-17 07:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('concours', '0015_image_refusee'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeleversementUtilise',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cle', models.CharField(max_length=255, unique=True, verbose_name='emplacement')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name="date d'utilisation")),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='utilisateur')),
+            ],
+            options={
+                'verbose_name': 'téléversement utilisé',
+                'verbose_name_plural': 'téléversements utilisés',
+            },
+        ),
+    ]
@@ -1,10 +1,85 @@
 """
 Modèles pour l'application Concours
 """
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models import Case, Count, Exists, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
 from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from datetime import datetime
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+import math
+import re
+import uuid
+
+from core.uploads import LecteurBlocs, LecteurLimite
+
+from .cache import invalider_catalogue
+from .evenements import publier_revue
+
+
+class ConcoursQuerySet(models.QuerySet):
+    """QuerySet pour les concours"""
+    
+    def avec_statistiques(self, user=None):
+        """
+        Annoter l'inscription de l'utilisateur à chaque concours
+        
+        Le nombre d'inscrits confirmés est stocké dans `inscrits_confirmes`,
+        il n'a donc pas besoin d'être annoté.
+        
+        Args:
+            user: Utilisateur pour lequel calculer `utilisateur_inscrit` (optionnel)
+        """
+        if user is None or not user.is_authenticated:
+            return self
+        
+        return self.annotate(
+            utilisateur_inscrit=Exists(
+                Inscription.objects.filter(concours=OuterRef('pk'), user=user)
+            )
+        )
+    
+    def recalculer_inscrits(self):
+        """Recalculer les compteurs d'inscrits confirmés depuis les inscriptions"""
+        confirmees = Inscription.objects.filter(
+            concours=OuterRef('pk'),
+            statut='confirmee'
+        ).values('concours').annotate(total=Count('id')).values('total')
+        
+        total = self.update(
+            inscrits_confirmes=Coalesce(Subquery(confirmees), 0)
+        )
+        invalider_catalogue()
+        return total
+    
+    def ajuster_inscrits(self, variations):
+        """
+        Appliquer des variations du compteur d'inscrits en une seule requête
+        
+        Args:
+            variations: dict {concours_id: variation (positive ou négative)}
+        """
+        variations = {pk: variation for pk, variation in variations.items() if variation}
+        if not variations:
+            return 0
+        
+        variation = Case(
+            *[When(pk=pk, then=Value(v)) for pk, v in variations.items()],
+            default=Value(0)
+        )
+        total = self.filter(pk__in=variations).update(
+            inscrits_confirmes=Greatest(F('inscrits_confirmes') + variation, 0)
+        )
+        
+        invalider_catalogue()
+        return total
 
 
 class Concours(models.Model):
@@ -32,6 +107,18 @@ class Concours(models.Model):
         help_text=_("Montant en FCFA")
     )
     places_disponibles = models.IntegerField(_('places disponibles'))
+    inscrits_confirmes = models.PositiveIntegerField(
+        _('inscrits confirmés'),
+        default=0,
+        editable=False,
+        help_text=_("Compteur maintenu lors de la validation des inscriptions")
+    )
+    search_vector = SearchVectorField(
+        _('index de recherche'),
+        null=True,
+        editable=False,
+        help_text=_("Maintenu par un trigger PostgreSQL (nom, lieu, description)")
+    )
     conditions = models.JSONField(
         _('conditions'),
         default=list,
@@ -48,10 +135,18 @@ class Concours(models.Model):
     created_at = models.DateTimeField(_('date de création'), auto_now_add=True)
     updated_at = models.DateTimeField(_('date de modification'), auto_now=True)
     
+    objects = ConcoursQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('concours')
         verbose_name_plural = _('concours')
         ordering = ['-created_at']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='concours_search_vector_gin'),
+            GinIndex(fields=['nom'], name='concours_nom_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['lieu'], name='concours_lieu_trgm', opclasses=['gin_trgm_ops']),
+            models.Index(fields=['-created_at', '-id'], name='concours_recent_idx'),
+        ]
     
     def __str__(self):
         return self.nom
@@ -59,20 +154,228 @@ class Concours(models.Model):
     @property
     def total_inscrits(self):
         """Nombre total d'inscrits confirmés"""
-        return self.inscriptions.filter(statut='confirmee').count()
+        return self.inscrits_confirmes
     
     @property
     def places_restantes(self):
         """Nombre de places restantes"""
-        return max(0, self.places_disponibles - self.total_inscrits)
+        return max(0, self.places_disponibles - self.inscrits_confirmes)
     
     @property
     def est_complet(self):
         """Vérifie si le concours est complet"""
         return self.places_restantes == 0
+    
+    def reserver_place(self):
+        """
+        Occuper une place de manière atomique
+        
+        L'UPDATE conditionnel garantit qu'aucun concours n'est surbooké,
+        même avec plusieurs validations concurrentes.
+        Retourne False si le concours est complet.
+        """
+        reserve = Concours.objects.filter(
+            pk=self.pk,
+            inscrits_confirmes__lt=F('places_disponibles')
+        ).update(inscrits_confirmes=F('inscrits_confirmes') + 1)
+        
+        if reserve:
+            invalider_catalogue()
+        
+        self.refresh_from_db(fields=['inscrits_confirmes'])
+        return reserve == 1
+    
+    def liberer_place(self):
+        """Libérer une place occupée par une inscription confirmée"""
+        Concours.objects.filter(
+            pk=self.pk,
+            inscrits_confirmes__gt=0
+        ).update(inscrits_confirmes=F('inscrits_confirmes') - 1)
+        
+        invalider_catalogue()
+        self.refresh_from_db(fields=['inscrits_confirmes'])
+
+
+class RevisionQuerySet(models.QuerySet):
+    """File de revue partagée entre administrateurs (inscriptions, paiements)"""
+    
+    def reserver(self, user, taille, duree=None):
+        """
+        Réserver les prochains éléments en attente pour un administrateur
+        
+        SKIP LOCKED écarte les lignes qu'une autre réservation est en train
+        de prendre ; la réservation elle-même est un bail (`reserve_jusqua`)
+        qui expire si l'administrateur ne traite pas les éléments.
+        
+        Args:
+            user: Administrateur qui réserve
+            taille: Nombre maximum d'éléments
+            duree: Durée du bail (défaut: DUREE_RESERVATION du modèle)
+        
+        Returns:
+            (liste des id réservés du plus ancien au plus récent, fin du bail)
+        """
+        maintenant = timezone.now()
+        expiration = maintenant + (duree or self.model.DUREE_RESERVATION)
+        
+        with transaction.atomic():
+            ids = list(
+                self.filter(statut='en_attente')
+                .filter(
+                    Q(reserve_jusqua__isnull=True)
+                    | Q(reserve_jusqua__lt=maintenant)
+                    | Q(reserve_par=user)
+                )
+                .order_by('created_at', 'id')
+                .select_for_update(skip_locked=True)
+                .values_list('pk', flat=True)[:taille]
+            )
+            self.model.objects.filter(pk__in=ids).update(
+                reserve_par=user,
+                reserve_jusqua=expiration
+            )
+        
+        return ids, expiration
+    
+    def marquer_traites(self, user):
+        """Libérer la réservation et enregistrer l'administrateur qui a traité"""
+        return self.update(
+            reserve_par=None,
+            reserve_jusqua=None,
+            traite_par=user,
+            traite_le=timezone.now()
+        )
+
+
+class RevisionMixin(models.Model):
+    """Champs de la file de revue : bail de réservation et traitement"""
+    
+    DUREE_RESERVATION = timedelta(minutes=10)
+    
+    reserve_par = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        verbose_name=_('réservé par')
+    )
+    reserve_jusqua = models.DateTimeField(_('réservé jusqu\'à'), null=True, blank=True, editable=False)
+    traite_par = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        verbose_name=_('traité par')
+    )
+    traite_le = models.DateTimeField(_('traité le'), null=True, blank=True, editable=False)
+    
+    class Meta:
+        abstract = True
+
+
+class InscriptionQuerySet(RevisionQuerySet):
+    """QuerySet pour les inscriptions"""
+    
+    def confirmer_en_lot(self):
+        """
+        Confirmer les inscriptions du queryset dans une seule transaction
+        
+        Les inscriptions puis les concours concernés sont verrouillés (dans
+        l'ordre des id, comme confirmer()), les places sont attribuées par
+        concours dans l'ordre des id, les numéros sont réservés en un bloc
+        et les lignes écrites avec bulk_update().
+        
+        Returns:
+            dict {id: (résultat, numero_inscription)} avec pour résultat
+            'confirmee', 'deja_confirmee' ou 'complet'
+        """
+        with transaction.atomic():
+            inscriptions = list(
+                self.select_for_update().order_by('pk').only(
+                    'id', 'concours_id', 'statut', 'numero_inscription'
+                )
+            )
+            
+            resultats = {}
+            par_concours = defaultdict(list)
+            for inscription in inscriptions:
+                if inscription.statut == 'confirmee':
+                    resultats[inscription.pk] = ('deja_confirmee', inscription.numero_inscription)
+                else:
+                    par_concours[inscription.concours_id].append(inscription)
+            
+            places_libres = dict(
+                Concours.objects.select_for_update().filter(pk__in=par_concours).order_by('pk')
+                .annotate(libres=F('places_disponibles') - F('inscrits_confirmes'))
+                .values_list('pk', 'libres')
+            )
+            
+            confirmees = []
+            variations = {}
+            for concours_id, groupe in par_concours.items():
+                libres = max(0, places_libres[concours_id])
+                confirmees += groupe[:libres]
+                variations[concours_id] = len(groupe[:libres])
+                for inscription in groupe[libres:]:
+                    resultats[inscription.pk] = ('complet', None)
+            
+            sans_numero = [i for i in confirmees if not i.numero_inscription]
+            if sans_numero:
+                numeros = SequenceInscription.allouer(len(sans_numero))
+                for inscription, numero in zip(sans_numero, numeros):
+                    inscription.numero_inscription = numero
+            
+            # bulk_update() ne passe pas par auto_now
+            maintenant = timezone.now()
+            for inscription in confirmees:
+                inscription.statut = 'confirmee'
+                inscription.updated_at = maintenant
+                resultats[inscription.pk] = ('confirmee', inscription.numero_inscription)
+            
+            self.model.objects.bulk_update(
+                confirmees, ['statut', 'numero_inscription', 'updated_at'], batch_size=1000
+            )
+            Concours.objects.ajuster_inscrits(variations)
+            publier_revue('inscription', 'statut', [i.pk for i in confirmees], 'confirmee')
+        
+        return resultats
+    
+    def rejeter_en_lot(self, raison_rejet):
+        """
+        Rejeter les inscriptions du queryset dans une seule transaction
+        
+        Les places des inscriptions qui étaient confirmées sont libérées.
+        
+        Returns:
+            dict {id: ('annulee', None)}
+        """
+        with transaction.atomic():
+            inscriptions = list(
+                self.select_for_update().order_by('pk').only('id', 'concours_id', 'statut')
+            )
+            
+            liberees = Counter(i.concours_id for i in inscriptions if i.statut == 'confirmee')
+            
+            maintenant = timezone.now()
+            for inscription in inscriptions:
+                inscription.statut = 'annulee'
+                inscription.raison_rejet = raison_rejet
+                inscription.updated_at = maintenant
+            
+            self.model.objects.bulk_update(
+                inscriptions, ['statut', 'raison_rejet', 'updated_at'], batch_size=1000
+            )
+            Concours.objects.ajuster_inscrits({pk: -n for pk, n in liberees.items()})
+            publier_revue('inscription', 'statut', [i.pk for i in inscriptions], 'annulee')
+        
+        return {inscription.pk: ('annulee', None) for inscription in inscriptions}
 
 
-class Inscription(models.Model):
+class Inscription(RevisionMixin):
     """Inscription d'un candidat à un concours"""
     
     STATUT_CHOICES = [
@@ -117,6 +420,22 @@ class Inscription(models.Model):
         _('photo d\'identité'),
         upload_to='inscriptions/photos/'
     )
+    photo_miniature = models.ImageField(
+        _('miniature de la photo'),
+        upload_to='inscriptions/photos/miniatures/',
+        null=True,
+        blank=True,
+        editable=False,
+        help_text=_("Générée par la normalisation des images")
+    )
+    photo_refusee = models.CharField(
+        _('photo refusée'),
+        max_length=255,
+        blank=True,
+        default='',
+        editable=False,
+        help_text=_("Fichier refusé par la normalisation des images, qui n'est plus retraité")
+    )
     
     # Contact (Étape 2)
     telephone = models.CharField(_('téléphone'), max_length=20)
@@ -144,11 +463,24 @@ class Inscription(models.Model):
     created_at = models.DateTimeField(_('date de création'), auto_now_add=True)
     updated_at = models.DateTimeField(_('date de modification'), auto_now=True)
     
+    objects = InscriptionQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('inscription')
         verbose_name_plural = _('inscriptions')
         unique_together = ['user', 'concours']
         ordering = ['-created_at']
+        indexes = [
+            # Pagination par curseur sur (created_at, id)
+            models.Index(fields=['user', '-created_at', '-id'], name='inscription_user_recent_idx'),
+            models.Index(fields=['statut', '-created_at', '-id'], name='inscription_statut_recent_idx'),
+            # Export en flux d'un concours dans l'ordre des id
+            models.Index(fields=['concours', 'id'], name='inscription_concours_id_idx'),
+            # Statistiques de revue par administrateur
+            models.Index(fields=['traite_le'], name='inscription_traite_le_idx'),
+            # Agrégation incrémentale des statistiques journalières
+            models.Index(fields=['updated_at'], name='inscription_updated_at_idx'),
+        ]
     
     def __str__(self):
         return f"{self.prenom} {self.nom} - {self.concours.nom}"
@@ -159,13 +491,42 @@ class Inscription(models.Model):
             self.numero_inscription = self.generer_numero_inscription()
         super().save(*args, **kwargs)
     
+    def confirmer(self):
+        """
+        Confirmer l'inscription en occupant une place du concours
+        Retourne False si le concours est complet
+        """
+        with transaction.atomic():
+            # Verrouiller l'inscription pour ne compter la place qu'une fois
+            statut_actuel = Inscription.objects.select_for_update().values_list(
+                'statut', flat=True
+            ).get(pk=self.pk)
+            
+            if statut_actuel != 'confirmee' and not self.concours.reserver_place():
+                return False
+            
+            self.statut = 'confirmee'
+            self.save()
+        
+        return True
+    
+    def rejeter(self, raison_rejet):
+        """Rejeter l'inscription et libérer sa place si elle était confirmée"""
+        with transaction.atomic():
+            statut_actuel = Inscription.objects.select_for_update().values_list(
+                'statut', flat=True
+            ).get(pk=self.pk)
+            
+            if statut_actuel == 'confirmee':
+                self.concours.liberer_place()
+            
+            self.statut = 'annulee'
+            self.raison_rejet = raison_rejet
+            self.save()
+    
     def generer_numero_inscription(self):
         """Génère un numéro unique : INS-YYYY-XXXXXX"""
-        year = datetime.now().year
-        count = Inscription.objects.filter(
-            numero_inscription__startswith=f'INS-{year}'
-        ).count() + 1
-        return f'INS-{year}-{count:06d}'
+        return SequenceInscription.allouer()[0]
     
     @property
     def a_paye(self):
@@ -173,7 +534,118 @@ class Inscription(models.Model):
         return hasattr(self, 'paiement') and self.paiement.statut == 'valide'
 
 
-class Paiement(models.Model):
+def normaliser_reference(reference):
+    """Référence sans casse ni séparateurs : ' om-123 456' -> 'OM123456'"""
+    return re.sub(r'[^0-9A-Z]', '', reference.upper())
+
+
+# Empreinte perceptuelle des captures (core.images.empreinte_perceptuelle) :
+# 4 bandes de 16 bits, chacune dans un index fonctionnel
+BANDES_EMPREINTE = 4
+BITS_BANDE = 16
+# Distance de Hamming maximale garantie par la recherche multi-index
+SEUIL_CAPTURE_SIMILAIRE = 7
+
+
+def bande_empreinte(index):
+    """Expression SQL de la bande `index` de l'empreinte (identique à celle de l'index)"""
+    expression = F('empreinte_capture')
+    if index:
+        expression = expression.bitrightshift(BITS_BANDE * index)
+    return expression.bitand((1 << BITS_BANDE) - 1)
+
+
+def distance_empreintes(a, b):
+    """Nombre de bits différents entre deux empreintes 64 bits"""
+    return ((a ^ b) & ((1 << 64) - 1)).bit_count()
+
+
+class PaiementQuerySet(RevisionQuerySet):
+    """QuerySet pour les paiements"""
+    
+    def captures_similaires(self, empreinte, seuil=SEUIL_CAPTURE_SIMILAIRE):
+        """
+        Paiements dont la capture est à `seuil` bits ou moins de l'empreinte
+        
+        Recherche multi-index : deux empreintes à 7 bits ou moins l'une de
+        l'autre ont au moins une bande de 16 bits identique à 1 bit près
+        (principe des tiroirs). Chaque bande est cherchée avec ses 17
+        variantes dans son index, puis la distance exacte est calculée sur
+        les quelques candidats.
+        
+        Returns:
+            Liste [(distance, pk)] triée par distance
+        """
+        seuil = min(seuil, SEUIL_CAPTURE_SIMILAIRE)
+        non_signee = empreinte & ((1 << 64) - 1)
+        
+        filtre = Q()
+        annotations = {}
+        for index in range(BANDES_EMPREINTE):
+            bande = (non_signee >> (BITS_BANDE * index)) & ((1 << BITS_BANDE) - 1)
+            variantes = [bande] + [bande ^ (1 << bit) for bit in range(BITS_BANDE)]
+            annotations[f'bande_{index}'] = bande_empreinte(index)
+            filtre |= Q(**{f'bande_{index}__in': variantes})
+        
+        candidats = self.annotate(**annotations).filter(filtre).values_list('pk', 'empreinte_capture')
+        return sorted(
+            (distance, pk)
+            for pk, autre in candidats
+            if (distance := distance_empreintes(empreinte, autre)) <= seuil
+        )
+    
+    def avec_reference(self, methode_paiement, reference):
+        """Paiements non rejetés déclarant cette référence (recherche indexée)"""
+        return self.filter(
+            methode_paiement=methode_paiement,
+            reference_normalisee=normaliser_reference(reference)
+        ).exclude(statut='rejete')
+    
+    def en_double(self):
+        """
+        Paiements dont la référence est déclarée par un autre paiement
+        
+        La contrainte paiement_reference_unique réserve la référence à un
+        seul paiement non rejeté : les doublons restants concernent un
+        paiement rejeté dont la référence a été resoumise.
+        """
+        autres = Paiement.objects.filter(
+            methode_paiement=OuterRef('methode_paiement'),
+            reference_normalisee=OuterRef('reference_normalisee')
+        ).exclude(pk=OuterRef('pk'))
+        return self.exclude(reference_normalisee='').filter(Exists(autres))
+    
+    def reference_reprise(self):
+        """Paiements rejetés dont la référence sert à un autre paiement non rejeté"""
+        autres = Paiement.objects.filter(
+            methode_paiement=OuterRef('methode_paiement'),
+            reference_normalisee=OuterRef('reference_normalisee')
+        ).exclude(pk=OuterRef('pk')).exclude(statut='rejete')
+        return self.filter(statut='rejete').exclude(reference_normalisee='').filter(Exists(autres))
+    
+    def changer_statut_en_lot(self, statut, raison_rejet=None):
+        """
+        Changer le statut des paiements du queryset en une seule requête
+        
+        Returns:
+            Liste des id modifiés
+        
+        Raises:
+            IntegrityError: Paiement rejeté rétabli alors que sa référence
+                sert déjà à un autre paiement (voir reference_reprise)
+        """
+        with transaction.atomic():
+            ids = list(self.select_for_update().order_by('pk').values_list('pk', flat=True))
+            champs = {'statut': statut, 'updated_at': timezone.now()}
+            if raison_rejet is not None:
+                champs['raison_rejet'] = raison_rejet
+            self.model.objects.filter(pk__in=ids).update(**champs)
+            publier_revue('paiement', 'statut', ids, statut)
+        
+        return ids
+
+
+class Paiement(RevisionMixin):
     """Paiement d'une inscription"""
     
     STATUT_CHOICES = [
@@ -202,12 +674,59 @@ class Paiement(models.Model):
         _('référence transaction'),
         max_length=100
     )
+    reference_normalisee = models.CharField(
+        _('référence normalisée'),
+        max_length=100,
+        editable=False,
+        default='',
+        help_text=_("Référence sans casse ni séparateurs, pour détecter les doublons")
+    )
     montant = models.IntegerField(_('montant'), help_text=_("Montant en FCFA"))
     capture_ecran = models.ImageField(
         _('capture d\'écran'),
         upload_to='paiements/preuves/',
         help_text=_("Preuve de paiement")
     )
+    capture_ecran_miniature = models.ImageField(
+        _('miniature de la capture'),
+        upload_to='paiements/preuves/miniatures/',
+        null=True,
+        blank=True,
+        editable=False,
+        help_text=_("Générée par la normalisation des images")
+    )
+    capture_ecran_refusee = models.CharField(
+        _('capture refusée'),
+        max_length=255,
+        blank=True,
+        default='',
+        editable=False,
+        help_text=_("Fichier refusé par la normalisation des images, qui n'est plus retraité")
+    )
+    empreinte_capture = models.BigIntegerField(
+        _('empreinte de la capture'),
+        null=True,
+        blank=True,
+        editable=False,
+        help_text=_("dHash 64 bits, calculé lors de la normalisation")
+    )
+    capture_similaire = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        verbose_name=_('capture similaire'),
+        help_text=_("Autre paiement dont la preuve est presque identique")
+    )
+    distance_capture = models.PositiveSmallIntegerField(
+        _('distance à la capture similaire'),
+        null=True,
+        blank=True,
+        editable=False,
+        help_text=_("Nombre de bits différents entre les empreintes (0 = identiques)")
+    )
     statut = models.CharField(
         _('statut'),
         max_length=20,
@@ -219,14 +738,279 @@ class Paiement(models.Model):
         null=True,
         blank=True
     )
+    anomalie_rapprochement = models.CharField(
+        _('anomalie de rapprochement'),
+        max_length=255,
+        blank=True,
+        default='',
+        help_text=_("Écart constaté avec le relevé de l'opérateur")
+    )
     
     created_at = models.DateTimeField(_('date de création'), auto_now_add=True)
     updated_at = models.DateTimeField(_('date de modification'), auto_now=True)
     
+    objects = PaiementQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('paiement')
         verbose_name_plural = _('paiements')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['statut', '-created_at', '-id'], name='paiement_statut_recent_idx'),
+            models.Index(fields=['traite_le'], name='paiement_traite_le_idx'),
+            models.Index(fields=['updated_at'], name='paiement_updated_at_idx'),
+            # Détection des références réutilisées
+            models.Index(fields=['methode_paiement', 'reference_normalisee'], name='paiement_reference_idx'),
+            # Recherche des captures similaires, une bande par index
+            *[
+                models.Index(bande_empreinte(index), name=f'paiement_empreinte_{index}_idx')
+                for index in range(BANDES_EMPREINTE)
+            ],
+        ]
+        constraints = [
+            # Une référence ne sert qu'à un paiement non rejeté, même sous requêtes concurrentes
+            models.UniqueConstraint(
+                fields=['methode_paiement', 'reference_normalisee'],
+                condition=~Q(statut='rejete') & ~Q(reference_normalisee=''),
+                name='paiement_reference_unique',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"Paiement {self.reference_transaction} - {self.get_statut_display()}"
+    
+    def clean(self):
+        """Référence déjà utilisée par un autre paiement non rejeté (formulaires)"""
+        super().clean()
+        if self.statut != 'rejete' and normaliser_reference(self.reference_transaction):
+            if Paiement.objects.avec_reference(
+                self.methode_paiement, self.reference_transaction
+            ).exclude(pk=self.pk).exists():
+                raise ValidationError({
+                    'reference_transaction': 'Cette référence de transaction a déjà été utilisée.'
+                })
+    
+    def save(self, *args, **kwargs):
+        self.reference_normalisee = normaliser_reference(self.reference_transaction)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'reference_transaction' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'reference_normalisee'}
+        super().save(*args, **kwargs)
+
+
+class SequenceInscription(models.Model):
+    """
+    Compteur annuel des numéros d'inscription
+    
+    Le compteur est incrémenté dans la transaction de l'appelant : la ligne
+    reste verrouillée jusqu'au commit, ce qui garantit des numéros uniques
+    et sans trou. Les validations en lot réservent un bloc de numéros en
+    une seule fois pour ne pas sérialiser chaque confirmation sur la ligne.
+    """
+    
+    annee = models.PositiveIntegerField(_('année'), primary_key=True)
+    dernier_numero = models.PositiveIntegerField(_('dernier numéro attribué'), default=0)
+    
+    class Meta:
+        verbose_name = _('séquence des numéros d\'inscription')
+        verbose_name_plural = _('séquences des numéros d\'inscription')
+    
+    def __str__(self):
+        return f"INS-{self.annee} ({self.dernier_numero})"
+    
+    @staticmethod
+    def formater(annee, numero):
+        """Formate un numéro d'inscription : INS-YYYY-XXXXXX"""
+        return f'INS-{annee}-{numero:06d}'
+    
+    @classmethod
+    def allouer(cls, quantite=1, annee=None):
+        """
+        Réserver un bloc de numéros d'inscription consécutifs
+        
+        Args:
+            quantite: Nombre de numéros à réserver (défaut: 1)
+            annee: Année des numéros (défaut: année en cours)
+        
+        Returns:
+            Liste des numéros formatés, dans l'ordre
+        """
+        annee = annee or datetime.now().year
+        
+        with transaction.atomic():
+            # L'UPDATE pose le verrou de ligne, la lecture suit dans la même transaction
+            if not cls.objects.filter(annee=annee).update(
+                dernier_numero=F('dernier_numero') + quantite
+            ):
+                cls.objects.get_or_create(annee=annee)
+                cls.objects.filter(annee=annee).update(
+                    dernier_numero=F('dernier_numero') + quantite
+                )
+            
+            dernier = cls.objects.values_list('dernier_numero', flat=True).get(annee=annee)
+        
+        premier = dernier - quantite + 1
+        return [cls.formater(annee, numero) for numero in range(premier, dernier + 1)]
+
+
+class Televersement(models.Model):
+    """
+    Téléversement d'un document par blocs, reprenable
+    
+    Chaque bloc est écrit dans le stockage sous `televersements/<id>/` dès sa
+    réception et contrôlé par son SHA-256 : après une coupure, le client
+    demande la liste des blocs reçus et n'envoie que les manquants. Les blocs
+    sont ensuite assemblés à l'emplacement définitif du document (`cle`).
+    """
+    
+    TAILLE_BLOC = 256 * 1024  # 256 Ko : un bloc perdu coûte peu en 2G/3G
+    
+    TYPE_CHOICES = [
+        ('cni', 'CNI'),
+        ('photo', 'Photo'),
+        ('capture_ecran', 'Capture d\'écran'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='televersements',
+        verbose_name=_('utilisateur')
+    )
+    type_document = models.CharField(_('type de document'), max_length=20, choices=TYPE_CHOICES)
+    nom_fichier = models.CharField(_('nom du fichier'), max_length=255)
+    taille = models.PositiveBigIntegerField(_('taille'), help_text=_("Taille totale en octets"))
+    sha256 = models.CharField(
+        _('empreinte SHA-256'),
+        max_length=64,
+        blank=True,
+        help_text=_("Empreinte du fichier complet, vérifiée à l'assemblage si fournie")
+    )
+    cle = models.CharField(_('emplacement'), max_length=255, help_text=_("Clé de stockage du fichier assemblé"))
+    termine = models.BooleanField(_('terminé'), default=False)
+    
+    created_at = models.DateTimeField(_('date de création'), auto_now_add=True)
+    updated_at = models.DateTimeField(_('date de modification'), auto_now=True)
+    
+    class Meta:
+        verbose_name = _('téléversement')
+        verbose_name_plural = _('téléversements')
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.nom_fichier} ({self.get_type_document_display()})"
+    
+    @property
+    def nombre_blocs(self):
+        return max(1, math.ceil(self.taille / self.TAILLE_BLOC))
+    
+    @property
+    def dossier_blocs(self):
+        return f'televersements/{self.pk}/'
+    
+    def chemin_bloc(self, index):
+        return f'{self.dossier_blocs}{index:05d}'
+    
+    def taille_bloc(self, index):
+        """Taille attendue du bloc `index` (le dernier peut être plus court)"""
+        return min(self.TAILLE_BLOC, self.taille - index * self.TAILLE_BLOC)
+    
+    def blocs_recus(self):
+        """Indices des blocs déjà reçus, triés"""
+        try:
+            dossiers, fichiers = default_storage.listdir(self.dossier_blocs)
+        except FileNotFoundError:
+            return []
+        return sorted(int(nom) for nom in fichiers if nom.isdigit())
+    
+    def ecrire_bloc(self, index, flux, longueur, sha256):
+        """
+        Écrire un bloc dans le stockage en le lisant par morceaux
+        
+        Args:
+            index: Position du bloc (à partir de 0)
+            flux: Corps de la requête
+            longueur: Content-Length annoncé
+            sha256: Empreinte hexadécimale attendue du bloc
+        
+        Raises:
+            ValidationError: Bloc hors limites, de mauvaise taille ou corrompu
+        """
+        if self.termine:
+            raise ValidationError('Ce téléversement est déjà terminé.')
+        
+        if not 0 <= index < self.nombre_blocs:
+            raise ValidationError(f'Le bloc doit être compris entre 0 et {self.nombre_blocs - 1}.')
+        
+        if longueur != self.taille_bloc(index):
+            raise ValidationError(f'Le bloc {index} doit faire {self.taille_bloc(index)} octets.')
+        
+        chemin = self.chemin_bloc(index)
+        # Un bloc renvoyé remplace le précédent (save() renommerait sinon)
+        default_storage.delete(chemin)
+        
+        lecteur = LecteurLimite(flux, longueur)
+        default_storage.save(chemin, File(lecteur, name=chemin))
+        
+        if lecteur.restant or lecteur.empreinte.hexdigest() != sha256.lower():
+            default_storage.delete(chemin)
+            raise ValidationError(f'Bloc {index} incomplet ou corrompu, renvoyez-le.')
+    
+    def assembler(self):
+        """
+        Assembler les blocs à l'emplacement définitif puis les supprimer
+        
+        Raises:
+            ValidationError: Blocs manquants ou empreinte finale incorrecte
+        """
+        if self.termine:
+            return self.cle
+        
+        manquants = sorted(set(range(self.nombre_blocs)) - set(self.blocs_recus()))
+        if manquants:
+            raise ValidationError(f'Blocs manquants : {manquants[:20]}')
+        
+        chemins = [self.chemin_bloc(index) for index in range(self.nombre_blocs)]
+        lecteur = LecteurBlocs(default_storage, chemins)
+        
+        default_storage.delete(self.cle)
+        default_storage.save(self.cle, File(lecteur, name=self.cle))
+        
+        if self.sha256 and lecteur.empreinte.hexdigest() != self.sha256.lower():
+            default_storage.delete(self.cle)
+            raise ValidationError('L\'empreinte du fichier assemblé ne correspond pas.')
+        
+        for chemin in chemins:
+            default_storage.delete(chemin)
+        
+        self.termine = True
+        self.save(update_fields=['termine', 'updated_at'])
+        return self.cle
+
+
+class TeleversementUtilise(models.Model):
+    """
+    Document téléversé directement, déjà rattaché à un enregistrement
+    
+    La clé de stockage est unique : la ligne est insérée dans la transaction
+    qui crée l'inscription ou le paiement, si bien qu'un jeton ne sert qu'une
+    fois, même sous requêtes concurrentes, et redevient utilisable si la
+    création échoue.
+    """
+    
+    cle = models.CharField(_('emplacement'), max_length=255, unique=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name=_('utilisateur')
+    )
+    created_at = models.DateTimeField(_('date d\'utilisation'), auto_now_add=True)
+    
+    class Meta:
+        verbose_name = _('téléversement utilisé')
+        verbose_name_plural = _('téléversements utilisés')
     
     def __str__(self):
-        return f"Paiement {self.reference_transaction} - {self.get_statut_display()}"
\ No newline at end of file
+        return self.cle
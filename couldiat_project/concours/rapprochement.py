@@ -0,0 +1,205 @@
+"""
+Rapprochement des paiements avec les relevés Orange Money / Moov Money
+
+Le relevé est lu en flux et indexé par référence (jointure par hachage) ;
+les paiements en attente de l'opérateur sont chargés en une requête puis
+cherchés dans l'index. Montants et dates ne sont analysés que pour les
+lignes qui correspondent à un paiement.
+
+- Correspondance exacte (référence, montant, date dans la fenêtre) :
+  paiement validé automatiquement.
+- Correspondance partielle (référence trouvée, autre écart) : anomalie
+  enregistrée sur le paiement pour une revue manuelle.
+"""
+import csv
+import io
+import re
+import unicodedata
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Paiement, normaliser_reference
+
+# Noms de colonnes reconnus, par ordre de préférence
+# (normalisés : minuscules, sans accents ni séparateurs)
+COLONNES = {
+    'reference': ('reference', 'referencetransaction', 'idtransaction', 'transactionid', 'txnid', 'id'),
+    'montant': ('montant', 'montantfcfa', 'amount', 'valeur'),
+    'date': ('date', 'dateoperation', 'datetransaction', 'dateheure', 'datetime'),
+}
+
+FORMATS_DATE = [
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%d/%m/%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M',
+    '%Y-%m-%d',
+    '%d/%m/%Y',
+]
+
+FENETRE_JOURS = 3
+
+
+class ReleveInvalide(ValueError):
+    """Relevé illisible ou sans les colonnes attendues"""
+
+
+def _normaliser_entete(nom):
+    nom = unicodedata.normalize('NFKD', nom).encode('ascii', 'ignore').decode()
+    return re.sub(r'[^a-z0-9]', '', nom.lower())
+
+
+def _lire_montant(valeur):
+    """'5 000', '5000.00' ou '5 000 FCFA' -> 5000"""
+    valeur = re.sub(r'[^\d,.]', '', valeur).replace(',', '.')
+    return int(float(valeur))
+
+
+def _lire_date(valeur):
+    valeur = valeur.strip()
+    for format_date in FORMATS_DATE:
+        try:
+            date = datetime.strptime(valeur, format_date)
+        except ValueError:
+            continue
+        return timezone.make_aware(date) if timezone.is_naive(date) else date
+    raise ValueError(f'Date illisible : {valeur}')
+
+
+def _ouvrir(fichier):
+    """Flux texte sur un fichier binaire (UTF-8, sinon Windows-1252)"""
+    debut = fichier.read(64 * 1024)
+    fichier.seek(0)
+    try:
+        debut.decode('utf-8-sig')
+        encodage = 'utf-8-sig'
+    except UnicodeDecodeError:
+        encodage = 'cp1252'
+    
+    texte = io.TextIOWrapper(fichier, encoding=encodage, errors='replace', newline='')
+    premiere_ligne = debut.split(b'\n', 1)[0].decode(encodage, errors='replace')
+    delimiteur = max(';,\t', key=premiere_ligne.count)
+    return texte, delimiteur
+
+
+def indexer_releve(fichier):
+    """
+    Index {référence normalisée: (montant brut, date brute)} du relevé
+    
+    Returns:
+        (index, nombre de lignes, références en double)
+    """
+    texte, delimiteur = _ouvrir(fichier)
+    lecteur = csv.reader(texte, delimiter=delimiteur)
+    
+    entete = [_normaliser_entete(nom) for nom in next(lecteur, [])]
+    positions = {}
+    for colonne, alias in COLONNES.items():
+        position = next((entete.index(nom) for nom in alias if nom in entete), None)
+        if position is None:
+            texte.detach()
+            raise ReleveInvalide(f'Colonne {colonne} introuvable dans le relevé')
+        positions[colonne] = position
+    
+    i_reference, i_montant, i_date = positions['reference'], positions['montant'], positions['date']
+    largeur = max(positions.values()) + 1
+    
+    index = {}
+    doublons = set()
+    lignes = 0
+    for ligne in lecteur:
+        if len(ligne) < largeur:
+            continue
+        lignes += 1
+        reference = normaliser_reference(ligne[i_reference])
+        if not reference:
+            continue
+        if reference in index:
+            doublons.add(reference)
+        else:
+            index[reference] = (ligne[i_montant], ligne[i_date])
+    
+    # Ne pas fermer le fichier de l'appelant avec le flux texte
+    texte.detach()
+    return index, lignes, doublons
+
+
+def rapprocher(fichier, operateur, fenetre_jours=FENETRE_JOURS, simulation=False, user=None):
+    """
+    Rapprocher un relevé avec les paiements en attente de l'opérateur
+    
+    Args:
+        fichier: Relevé CSV ouvert en binaire
+        operateur: 'orange_money' ou 'moov_money'
+        fenetre_jours: Écart maximal entre la date du relevé et la soumission
+        simulation: Calculer le résultat sans rien enregistrer
+        user: Administrateur enregistré comme ayant traité les paiements validés
+    
+    Returns:
+        dict avec le nombre de lignes du relevé, les id validés, les
+        anomalies {id, reference, anomalie} et le nombre de paiements
+        sans correspondance
+    """
+    index, lignes, doublons = indexer_releve(fichier)
+    fenetre = timedelta(days=fenetre_jours)
+    
+    en_attente = list(
+        Paiement.objects.filter(statut='en_attente', methode_paiement=operateur)
+        .values_list('id', 'reference_transaction', 'reference_normalisee', 'montant', 'created_at')
+    )
+    # Une référence ne sert qu'à un paiement non rejeté (contrainte
+    # paiement_reference_unique) : pas de référence partagée à écarter ici
+    
+    valides = []
+    anomalies = []
+    sans_correspondance = 0
+    for pk, reference_brute, reference, montant, soumis_le in en_attente:
+        ligne = index.get(reference)
+        if ligne is None:
+            sans_correspondance += 1
+            continue
+        
+        if reference in doublons:
+            anomalie = 'Référence présente plusieurs fois dans le relevé'
+        else:
+            try:
+                montant_releve = _lire_montant(ligne[0])
+                date_releve = _lire_date(ligne[1])
+            except ValueError:
+                anomalie = 'Ligne du relevé illisible'
+            else:
+                if montant_releve != montant:
+                    anomalie = f'Montant du relevé : {montant_releve} FCFA'
+                elif abs(date_releve - soumis_le) > fenetre:
+                    anomalie = f'Date du relevé hors fenêtre : {date_releve:%d/%m/%Y %H:%M}'
+                else:
+                    valides.append(pk)
+                    continue
+        
+        anomalies.append({'id': pk, 'reference': reference_brute, 'anomalie': anomalie})
+    
+    if not simulation:
+        with transaction.atomic():
+            if valides:
+                modifies = Paiement.objects.filter(
+                    pk__in=valides, statut='en_attente'
+                ).changer_statut_en_lot('valide')
+                Paiement.objects.filter(pk__in=modifies).update(anomalie_rapprochement='')
+                if user is not None:
+                    Paiement.objects.filter(pk__in=modifies).marquer_traites(user)
+                valides = modifies
+            
+            maintenant = timezone.now()
+            Paiement.objects.bulk_update([
+                Paiement(pk=a['id'], anomalie_rapprochement=a['anomalie'][:255], updated_at=maintenant)
+                for a in anomalies
+            ], ['anomalie_rapprochement', 'updated_at'], batch_size=1000)
+    
+    return {
+        'lignes': lignes,
+        'valides': valides,
+        'anomalies': anomalies,
+        'sans_correspondance': sans_correspondance,
+    }
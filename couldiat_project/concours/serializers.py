@@ -1,12 +1,116 @@
 """
 Serializers pour l'application Concours
 """
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files.uploadedfile import UploadedFile
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
-from .models import Concours, Inscription, Paiement
+from .models import (
+    Concours, Inscription, Paiement, Televersement, TeleversementUtilise, normaliser_reference
+)
 from accounts.serializers import UserSerializer
+from core.uploads import TYPES_DOCUMENTS, valider_document, verifier_televersement
 from core.validators import validate_file_size, validate_image
 
 
+def resoudre_televersements(attrs, user, champs):
+    """
+    Remplacer les jetons de téléversement direct par les clés de stockage
+    
+    Pour chaque champ fichier, le client envoie soit le fichier, soit
+    `<champ>_televersement` (jeton reçu de /televersements/). Les clés
+    obtenues par jeton sont placées dans attrs['televersements'] : leur
+    utilisation est enregistrée à la création (enregistrer_televersements).
+    """
+    televersements = {}
+    for champ in champs:
+        jeton = attrs.pop(f'{champ}_televersement', None)
+        
+        if jeton:
+            try:
+                attrs[champ] = verifier_televersement(jeton, user, champ)
+            except DjangoValidationError as e:
+                raise serializers.ValidationError({f'{champ}_televersement': e.messages})
+            televersements[champ] = attrs[champ]
+        elif not attrs.get(champ):
+            raise serializers.ValidationError({
+                champ: f'Envoyez le fichier ou le champ {champ}_televersement.'
+            })
+    
+    attrs['televersements'] = televersements
+    return attrs
+
+
+def enregistrer_televersements(televersements, user):
+    """
+    Marquer les documents comme utilisés, dans la transaction de création
+    
+    Raises:
+        IntegrityError: Document déjà rattaché à un autre enregistrement
+    """
+    TeleversementUtilise.objects.bulk_create([
+        TeleversementUtilise(cle=cle, user=user) for cle in televersements.values()
+    ])
+
+
+def refuser_televersements_utilises(televersements):
+    """Après une IntegrityError : erreur de validation si un document était déjà utilisé"""
+    utilises = set(
+        TeleversementUtilise.objects.filter(
+            cle__in=televersements.values()
+        ).values_list('cle', flat=True)
+    )
+    if utilises:
+        # Même format que les erreurs de validation (liste par champ)
+        raise serializers.ValidationError({
+            f'{champ}_televersement': ['Ce document a déjà été utilisé.']
+            for champ, cle in televersements.items() if cle in utilises
+        })
+
+
+class TeleversementSerializer(serializers.Serializer):
+    """Demande d'URL de téléversement direct"""
+    type_document = serializers.ChoiceField(choices=list(TYPES_DOCUMENTS))
+    nom_fichier = serializers.CharField(max_length=255)
+    content_type = serializers.CharField(max_length=100)
+    taille = serializers.IntegerField(min_value=1)
+
+
+class TeleversementBlocsSerializer(serializers.ModelSerializer):
+    """Téléversement par blocs : création et état"""
+    sha256 = serializers.RegexField(r'^[0-9a-fA-F]{64}$', required=False)
+    taille_bloc = serializers.IntegerField(source='TAILLE_BLOC', read_only=True)
+    nombre_blocs = serializers.ReadOnlyField()
+    blocs_recus = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = Televersement
+        fields = [
+            'id',
+            'type_document',
+            'nom_fichier',
+            'taille',
+            'sha256',
+            'taille_bloc',
+            'nombre_blocs',
+            'blocs_recus',
+            'termine',
+        ]
+        read_only_fields = ['termine']
+    
+    def validate(self, attrs):
+        """Vérifier le format et la taille annoncés"""
+        try:
+            attrs['cle'] = valider_document(
+                attrs['type_document'], attrs['nom_fichier'], attrs['taille']
+            )
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages)
+        
+        attrs['user'] = self.context['request'].user
+        return attrs
+
+
 class ConcoursListSerializer(serializers.ModelSerializer):
     """Serializer pour la liste des concours"""
     est_inscrit = serializers.SerializerMethodField()
@@ -35,6 +139,10 @@ class ConcoursListSerializer(serializers.ModelSerializer):
     
     def get_est_inscrit(self, obj):
         """Vérifie si l'utilisateur est déjà inscrit"""
+        # Utiliser l'annotation de avec_statistiques() si disponible
+        if hasattr(obj, 'utilisateur_inscrit'):
+            return obj.utilisateur_inscrit
+        
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.inscriptions.filter(user=request.user).exists()
@@ -52,6 +160,8 @@ class ConcoursDetailSerializer(ConcoursListSerializer):
 class InscriptionCreateSerializer(serializers.ModelSerializer):
     """Serializer pour créer une inscription"""
     concours_id = serializers.IntegerField(write_only=True)
+    cni_televersement = serializers.CharField(write_only=True, required=False)
+    photo_televersement = serializers.CharField(write_only=True, required=False)
     
     class Meta:
         model = Inscription
@@ -64,8 +174,14 @@ class InscriptionCreateSerializer(serializers.ModelSerializer):
             'sexe',
             'cni',
             'photo',
+            'cni_televersement',
+            'photo_televersement',
             'telephone',
         ]
+        extra_kwargs = {
+            'cni': {'required': False},
+            'photo': {'required': False},
+        }
     
     def validate_cni(self, value):
         """Valider le fichier CNI"""
@@ -103,27 +219,39 @@ class InscriptionCreateSerializer(serializers.ModelSerializer):
                 'concours_id': 'Ce concours est complet.'
             })
         
-        # Vérifier si l'utilisateur est déjà inscrit
-        if Inscription.objects.filter(user=user, concours=concours).exists():
-            raise serializers.ValidationError({
-                'concours_id': 'Vous êtes déjà inscrit à ce concours.'
-            })
-        
+        # Le doublon (user, concours) est détecté par la contrainte unique
+        # à l'insertion (voir create), sans requête préalable
         attrs['concours'] = concours
-        return attrs
+        return resoudre_televersements(attrs, user, ['cni', 'photo'])
     
     def create(self, validated_data):
         """Créer l'inscription"""
         concours = validated_data.pop('concours')
         validated_data.pop('concours_id')
+        televersements = validated_data.pop('televersements')
         user = self.context['request'].user
         
-        inscription = Inscription.objects.create(
-            user=user,
-            concours=concours,
-            **validated_data
-        )
+        inscription = Inscription(user=user, concours=concours, **validated_data)
+        try:
+            with transaction.atomic():
+                enregistrer_televersements(televersements, user)
+                inscription.save(force_insert=True)
+        except IntegrityError:
+            # Les fichiers envoyés directement ont été écrits avant l'INSERT
+            for champ in ('cni', 'photo'):
+                if isinstance(validated_data.get(champ), UploadedFile):
+                    getattr(inscription, champ).delete(save=False)
+            
+            refuser_televersements_utilises(televersements)
+            if Inscription.objects.filter(user=user, concours=concours).exists():
+                # Même format que les erreurs de validation (liste par champ)
+                raise serializers.ValidationError({
+                    'concours_id': ['Vous êtes déjà inscrit à ce concours.']
+                })
+            raise
         
+        # Une nouvelle inscription n'a pas de paiement : a_paye sans requête
+        Inscription.paiement.related.set_cached_value(inscription, None)
         return inscription
 
 
@@ -168,6 +296,7 @@ class InscriptionDetailSerializer(serializers.ModelSerializer):
             'sexe',
             'cni',
             'photo',
+            'photo_miniature',
             'telephone',
             'statut',
             'numero_inscription',
@@ -180,6 +309,7 @@ class InscriptionDetailSerializer(serializers.ModelSerializer):
 class PaiementCreateSerializer(serializers.ModelSerializer):
     """Serializer pour créer un paiement"""
     inscription_id = serializers.IntegerField(write_only=True)
+    capture_ecran_televersement = serializers.CharField(write_only=True, required=False)
     
     class Meta:
         model = Paiement
@@ -189,7 +319,11 @@ class PaiementCreateSerializer(serializers.ModelSerializer):
             'reference_transaction',
             'montant',
             'capture_ecran',
+            'capture_ecran_televersement',
         ]
+        extra_kwargs = {
+            'capture_ecran': {'required': False},
+        }
     
     def validate_capture_ecran(self, value):
         """Valider la capture d'écran"""
@@ -197,6 +331,12 @@ class PaiementCreateSerializer(serializers.ModelSerializer):
         validate_file_size(value, max_size_mb=3)
         return value
     
+    def validate_reference_transaction(self, value):
+        """La référence doit contenir au moins une lettre ou un chiffre"""
+        if not normaliser_reference(value):
+            raise serializers.ValidationError('Référence de transaction invalide.')
+        return value
+    
     def validate(self, attrs):
         """Validation globale"""
         user = self.context['request'].user
@@ -222,18 +362,45 @@ class PaiementCreateSerializer(serializers.ModelSerializer):
                 'montant': f'Le montant doit être de {inscription.concours.frais_inscription} FCFA.'
             })
         
+        # Une référence ne sert qu'à un paiement (hors paiements rejetés)
+        if Paiement.objects.avec_reference(
+            attrs['methode_paiement'], attrs['reference_transaction']
+        ).exists():
+            raise serializers.ValidationError({
+                'reference_transaction': 'Cette référence de transaction a déjà été utilisée.'
+            })
+        
         attrs['inscription'] = inscription
-        return attrs
+        return resoudre_televersements(attrs, user, ['capture_ecran'])
     
     def create(self, validated_data):
         """Créer le paiement"""
         inscription = validated_data.pop('inscription')
         validated_data.pop('inscription_id')
+        televersements = validated_data.pop('televersements')
         
-        paiement = Paiement.objects.create(
-            inscription=inscription,
-            **validated_data
-        )
+        paiement = Paiement(inscription=inscription, **validated_data)
+        try:
+            with transaction.atomic():
+                enregistrer_televersements(televersements, inscription.user)
+                paiement.save(force_insert=True)
+        except IntegrityError:
+            # Document déjà utilisé ou paiement concurrent enregistré après la validation
+            if isinstance(validated_data['capture_ecran'], UploadedFile):
+                paiement.capture_ecran.delete(save=False)
+            
+            refuser_televersements_utilises(televersements)
+            if Paiement.objects.avec_reference(
+                paiement.methode_paiement, paiement.reference_transaction
+            ).exists():
+                raise serializers.ValidationError({
+                    'reference_transaction': ['Cette référence de transaction a déjà été utilisée.']
+                })
+            if Paiement.objects.filter(inscription=inscription).exists():
+                raise serializers.ValidationError({
+                    'inscription_id': ['Un paiement existe déjà pour cette inscription.']
+                })
+            raise
         
         return paiement
 
@@ -251,7 +418,11 @@ class PaiementDetailSerializer(serializers.ModelSerializer):
             'reference_transaction',
             'montant',
             'capture_ecran',
+            'capture_ecran_miniature',
             'statut',
             'raison_rejet',
+            'anomalie_rapprochement',
+            'capture_similaire',
+            'distance_capture',
             'created_at',
         ]
\ No newline at end of file
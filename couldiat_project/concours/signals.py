@@ -0,0 +1,82 @@
+"""
+Signaux pour l'application Concours
+"""
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from core.images import image_normalisee, planifier_normalisation
+from .cache import invalider_catalogue
+from .evenements import publier_revue
+from .models import Concours, Inscription, Paiement
+
+
+@receiver(post_save, sender=Concours)
+@receiver(post_delete, sender=Concours)
+def invalider_catalogue_concours(sender, instance, **kwargs):
+    """Invalider le cache du catalogue à chaque modification d'un concours"""
+    invalider_catalogue()
+
+
+@receiver(post_delete, sender=Inscription)
+def liberer_place_inscription_supprimee(sender, instance, **kwargs):
+    """Libérer la place d'une inscription confirmée supprimée"""
+    if instance.statut == 'confirmee':
+        Concours.objects.filter(
+            pk=instance.concours_id,
+            inscrits_confirmes__gt=0
+        ).update(inscrits_confirmes=F('inscrits_confirmes') - 1)
+        invalider_catalogue()
+
+
+@receiver(post_save, sender=Inscription)
+def normaliser_photo_inscription(sender, instance, update_fields=None, **kwargs):
+    """Normaliser la photo d'identité en arrière-plan"""
+    planifier_normalisation(
+        instance, 'photo', 'photo_miniature', champ_refus='photo_refusee', update_fields=update_fields
+    )
+
+
+@receiver(post_save, sender=Paiement)
+def normaliser_capture_paiement(sender, instance, update_fields=None, **kwargs):
+    """Normaliser la preuve de paiement en arrière-plan"""
+    planifier_normalisation(
+        instance,
+        'capture_ecran',
+        'capture_ecran_miniature',
+        champ_empreinte='empreinte_capture',
+        champ_refus='capture_ecran_refusee',
+        update_fields=update_fields,
+    )
+
+
+@receiver(image_normalisee, sender=Paiement)
+def signaler_capture_reutilisee(sender, pk, empreinte, **kwargs):
+    """Relier le paiement à l'autre paiement dont la preuve est presque identique"""
+    similaires = Paiement.objects.exclude(pk=pk).captures_similaires(empreinte)
+    if similaires:
+        distance, autre = similaires[0]
+        Paiement.objects.filter(pk=pk).update(capture_similaire_id=autre, distance_capture=distance)
+
+
+
+@receiver(post_init, sender=Inscription)
+@receiver(post_init, sender=Paiement)
+def memoriser_statut(sender, instance, **kwargs):
+    """Statut chargé, pour détecter les changements (sans charger un champ différé)"""
+    instance._statut_initial = instance.__dict__.get('statut')
+
+
+@receiver(post_save, sender=Inscription)
+@receiver(post_save, sender=Paiement)
+def publier_evenement_revue(sender, instance, created, **kwargs):
+    """Prévenir les administrateurs abonnés au flux de revue"""
+    if created:
+        action = 'creation'
+    elif instance.statut != instance._statut_initial:
+        action = 'statut'
+    else:
+        return
+    
+    instance._statut_initial = instance.statut
+    publier_revue(sender._meta.model_name, action, [instance.pk], instance.statut)
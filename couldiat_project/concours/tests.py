@@ -1,3 +1,1255 @@
-from django.test import TestCase
+"""
+Tests pour l'application Concours
+"""
+import hashlib
+import io
+import itertools
+import random
+import tempfile
+import threading
+import uuid
+from io import StringIO
+from unittest import mock, skipUnless
+from datetime import date, timedelta
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile, File
+from django.core.files.uploadedfile import InMemoryUploadedFile, SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.core.files.storage import default_storage
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
+from s3transfer.upload import UploadNonSeekableInputManager, UploadSeekableInputManager
+from storages.backends.s3 import S3Storage
+
+from accounts.models import User
+from core.images import DIMENSION_MAX, DIMENSION_MINIATURE
+from core.models import CleIdempotence
+from core.uploads import LecteurBlocs, LecteurLimite, creer_jeton, verifier_televersement
+from core.validators import validate_image
+from .models import (
+    SEUIL_CAPTURE_SIMILAIRE, Concours, Inscription, Paiement, PaiementQuerySet, SequenceInscription,
+    Televersement,
+)
+from .serializers import PaiementCreateSerializer
+from .views import create_inscription
+
+
+# En-têtes reconnus par core.images.detecter_format
+PDF = b'%PDF-1.4\n'
+JPEG = b'\xff\xd8\xff\xe0'
+
+
+def creer_utilisateur(email='candidat@example.com', **extra):
+    return User.objects.create_user(
+        email=email,
+        password='motdepasse123',
+        nom='Ouedraogo',
+        prenom='Awa',
+        **extra
+    )
+
+
+def creer_concours(**extra):
+    data = {
+        'nom': 'Concours test',
+        'type': 'Direct',
+        'description': 'Description du concours',
+        'date_inscription': date.today() + timedelta(days=30),
+        'date_concours': date.today() + timedelta(days=60),
+        'lieu': 'Ouagadougou',
+        'frais_inscription': 5000,
+        'places_disponibles': 100,
+    }
+    data.update(extra)
+    return Concours.objects.create(**data)
+
+
+def creer_inscription(user, concours, **extra):
+    data = {
+        'nom': user.nom,
+        'prenom': user.prenom,
+        'date_naissance': date(2000, 1, 1),
+        'ville': 'Ouagadougou',
+        'sexe': 'F',
+        'cni': 'inscriptions/cni/cni.pdf',
+        'photo': 'inscriptions/photos/photo.jpg',
+        'telephone': '70000000',
+    }
+    data.update(extra)
+    return Inscription.objects.create(user=user, concours=concours, **data)
+
+
+class ConcoursListQueryCountTests(APITestCase):
+    """Le coût en requêtes d'une page du catalogue ne dépend pas de sa taille"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = creer_utilisateur()
+        self.autre = creer_utilisateur(email='autre@example.com')
+        self.client.force_authenticate(self.user)
+
+    def _ajouter_concours(self, nombre):
+        # Exécuter les on_commit : invalidation du cache du catalogue
+        with self.captureOnCommitCallbacks(execute=True):
+            self._creer_concours(nombre)
+
+    def _creer_concours(self, nombre):
+        for i in range(nombre):
+            concours = creer_concours(nom=f'Concours {i}')
+            creer_inscription(self.autre, concours).confirmer()
+            if i % 2 == 0:
+                creer_inscription(self.user, concours)
+
+    def _compter_requetes(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('concours:concours_list'))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.data['results']
+
+    def test_nombre_de_requetes_constant(self):
+        self._ajouter_concours(5)
+        requetes_petite_page, resultats = self._compter_requetes()
+        self.assertEqual(len(resultats), 5)
+
+        self._ajouter_concours(45)
+        requetes_grande_page, resultats = self._compter_requetes()
+        self.assertEqual(len(resultats), 50)
+
+        self.assertEqual(requetes_petite_page, requetes_grande_page)
+        self.assertLessEqual(requetes_grande_page, 3)
+
+    def test_annotations_exactes(self):
+        self._ajouter_concours(4)
+        _, resultats = self._compter_requetes()
+
+        for item in resultats:
+            concours = Concours.objects.get(id=item['id'])
+            self.assertEqual(item['total_inscrits'], 1)
+            self.assertEqual(item['places_restantes'], concours.places_disponibles - 1)
+            self.assertEqual(
+                item['est_inscrit'],
+                concours.inscriptions.filter(user=self.user).exists()
+            )
+
+
+class ConcoursListCacheTests(APITestCase):
+    """Cache versionné du catalogue avec ETag"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = creer_utilisateur()
+        self.autre = creer_utilisateur(email='autre@example.com')
+        self.concours = creer_concours()
+        creer_inscription(self.user, self.concours)
+        self.url = reverse('concours:concours_list')
+
+    def _get(self, user, **headers):
+        self.client.force_authenticate(user)
+        return self.client.get(self.url, headers=headers)
+
+    def test_corps_partage_et_est_inscrit_par_utilisateur(self):
+        self.assertTrue(self._get(self.user).data['results'][0]['est_inscrit'])
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self._get(self.autre)
+        self.assertFalse(response.data['results'][0]['est_inscrit'])
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_requete_conditionnelle(self):
+        etag = self._get(self.user)['ETag']
+
+        response = self._get(self.user, if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+
+        response = self._get(self.autre, if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_en_tetes_cors(self):
+        # Le navigateur n'envoie If-None-Match et ne lit ETag que si CORS l'autorise
+        preflight = self.client.options(self.url, headers={
+            'Origin': 'https://app.example.com',
+            'Access-Control-Request-Method': 'GET',
+            'Access-Control-Request-Headers': 'if-none-match',
+        })
+        response = self._get(self.user, origin='https://app.example.com')
+
+        self.assertIn('if-none-match', preflight['Access-Control-Allow-Headers'])
+        self.assertIn('etag', response['Access-Control-Expose-Headers'])
+
+    def test_modification_invalide_le_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            etag = self._get(self.user)['ETag']
+            self.concours.nom = 'Nouveau nom'
+            self.concours.save()
+
+        response = self._get(self.user, if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['nom'], 'Nouveau nom')
+
+    def test_changement_de_places_invalide_le_cache(self):
+        inscription = creer_inscription(self.autre, self.concours)
+        self.assertEqual(self._get(self.user).data['results'][0]['total_inscrits'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            inscription.confirmer()
+
+        self.assertEqual(self._get(self.user).data['results'][0]['total_inscrits'], 1)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Recherche plein texte PostgreSQL')
+class ConcoursSearchTests(APITestCase):
+    """Recherche plein texte sur le catalogue"""
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(creer_utilisateur())
+        self.ingenieur = creer_concours(
+            nom='Ingénieurs des travaux statistiques',
+            lieu='Bobo-Dioulasso',
+            description='Recrutement direct'
+        )
+        self.tresor = creer_concours(
+            nom='Inspecteur du Trésor',
+            lieu='Ouagadougou',
+            description='Formation de deux ans pour les ingénieurs financiers'
+        )
+        creer_concours(nom='Enseignants du primaire', lieu='Koudougou')
+
+    def _rechercher(self, terme):
+        response = self.client.get(reverse('concours:concours_list'), {'search': terme})
+        return [item['id'] for item in response.data['results']]
+
+    def test_insensible_aux_accents_et_classe(self):
+        # Le nom pèse plus que la description
+        self.assertEqual(self._rechercher('ingenieur'), [self.ingenieur.id, self.tresor.id])
+
+    def test_prefixe(self):
+        self.assertEqual(self._rechercher('ouaga'), [self.tresor.id])
+
+    def test_faute_de_frappe(self):
+        self.assertEqual(self._rechercher('Ouagadugou'), [self.tresor.id])
+
+    def test_pagination_par_pertinence(self):
+        url = reverse('concours:concours_list') + '?search=ingenieur&page_size=1'
+        ids = []
+        while url:
+            response = self.client.get(url)
+            ids += [item['id'] for item in response.data['results']]
+            url = response.data['next']
+
+        self.assertEqual(ids, [self.ingenieur.id, self.tresor.id])
+
+    def test_pagination_faute_de_frappe(self):
+        police = creer_concours(nom='Police nationale', lieu='Ouagadougou')
+        url = reverse('concours:concours_list') + '?search=Ouagadugou&page_size=1'
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [item['id'] for item in response.data['results']]
+            url = response.data['next']
+
+        # Même similarité : départagés par date de création
+        self.assertEqual(ids, [police.id, self.tresor.id])
+
+    def test_vecteur_mis_a_jour(self):
+        self.tresor.lieu = 'Fada'
+        self.tresor.save()
+
+        self.assertEqual(self._rechercher('fada'), [self.tresor.id])
+
+
+class KeysetPaginationTests(APITestCase):
+    """Pagination par curseur sur (created_at, id)"""
+
+    def setUp(self):
+        self.user = creer_utilisateur()
+        self.client.force_authenticate(self.user)
+        self.inscriptions = [
+            creer_inscription(self.user, creer_concours(nom=f'Concours {i}'))
+            for i in range(7)
+        ]
+        # Égalités sur created_at : départagées par id
+        Inscription.objects.filter(
+            pk__in=[i.pk for i in self.inscriptions[2:5]]
+        ).update(created_at=self.inscriptions[2].created_at)
+        self.attendu = list(
+            Inscription.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        self.url = reverse('concours:mes_inscriptions')
+
+    def test_parcours_complet(self):
+        ids, url, pages = [], self.url, 0
+        while url:
+            response = self.client.get(url, {'page_size': 3} if url == self.url else None)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            ids += [item['id'] for item in response.data['results']]
+            url = response.data['next']
+            pages += 1
+
+        self.assertEqual(ids, self.attendu)
+        self.assertEqual(pages, 3)
+
+    def test_page_precedente(self):
+        premiere = self.client.get(self.url, {'page_size': 3}).data
+        seconde = self.client.get(premiere['next']).data
+        retour = self.client.get(seconde['previous']).data
+
+        self.assertEqual(
+            [item['id'] for item in retour['results']],
+            [item['id'] for item in premiere['results']]
+        )
+        self.assertIsNone(retour['previous'])
+
+    def test_count_sur_demande(self):
+        response = self.client.get(self.url, {'count': 'true'})
+        self.assertEqual(response.data['count'], 7)
+
+    def test_curseur_invalide(self):
+        response = self.client.get(self.url, {'cursor': 'invalide'})
+        self.assertEqual(response.status_code, 404)
+
+
+class CompteurPlacesTests(TestCase):
+    """Compteur de places stocké sur le concours"""
+
+    def setUp(self):
+        self.concours = creer_concours(places_disponibles=2)
+        self.inscriptions = [
+            creer_inscription(creer_utilisateur(email=f'c{i}@example.com'), self.concours)
+            for i in range(3)
+        ]
+
+    def test_confirmation_limitee_aux_places(self):
+        self.assertTrue(self.inscriptions[0].confirmer())
+        self.assertTrue(self.inscriptions[1].confirmer())
+        self.assertFalse(self.inscriptions[2].confirmer())
+
+        self.concours.refresh_from_db()
+        self.assertEqual(self.concours.total_inscrits, 2)
+        self.assertTrue(self.concours.est_complet)
+        self.inscriptions[2].refresh_from_db()
+        self.assertEqual(self.inscriptions[2].statut, 'en_attente')
+
+    def test_double_confirmation_compte_une_place(self):
+        self.inscriptions[0].confirmer()
+        self.inscriptions[0].confirmer()
+
+        self.concours.refresh_from_db()
+        self.assertEqual(self.concours.inscrits_confirmes, 1)
+
+    def test_rejet_libere_la_place(self):
+        self.inscriptions[0].confirmer()
+        self.inscriptions[0].rejeter('Dossier incomplet')
+
+        self.concours.refresh_from_db()
+        self.assertEqual(self.concours.inscrits_confirmes, 0)
+
+    def test_suppression_libere_la_place(self):
+        self.inscriptions[0].confirmer()
+        self.inscriptions[0].delete()
+
+        self.concours.refresh_from_db()
+        self.assertEqual(self.concours.inscrits_confirmes, 0)
+
+    def test_commande_recalcul(self):
+        Inscription.objects.filter(pk=self.inscriptions[0].pk).update(statut='confirmee')
+
+        call_command('rebuild_seat_counters', stdout=StringIO())
+
+        self.concours.refresh_from_db()
+        self.assertEqual(self.concours.inscrits_confirmes, 1)
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class CompteurPlacesConcurrenceTests(TransactionTestCase):
+    """Aucun surbooking avec des validations concurrentes"""
+
+    def test_validations_concurrentes(self):
+        concours = creer_concours(places_disponibles=5)
+        inscriptions = [
+            creer_inscription(creer_utilisateur(email=f'c{i}@example.com'), concours)
+            for i in range(20)
+        ]
+        resultats = []
+        barriere = threading.Barrier(len(inscriptions))
+
+        def confirmer(inscription):
+            barriere.wait()
+            try:
+                resultats.append(inscription.confirmer())
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=confirmer, args=(i,)) for i in inscriptions]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        concours.refresh_from_db()
+        self.assertEqual(resultats.count(True), 5)
+        self.assertEqual(concours.inscrits_confirmes, 5)
+        self.assertEqual(concours.inscriptions.filter(statut='confirmee').count(), 5)
+
+
+class SequenceInscriptionTests(TestCase):
+    """Allocation des numéros d'inscription"""
+
+    def test_blocs_consecutifs(self):
+        premier_bloc = SequenceInscription.allouer(quantite=3, annee=2030)
+        second_bloc = SequenceInscription.allouer(annee=2030)
+
+        self.assertEqual(premier_bloc, ['INS-2030-000001', 'INS-2030-000002', 'INS-2030-000003'])
+        self.assertEqual(second_bloc, ['INS-2030-000004'])
+
+    def test_sequence_par_annee(self):
+        SequenceInscription.allouer(quantite=5, annee=2030)
+
+        self.assertEqual(SequenceInscription.allouer(annee=2031), ['INS-2031-000001'])
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class SequenceInscriptionConcurrenceTests(TransactionTestCase):
+    """Numéros uniques et sans trou avec des confirmations concurrentes"""
+
+    def test_confirmations_concurrentes(self):
+        # Un concours par inscription : les confirmations ne sont pas
+        # sérialisées par le verrou du compteur de places
+        inscriptions = [
+            creer_inscription(
+                creer_utilisateur(email=f'c{i}@example.com'),
+                creer_concours(nom=f'Concours {i}')
+            )
+            for i in range(30)
+        ]
+        erreurs = []
+        barriere = threading.Barrier(len(inscriptions))
+
+        def confirmer(inscription):
+            barriere.wait()
+            try:
+                inscription.confirmer()
+            except Exception as exc:
+                erreurs.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=confirmer, args=(i,)) for i in inscriptions]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(erreurs, [])
+        numeros = sorted(
+            Inscription.objects.values_list('numero_inscription', flat=True)
+        )
+        annee = numeros[0].split('-')[1]
+        self.assertEqual(
+            numeros,
+            [SequenceInscription.formater(int(annee), n) for n in range(1, 31)]
+        )
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), USE_S3=False)
+class TeleversementDirectTests(APITestCase):
+    """Documents envoyés directement au stockage puis référencés par jeton"""
+
+    def setUp(self):
+        self.user = creer_utilisateur()
+        self.concours = creer_concours()
+        self.client.force_authenticate(self.user)
+
+    def _televerser(self, type_document, contenu, nom_fichier='document.jpg', content_type='image/jpeg'):
+        response = self.client.post(reverse('concours:demander_televersement'), {
+            'type_document': type_document,
+            'nom_fichier': nom_fichier,
+            'content_type': content_type,
+            'taille': len(contenu),
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        # Le PUT ne passe pas par l'authentification de l'API
+        self.client.logout()
+        put = self.client.put(
+            response.data['url'], contenu, content_type=content_type
+        )
+        self.assertEqual(put.status_code, 201)
+        self.client.force_authenticate(self.user)
+
+        return response.data['jeton'], put.json()['cle']
+
+    def _televerser_dossier(self):
+        return (
+            self._televerser('cni', PDF + b'cni' * 100, 'cni.pdf', 'application/pdf')[0],
+            self._televerser('photo', JPEG + b'photo' * 100)[0],
+        )
+
+    def _inscrire(self, concours=None, **fichiers):
+        data = {
+            'concours_id': (concours or self.concours).pk,
+            'nom': 'Ouedraogo',
+            'prenom': 'Awa',
+            'date_naissance': '2000-01-01',
+            'ville': 'Ouagadougou',
+            'sexe': 'F',
+            'telephone': '70000000',
+            **fichiers,
+        }
+        return self.client.post(reverse('concours:create_inscription'), data, format='json')
+
+    def test_inscription_avec_jetons(self):
+        jeton_cni, cle_cni = self._televerser('cni', PDF + b'cni' * 100, 'cni.pdf', 'application/pdf')
+        jeton_photo, cle_photo = self._televerser('photo', JPEG + b'photo' * 100)
+
+        self.assertTrue(cle_cni.startswith('inscriptions/cni/'))
+        self.assertTrue(default_storage.exists(cle_photo))
+
+        response = self._inscrire(cni_televersement=jeton_cni, photo_televersement=jeton_photo)
+
+        self.assertEqual(response.status_code, 201, response.data)
+        inscription = Inscription.objects.get()
+        self.assertEqual(inscription.cni.name, cle_cni)
+        self.assertEqual(inscription.photo.name, cle_photo)
+
+    def test_fichier_non_recu(self):
+        response = self.client.post(reverse('concours:demander_televersement'), {
+            'type_document': 'photo',
+            'nom_fichier': 'photo.png',
+            'content_type': 'image/png',
+            'taille': 10,
+        }, format='json')
+        jeton_cni, _ = self._televerser('cni', PDF, 'cni.pdf', 'application/pdf')
+
+        response = self._inscrire(
+            cni_televersement=jeton_cni,
+            photo_televersement=response.data['jeton']
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('photo_televersement', response.data)
+
+    def test_jeton_d_un_autre_utilisateur(self):
+        jeton_cni, jeton_photo = self._televerser_dossier()
+
+        self.client.force_authenticate(creer_utilisateur(email='autre@example.com'))
+        response = self._inscrire(cni_televersement=jeton_cni, photo_televersement=jeton_photo)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('cni_televersement', response.data)
+
+    def test_refus_format_et_taille(self):
+        url = reverse('concours:demander_televersement')
+        data = {'type_document': 'photo', 'content_type': 'image/png'}
+
+        exe = self.client.post(url, {**data, 'nom_fichier': 'photo.exe', 'taille': 10}, format='json')
+        lourd = self.client.post(
+            url, {**data, 'nom_fichier': 'photo.png', 'taille': 3 * 1024 * 1024}, format='json'
+        )
+
+        self.assertEqual(exe.status_code, 400)
+        self.assertEqual(lourd.status_code, 400)
+
+    def test_put_taille_differente(self):
+        response = self.client.post(reverse('concours:demander_televersement'), {
+            'type_document': 'photo',
+            'nom_fichier': 'photo.jpg',
+            'content_type': 'image/jpeg',
+            'taille': 10,
+        }, format='json')
+
+        put = self.client.put(response.data['url'], b'x' * 20, content_type='image/jpeg')
+
+        self.assertEqual(put.status_code, 400)
+
+    def test_type_mime_refuse(self):
+        url = reverse('concours:demander_televersement')
+        data = {'type_document': 'photo', 'nom_fichier': 'photo.jpg', 'taille': 10}
+
+        pdf = self.client.post(url, {**data, 'content_type': 'application/pdf'}, format='json')
+        html = self.client.post(url, {**data, 'content_type': 'text/html'}, format='json')
+
+        self.assertEqual(pdf.status_code, 400)
+        self.assertEqual(html.status_code, 400)
+
+    def test_contenu_different_du_format_supprime(self):
+        jeton_cni, _ = self._televerser('cni', PDF, 'cni.pdf', 'application/pdf')
+        jeton_photo, cle_photo = self._televerser('photo', b'<html><script></script></html>')
+
+        response = self._inscrire(cni_televersement=jeton_cni, photo_televersement=jeton_photo)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data['photo_televersement'], ['Le contenu du fichier ne correspond pas à son format.']
+        )
+        self.assertFalse(default_storage.exists(cle_photo))
+
+    def test_jeton_a_usage_unique(self):
+        jeton_cni, jeton_photo = self._televerser_dossier()
+        self.assertEqual(
+            self._inscrire(cni_televersement=jeton_cni, photo_televersement=jeton_photo).status_code, 201
+        )
+
+        # Mêmes documents pour un autre concours
+        response = self._inscrire(
+            creer_concours(nom='Autre concours'), cni_televersement=jeton_cni, photo_televersement=jeton_photo
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['cni_televersement'], ['Ce document a déjà été utilisé.'])
+        self.assertEqual(Inscription.objects.count(), 1)
+
+        # L'utilisation est enregistrée en base, pas dans le cache
+        cache.clear()
+        response = self._inscrire(
+            creer_concours(nom='Troisième concours'), cni_televersement=jeton_cni, photo_televersement=jeton_photo
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {'cni_televersement', 'photo_televersement'})
+
+    def test_jetons_rendus_apres_refus(self):
+        jeton_cni, jeton_photo = self._televerser_dossier()
+
+        refus = self._inscrire(cni_televersement=jeton_cni, photo_televersement='invalide')
+        response = self._inscrire(cni_televersement=jeton_cni, photo_televersement=jeton_photo)
+
+        self.assertEqual(refus.status_code, 400)
+        self.assertEqual(response.status_code, 201, response.data)
+
+
+def donnees_inscription(user, concours):
+    """Corps de création d'inscription avec des documents déjà téléversés"""
+    # Noms uniques : un document ne peut être rattaché qu'une fois
+    nom = uuid.uuid4().hex
+    cni = default_storage.save(f'inscriptions/cni/{nom}.pdf', ContentFile(PDF))
+    photo = default_storage.save(f'inscriptions/photos/{nom}.jpg', ContentFile(JPEG + b'photo'))
+    return {
+        'concours_id': concours.pk,
+        'nom': 'Ouedraogo',
+        'prenom': 'Awa',
+        'date_naissance': '2000-01-01',
+        'ville': 'Ouagadougou',
+        'sexe': 'F',
+        'telephone': '70000000',
+        'cni_televersement': creer_jeton(user, 'cni', cni),
+        'photo_televersement': creer_jeton(user, 'photo', photo),
+    }
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), USE_S3=False)
+class InscriptionCreationTests(APITestCase):
+    """Validation et insertion en un aller-retour, doublon détecté par la contrainte"""
+
+    def setUp(self):
+        self.user = creer_utilisateur()
+        self.concours = creer_concours()
+        self.client.force_authenticate(self.user)
+        self.data = donnees_inscription(self.user, self.concours)
+        self.url = reverse('concours:create_inscription')
+
+    def test_nombre_de_requetes(self):
+        # Concours, puis documents utilisés et INSERT dans un savepoint ; a_paye sans requête
+        with self.assertNumQueries(5):
+            response = self.client.post(self.url, self.data, format='json')
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertFalse(response.data['inscription']['a_paye'])
+
+    def test_doublon_refuse(self):
+        self.client.post(self.url, self.data, format='json')
+
+        response = self.client.post(self.url, donnees_inscription(self.user, self.concours), format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['concours_id'], ['Vous êtes déjà inscrit à ce concours.'])
+        self.assertEqual(Inscription.objects.count(), 1)
+
+    def test_doublon_avec_fichiers_envoyes(self):
+        creer_inscription(self.user, self.concours)
+        data = {key: value for key, value in self.data.items() if not key.endswith('_televersement')}
+        data['cni'] = SimpleUploadedFile('cni.pdf', b'%PDF-1.4', content_type='application/pdf')
+        data['photo'] = SimpleUploadedFile('photo.jpg', creer_jpeg(50, 50), content_type='image/jpeg')
+
+        avant = default_storage.listdir('inscriptions/photos')[1]
+
+        response = self.client.post(self.url, data, format='multipart')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(default_storage.listdir('inscriptions/photos')[1], avant)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), USE_S3=False)
+class InscriptionCreationConcurrenceTests(TransactionTestCase):
+    """Requêtes identiques simultanées : une seule inscription, aucune erreur 500"""
+
+    def test_inscriptions_concurrentes(self):
+        user = creer_utilisateur()
+        concours = creer_concours()
+        factory = APIRequestFactory()
+        statuts = []
+        barriere = threading.Barrier(8)
+
+        def inscrire(data):
+            request = factory.post('/concours/inscriptions/create/', data, format='json')
+            force_authenticate(request, user=user)
+            barriere.wait()
+            try:
+                statuts.append(create_inscription(request).status_code)
+            finally:
+                connection.close()
+
+        # Documents distincts : les requêtes atteignent toutes l'insertion
+        threads = [
+            threading.Thread(target=inscrire, args=(donnees_inscription(user, concours),))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(statuts), [201] + [400] * 7)
+        self.assertEqual(Inscription.objects.count(), 1)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), USE_S3=False)
+class TeleversementBlocsTests(APITestCase):
+    """Téléversement reprenable par blocs contrôlés par SHA-256"""
+
+    def setUp(self):
+        self.user = creer_utilisateur()
+        self.client.force_authenticate(self.user)
+        self.contenu = PDF + bytes(range(256)) * (Televersement.TAILLE_BLOC * 2 // 256 + 10)
+
+    def _creer(self, **extra):
+        response = self.client.post(reverse('concours:creer_televersement_blocs'), {
+            'type_document': 'cni',
+            'nom_fichier': 'cni.pdf',
+            'taille': len(self.contenu),
+            'sha256': hashlib.sha256(self.contenu).hexdigest(),
+            **extra,
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data
+
+    def _envoyer(self, pk, index, data=None, sha256=None):
+        taille = Televersement.TAILLE_BLOC
+        if data is None:
+            data = self.contenu[index * taille:(index + 1) * taille]
+        return self.client.put(
+            reverse('concours:envoyer_bloc', args=[pk, index]),
+            data,
+            content_type='application/octet-stream',
+            HTTP_X_CHECKSUM_SHA256=sha256 or hashlib.sha256(data).hexdigest(),
+        )
+
+    def test_reprise_puis_assemblage(self):
+        televersement = self._creer()
+        pk = televersement['id']
+        self.assertEqual(televersement['nombre_blocs'], 3)
+
+        # Coupure après le dernier bloc : seuls les blocs 0 et 1 restent à envoyer
+        self.assertEqual(self._envoyer(pk, 2).status_code, 201)
+        etat = self.client.get(reverse('concours:etat_televersement', args=[pk]))
+        self.assertEqual(etat.data['blocs_recus'], [2])
+
+        incomplet = self.client.post(reverse('concours:terminer_televersement', args=[pk]))
+        self.assertEqual(incomplet.status_code, 400)
+
+        self._envoyer(pk, 0)
+        self._envoyer(pk, 1)
+        response = self.client.post(reverse('concours:terminer_televersement', args=[pk]))
+
+        self.assertEqual(response.status_code, 200, response.data)
+        televersement = Televersement.objects.get(pk=pk)
+        self.assertTrue(televersement.termine)
+        self.assertEqual(televersement.blocs_recus(), [])
+        with default_storage.open(televersement.cle, 'rb') as fichier:
+            self.assertEqual(fichier.read(), self.contenu)
+
+        # Le jeton est accepté comme un téléversement direct
+        self.assertEqual(
+            verifier_televersement(response.data['jeton'], self.user, 'cni'),
+            televersement.cle
+        )
+
+    def test_bloc_corrompu_rejete(self):
+        pk = self._creer()['id']
+
+        response = self._envoyer(pk, 0, sha256='0' * 64)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Televersement.objects.get(pk=pk).blocs_recus(), [])
+
+    def test_bloc_de_mauvaise_taille(self):
+        pk = self._creer()['id']
+
+        response = self._envoyer(pk, 0, data=b'x' * 10)
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_televersement_d_un_autre_utilisateur(self):
+        pk = self._creer()['id']
+
+        self.client.force_authenticate(creer_utilisateur(email='autre@example.com'))
+
+        self.assertEqual(self._envoyer(pk, 0).status_code, 404)
+
+    def test_purge_des_abandons(self):
+        pk = self._creer()['id']
+        self._envoyer(pk, 0)
+        Televersement.objects.filter(pk=pk).update(
+            updated_at=Televersement.objects.get(pk=pk).updated_at - timedelta(days=2)
+        )
+
+        call_command('purge_uploads', stdout=StringIO())
+
+        self.assertFalse(Televersement.objects.exists())
+        self.assertFalse(default_storage.exists(f'televersements/{pk}/00000'))
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), USE_S3=False)
+class LecteursStockageS3Tests(TestCase):
+    """Lecteurs de blocs passés à S3Storage.save(), comme en production"""
+
+    def enregistrer_sur_s3(self, lecteur):
+        recu = {}
+
+        def upload_fileobj(fileobj, **kwargs):
+            # s3transfer choisit le mode de lecture d'après seekable()
+            self.assertFalse(UploadSeekableInputManager.is_compatible(fileobj))
+            self.assertTrue(UploadNonSeekableInputManager.is_compatible(fileobj))
+            recu['data'] = fileobj.read()
+
+        storage = S3Storage(
+            bucket_name='couldiat-test', access_key='test', secret_key='test', region_name='eu-west-1'
+        )
+        with mock.patch.object(S3Storage, 'bucket', new_callable=mock.PropertyMock) as bucket:
+            bucket.return_value.Object.return_value.upload_fileobj.side_effect = upload_fileobj
+            storage.save('televersements/test/fichier', File(lecteur, name='fichier'))
+        return recu['data']
+
+    def test_lecteur_limite(self):
+        lecteur = LecteurLimite(io.BytesIO(b'x' * 1000 + b'au-dela'), 1000)
+
+        self.assertEqual(self.enregistrer_sur_s3(lecteur), b'x' * 1000)
+        self.assertEqual(lecteur.restant, 0)
+        self.assertEqual(lecteur.empreinte.hexdigest(), hashlib.sha256(b'x' * 1000).hexdigest())
+
+    def test_lecteur_blocs(self):
+        chemins = [
+            default_storage.save(f'televersements/test/{index:05d}', ContentFile(bytes([index]) * 300))
+            for index in range(3)
+        ]
+        contenu = b''.join(bytes([index]) * 300 for index in range(3))
+        lecteur = LecteurBlocs(default_storage, chemins)
+
+        self.assertEqual(self.enregistrer_sur_s3(lecteur), contenu)
+        self.assertEqual(lecteur.empreinte.hexdigest(), hashlib.sha256(contenu).hexdigest())
+
+
+def creer_jpeg(largeur, hauteur, orientation=1):
+    """JPEG avec orientation EXIF et coordonnées GPS"""
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    exif[0x8825] = {1: 'N', 2: (12.0, 22.0, 0.0)}
+    sortie = io.BytesIO()
+    Image.new('RGB', (largeur, hauteur), (200, 30, 30)).save(sortie, 'JPEG', exif=exif)
+    return sortie.getvalue()
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), IMAGE_PIPELINE_WORKERS=0)
+class NormalisationImagesTests(TestCase):
+    """Photos réencodées en WebP sans métadonnées, avec miniature"""
+
+    def test_photo_inscription_normalisee(self):
+        original = default_storage.save('inscriptions/photos/photo.jpg', ContentFile(
+            creer_jpeg(3000, 2400, orientation=6)
+        ))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            inscription = creer_inscription(
+                creer_utilisateur(), creer_concours(), photo=original
+            )
+
+        inscription.refresh_from_db()
+        self.assertTrue(inscription.photo.name.endswith('.webp'))
+        self.assertFalse(default_storage.exists(original))
+
+        with Image.open(inscription.photo) as image:
+            self.assertEqual(image.format, 'WEBP')
+            # Orientation 6 appliquée : l'image devient portrait
+            self.assertEqual(image.size, (DIMENSION_MAX * 4 // 5, DIMENSION_MAX))
+            self.assertEqual(len(image.getexif()), 0)
+
+        with Image.open(inscription.photo_miniature) as miniature:
+            self.assertLessEqual(max(miniature.size), DIMENSION_MINIATURE)
+
+        # Une nouvelle sauvegarde ne relance pas le traitement
+        nom = inscription.photo.name
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            inscription.save()
+        self.assertEqual(callbacks, [])
+        self.assertEqual(Inscription.objects.get().photo.name, nom)
+
+    def test_image_illisible_non_retraitee(self):
+        # Signature JPEG valide, contenu tronqué
+        original = default_storage.save('inscriptions/photos/photo.jpg', ContentFile(
+            creer_jpeg(200, 200)[:64]
+        ))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            inscription = creer_inscription(
+                creer_utilisateur(), creer_concours(), photo=original
+            )
+
+        inscription.refresh_from_db()
+        self.assertEqual(inscription.photo.name, original)
+        self.assertEqual(inscription.photo_refusee, original)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            inscription.save()
+        self.assertEqual(callbacks, [])
+
+        # Une nouvelle photo est traitée
+        inscription.photo = default_storage.save('inscriptions/photos/photo.jpg', ContentFile(
+            creer_jpeg(40, 40)
+        ))
+        with self.captureOnCommitCallbacks(execute=True):
+            inscription.save()
+        inscription.refresh_from_db()
+        self.assertTrue(inscription.photo.name.endswith('.webp'))
+
+    def test_sauvegarde_partielle_sans_image(self):
+        user = creer_utilisateur()
+        user.photo = default_storage.save('users/photos/photo.jpg', ContentFile(creer_jpeg(40, 40)))
+
+        # Connexion : seul last_login est enregistré
+        with self.captureOnCommitCallbacks() as callbacks:
+            user.save(update_fields=['last_login'])
+        self.assertEqual(callbacks, [])
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            user.save(update_fields=['photo'])
+        self.assertEqual(len(callbacks), 1)
+        user.refresh_from_db()
+        self.assertTrue(user.photo.name.endswith('.webp'))
+
+    def test_contenu_non_image_refuse(self):
+        faux = SimpleUploadedFile('photo.jpg', b'%PDF-1.4 ...', content_type='image/jpeg')
+
+        with self.assertRaises(ValidationError):
+            validate_image(faux)
+
+        validate_image(SimpleUploadedFile('photo.jpg', creer_jpeg(10, 10), content_type='image/jpeg'))
+
+
+def creer_paiement(inscription, reference='OM123', **extra):
+    data = {
+        'methode_paiement': 'orange_money',
+        'montant': inscription.concours.frais_inscription,
+        'capture_ecran': 'paiements/preuves/preuve.jpg',
+    }
+    data.update(extra)
+    return Paiement.objects.create(inscription=inscription, reference_transaction=reference, **data)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), IMAGE_PIPELINE_WORKERS=0)
+class ReferencesEnDoubleTests(APITestCase):
+    """Détection indexée des références de transaction réutilisées"""
+
+    def setUp(self):
+        self.concours = creer_concours()
+        self.premier = creer_paiement(creer_inscription(creer_utilisateur(), self.concours), ' om-123 ')
+
+    def _soumettre(self, reference, methode_paiement='orange_money'):
+        user = creer_utilisateur(email=f'{reference.strip()}{methode_paiement}@example.com')
+        inscription = creer_inscription(user, self.concours)
+        self.client.force_authenticate(user)
+        return self.client.post(reverse('concours:valider_paiement'), {
+            'inscription_id': inscription.pk,
+            'methode_paiement': methode_paiement,
+            'reference_transaction': reference,
+            'montant': self.concours.frais_inscription,
+            'capture_ecran': SimpleUploadedFile('preuve.jpg', creer_jpeg(40, 40), content_type='image/jpeg'),
+        }, format='multipart')
+
+    def test_reference_normalisee(self):
+        self.assertEqual(self.premier.reference_normalisee, 'OM123')
+
+        self.premier.reference_transaction = 'OM 456'
+        self.premier.save(update_fields=['reference_transaction'])
+        self.premier.refresh_from_db()
+        self.assertEqual(self.premier.reference_normalisee, 'OM456')
+
+    def test_soumission_refusee_si_reference_utilisee(self):
+        response = self._soumettre('OM123')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('reference_transaction', response.data)
+
+        # Même référence chez un autre opérateur
+        self.assertEqual(self._soumettre('OM123', 'moov_money').status_code, 201)
+
+        # Une référence d'un paiement rejeté peut être resoumise
+        self.premier.statut = 'rejete'
+        self.premier.save()
+        self.assertEqual(self._soumettre('om 123').status_code, 201)
+
+    def test_reference_vide_refusee(self):
+        response = self._soumettre('---')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('reference_transaction', response.data)
+
+    def test_reference_unique_en_base(self):
+        inscription = creer_inscription(creer_utilisateur(email='autre@example.com'), self.concours)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            creer_paiement(inscription, 'OM-123')
+
+        # Un paiement rejeté ne réserve pas sa référence, mais reste signalé
+        rejete = creer_paiement(inscription, 'OM-123', statut='rejete')
+        self.assertEqual(set(Paiement.objects.en_double()), {self.premier, rejete})
+        self.assertEqual(list(Paiement.objects.reference_reprise()), [rejete])
+
+    def test_soumissions_concurrentes(self):
+        # La validation ne voit pas le paiement enregistré entre-temps
+        avec_reference = PaiementQuerySet.avec_reference
+
+        def course(queryset, *args):
+            course.appels += 1
+            return queryset.none() if course.appels == 1 else avec_reference(queryset, *args)
+
+        course.appels = 0
+        with mock.patch.object(PaiementQuerySet, 'avec_reference', course):
+            response = self._soumettre('om123')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data['reference_transaction'], ['Cette référence de transaction a déjà été utilisée.']
+        )
+        self.assertEqual(Paiement.objects.count(), 1)
+
+    def test_scan_avec_rejetes(self):
+        rejete = creer_paiement(
+            creer_inscription(creer_utilisateur(email='rejete@example.com'), self.concours), 'OM123',
+            statut='rejete'
+        )
+        creer_paiement(
+            creer_inscription(creer_utilisateur(email='unique@example.com'), self.concours), 'OM999'
+        )
+
+        sortie = StringIO()
+        call_command('scan_payment_duplicates', '--inclure-rejetes', stdout=sortie)
+        self.assertIn(f'OM123 : #{self.premier.pk} (en_attente), #{rejete.pk} (rejete)', sortie.getvalue())
+        self.assertIn('1 références en double', sortie.getvalue())
+
+
+def creer_capture(graine, marge=0, orientation=1, taille=800):
+    """Capture JPEG à motif aléatoire, éventuellement recadrée de `marge` pixels"""
+    motif = Image.frombytes('L', (16, 16), random.Random(graine).randbytes(256))
+    image = motif.resize((taille, taille), Image.BILINEAR).convert('RGB')
+    image = image.crop((marge, marge, taille - marge, taille - marge))
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    sortie = io.BytesIO()
+    image.save(sortie, 'JPEG', quality=85, exif=exif)
+    return sortie.getvalue()
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), IMAGE_PIPELINE_WORKERS=0)
+class CapturesSimilairesTests(TestCase):
+    """Empreintes perceptuelles des preuves de paiement"""
+
+    def setUp(self):
+        self.concours = creer_concours()
+        self.compteur = itertools.count()
+
+    def _payer(self, contenu):
+        nom = default_storage.save('paiements/preuves/preuve.jpg', ContentFile(contenu))
+        inscription = creer_inscription(
+            creer_utilisateur(email=f'candidat{next(self.compteur)}@example.com'), self.concours
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            paiement = creer_paiement(inscription, f'OM{inscription.pk}', capture_ecran=nom)
+        paiement.refresh_from_db()
+        return paiement
+
+    def test_capture_recadree_signalee(self):
+        original = self._payer(creer_capture(1))
+        recadree = self._payer(creer_capture(1, marge=12))
+        differente = self._payer(creer_capture(2))
+
+        self.assertIsNotNone(original.empreinte_capture)
+        self.assertIsNone(original.capture_similaire)
+        self.assertEqual(recadree.capture_similaire, original)
+        self.assertLessEqual(recadree.distance_capture, SEUIL_CAPTURE_SIMILAIRE)
+        self.assertIsNone(differente.capture_similaire)
+
+    def test_recherche_multi_index(self):
+        reference = 0x0123_4567_89AB_CDEF
+        # 7 bits répartis sur les 4 bandes : toujours trouvé
+        proche = reference ^ 0b11 ^ (0b11 << 16) ^ (0b11 << 32) ^ (1 << 63)
+        loin = reference ^ 0xFFFF
+        paiements = [
+            creer_paiement(
+                creer_inscription(creer_utilisateur(email=f'c{i}@example.com'), self.concours),
+                f'OM{i}',
+                empreinte_capture=empreinte - (1 << 64) if empreinte >> 63 else empreinte
+            )
+            for i, empreinte in enumerate([reference, proche, loin])
+        ]
+
+        with CaptureQueriesContext(connection) as requetes:
+            similaires = Paiement.objects.captures_similaires(reference)
+
+        self.assertEqual(similaires, [(0, paiements[0].pk), (7, paiements[1].pk)])
+
+        # Les bandes sont cherchées dans les index fonctionnels
+        with connection.cursor() as curseur:
+            curseur.execute('SET LOCAL enable_seqscan = off')
+            curseur.execute(f'EXPLAIN {requetes[0]["sql"]}')
+            plan = '\n'.join(ligne for ligne, in curseur.fetchall())
+        for index in range(4):
+            self.assertIn(f'paiement_empreinte_{index}_idx', plan)
+
+    def test_indexation_des_captures_existantes(self):
+        original = self._payer(creer_capture(3))
+        copie = self._payer(creer_capture(3))
+        Paiement.objects.update(empreinte_capture=None, capture_similaire=None, distance_capture=None)
+
+        sortie = StringIO()
+        call_command('index_payment_screenshots', stdout=sortie)
+
+        copie.refresh_from_db()
+        self.assertEqual(copie.capture_similaire, original)
+        self.assertEqual(copie.distance_capture, 0)
+        self.assertIn('2 captures indexées', sortie.getvalue())
+
+    def test_indexation_identique_a_la_normalisation(self):
+        # Photo de téléphone : pivotée par EXIF, plus grande que DIMENSION_MAX
+        contenu = creer_capture(4, orientation=6, taille=2400)
+        nom = default_storage.save('paiements/preuves/preuve.jpg', ContentFile(contenu))
+        ancienne = creer_paiement(
+            creer_inscription(creer_utilisateur(email='ancien@example.com'), self.concours),
+            'OM-ANCIEN', capture_ecran=nom
+        )
+        nouvelle = self._payer(contenu)
+
+        call_command('index_payment_screenshots', stdout=StringIO())
+
+        ancienne.refresh_from_db()
+        self.assertEqual(ancienne.capture_ecran.name, nom)
+        self.assertEqual(ancienne.empreinte_capture, nouvelle.empreinte_capture)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), IMAGE_PIPELINE_WORKERS=0)
+class IdempotenceTests(APITestCase):
+    """Renvois d'une création avec la même clé d'idempotence"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = creer_utilisateur()
+        self.client.force_authenticate(self.user)
+        self.inscription = creer_inscription(self.user, creer_concours())
+        self.url = reverse('concours:valider_paiement')
+
+    def _payer(self, cle=None, **donnees):
+        donnees = {
+            'inscription_id': self.inscription.pk,
+            'methode_paiement': 'orange_money',
+            'reference_transaction': 'OM123',
+            'montant': self.inscription.concours.frais_inscription,
+            'capture_ecran': SimpleUploadedFile('preuve.jpg', creer_jpeg(40, 40), content_type='image/jpeg'),
+            **donnees,
+        }
+        en_tetes = {'Idempotency-Key': cle} if cle else {}
+        return self.client.post(self.url, donnees, format='multipart', headers=en_tetes)
+
+    def test_renvoi_rejoue_la_premiere_reponse(self):
+        premiere = self._payer('cle-1')
+        self.assertEqual(premiere.status_code, 201)
+
+        # Même contenu, nouvelle frontière multipart : pas de nouvelle validation
+        with mock.patch.object(PaiementCreateSerializer, 'is_valid') as is_valid:
+            renvoi = self._payer('cle-1')
+
+        is_valid.assert_not_called()
+        self.assertEqual(renvoi.status_code, 201)
+        self.assertEqual(renvoi['Idempotent-Replayed'], 'true')
+        self.assertEqual(renvoi.json(), premiere.json())
+        self.assertEqual(Paiement.objects.count(), 1)
+
+        # Sans clé, le renvoi est une nouvelle requête
+        self.assertEqual(self._payer().status_code, 400)
+
+    def test_reponse_enregistree_en_base(self):
+        premiere = self._payer('cle-1')
+        cache.clear()
+
+        # Le fichier renvoyé n'est pas relu pour comparer les requêtes
+        with mock.patch.object(InMemoryUploadedFile, 'chunks') as chunks:
+            renvoi = self._payer('cle-1')
+
+        chunks.assert_not_called()
+        self.assertEqual(renvoi['Idempotent-Replayed'], 'true')
+        self.assertEqual(renvoi.json(), premiere.json())
+        self.assertEqual(CleIdempotence.objects.get().statut, 201)
+
+    def test_cle_reutilisee_avec_un_autre_contenu(self):
+        self.assertEqual(self._payer('cle-1').status_code, 201)
+
+        reference = self._payer('cle-1', reference_transaction='OM456')
+        capture = self._payer(
+            'cle-1',
+            capture_ecran=SimpleUploadedFile('autre.jpg', creer_jpeg(40, 40), content_type='image/jpeg'),
+        )
+
+        self.assertEqual(reference.status_code, 422)
+        self.assertEqual(capture.status_code, 422)
+        self.assertNotIn('Idempotent-Replayed', reference)
+        self.assertEqual(Paiement.objects.count(), 1)
+
+    def test_renvoi_json_dans_un_autre_ordre(self):
+        url = reverse('concours:create_inscription')
+        data = donnees_inscription(self.user, creer_concours(nom='Autre concours'))
+        premiere = self.client.post(url, data, format='json', headers={'Idempotency-Key': 'cle-2'})
+
+        renvoi = self.client.post(
+            url, dict(reversed(list(data.items()))), format='json', headers={'Idempotency-Key': 'cle-2'}
+        )
+
+        self.assertEqual(premiere.status_code, 201, premiere.data)
+        self.assertEqual(renvoi.status_code, 201)
+        self.assertEqual(renvoi['Idempotent-Replayed'], 'true')
+
+    def test_cle_propre_a_l_utilisateur(self):
+        self._payer('cle-1')
+
+        autre = creer_utilisateur(email='autre@example.com')
+        self.client.force_authenticate(autre)
+        self.inscription = creer_inscription(autre, self.inscription.concours)
+        response = self._payer('cle-1', reference_transaction='OM456')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(Paiement.objects.count(), 2)
+
+    def test_requete_en_cours(self):
+        def renvoi_pendant_le_traitement(*args, **kwargs):
+            self.assertEqual(self._payer('cle-1').status_code, 409)
+            raise RuntimeError('Panne pendant le traitement')
+
+        with mock.patch.object(PaiementCreateSerializer, 'is_valid', side_effect=renvoi_pendant_le_traitement):
+            with self.assertRaises(RuntimeError):
+                self._payer('cle-1')
+
+        # La clé est libérée après l'échec
+        self.assertEqual(self._payer('cle-1').status_code, 201)
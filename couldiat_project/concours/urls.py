@@ -19,4 +19,12 @@ urlpatterns = [
     # Paiements
     path('paiements/valider/', views.valider_paiement, name='valider_paiement'),
     path('paiements/inscription/<int:inscription_id>/', views.paiement_detail, name='paiement_detail'),
+    
+    # Téléversement direct des documents
+    path('televersements/', views.demander_televersement, name='demander_televersement'),
+    path('televersements/local/<str:signature>/', views.televersement_local, name='televersement_local'),
+    path('televersements/blocs/', views.creer_televersement_blocs, name='creer_televersement_blocs'),
+    path('televersements/blocs/<uuid:pk>/', views.etat_televersement, name='etat_televersement'),
+    path('televersements/blocs/<uuid:pk>/<int:index>/', views.envoyer_bloc, name='envoyer_bloc'),
+    path('televersements/blocs/<uuid:pk>/terminer/', views.terminer_televersement, name='terminer_televersement'),
 ]
\ No newline at end of file
@@ -5,11 +5,26 @@ from rest_framework import status, generics, filters
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db.models import Value
+from django.http import JsonResponse
+from django.utils.http import parse_etags
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
-from .models import Concours, Inscription, Paiement
+from core.idempotence import idempotent
+from core.pagination import KeysetPagination
+from core.uploads import LecteurLimite, creer_jeton, creer_televersement, lire_signature_locale
+from .cache import CATALOGUE_TIMEOUT, cle_catalogue, etag_catalogue
+from .filters import ConcoursSearchFilter
+from .models import Concours, Inscription, Paiement, Televersement
 from .serializers import (
     ConcoursListSerializer,
     ConcoursDetailSerializer,
@@ -17,7 +32,16 @@ from .serializers import (
     InscriptionListSerializer,
     InscriptionDetailSerializer,
     PaiementCreateSerializer,
-    PaiementDetailSerializer
+    PaiementDetailSerializer,
+    TeleversementBlocsSerializer,
+    TeleversementSerializer
+)
+
+PARAMETRE_IDEMPOTENCE = openapi.Parameter(
+    'Idempotency-Key',
+    openapi.IN_HEADER,
+    type=openapi.TYPE_STRING,
+    description='Identifiant unique de la tentative : les renvois reçoivent la première réponse'
 )
 
 
@@ -28,16 +52,65 @@ class ConcoursListView(generics.ListAPIView):
     Query Parameters:
     - type: Filter par type (Direct ou Professionnel)
     - est_ouvert: Filter par statut (true/false)
-    - search: Recherche par nom
+    - search: Recherche plein texte (nom, lieu, description), classée par pertinence
+    - ordering: Tri (date_concours, created_at)
+    - cursor, page_size, count: Pagination par curseur (voir KeysetPagination)
+    
+    Le corps de la réponse est mis en cache pour tous les utilisateurs ;
+    seul `est_inscrit` est recalculé pour l'utilisateur connecté.
+    Les requêtes conditionnelles (If-None-Match) reçoivent un 304.
     """
     queryset = Concours.objects.all()
     serializer_class = ConcoursListSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, ConcoursSearchFilter, filters.OrderingFilter]
     filterset_fields = ['type', 'est_ouvert']
     search_fields = ['nom', 'description', 'lieu']
     ordering_fields = ['date_concours', 'created_at']
-    ordering = ['-created_at']
+    # Pas de tri par défaut ici : la recherche trie par pertinence,
+    # sinon Meta.ordering (-created_at) s'applique
+    
+    def get_queryset(self):
+        """Annoter les inscrits et l'inscription de l'utilisateur (pas de N+1)"""
+        return Concours.objects.avec_statistiques(self.request.user)
+    
+    def list(self, request, *args, **kwargs):
+        cle = cle_catalogue(request)
+        data = cache.get(cle)
+        
+        if data is None:
+            # Corps partagé : est_inscrit est superposé ensuite par utilisateur
+            queryset = self.filter_queryset(
+                Concours.objects.annotate(utilisateur_inscrit=Value(False))
+            )
+            page = self.paginate_queryset(queryset)
+            
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                data = self.get_paginated_response(serializer.data).data
+            else:
+                data = self.get_serializer(queryset, many=True).data
+            
+            cache.set(cle, data, CATALOGUE_TIMEOUT)
+        
+        resultats = data['results'] if isinstance(data, dict) else data
+        concours_inscrits = set(
+            Inscription.objects.filter(
+                user=request.user,
+                concours_id__in=[item['id'] for item in resultats]
+            ).values_list('concours_id', flat=True)
+        )
+        
+        etag = etag_catalogue(cle, concours_inscrits)
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+        
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        
+        for item in resultats:
+            item['est_inscrit'] = item['id'] in concours_inscrits
+        
+        return Response(data, headers=headers)
 
 
 class ConcoursDetailView(generics.RetrieveAPIView):
@@ -47,11 +120,16 @@ class ConcoursDetailView(generics.RetrieveAPIView):
     queryset = Concours.objects.all()
     serializer_class = ConcoursDetailSerializer
     permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        """Annoter les inscrits et l'inscription de l'utilisateur"""
+        return Concours.objects.avec_statistiques(self.request.user)
 
 
 @swagger_auto_schema(
     method='post',
     request_body=InscriptionCreateSerializer,
+    manual_parameters=[PARAMETRE_IDEMPOTENCE],
     responses={
         201: openapi.Response('Inscription créée', InscriptionDetailSerializer),
         400: 'Erreur de validation'
@@ -59,6 +137,7 @@ class ConcoursDetailView(generics.RetrieveAPIView):
 )
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@idempotent
 def create_inscription(request):
     """
     Créer une nouvelle inscription à un concours
@@ -69,6 +148,8 @@ def create_inscription(request):
     - cni: Document CNI (File)
     - photo: Photo d'identité (File)
     - telephone: Numéro de téléphone
+    
+    En-tête optionnel Idempotency-Key : un renvoi reçoit la première réponse.
     """
     serializer = InscriptionCreateSerializer(
         data=request.data,
@@ -95,11 +176,17 @@ def create_inscription(request):
 def mes_inscriptions(request):
     """
     Récupérer toutes les inscriptions de l'utilisateur connecté
+    
+    Query Parameters:
+    - cursor, page_size, count: Pagination par curseur (voir KeysetPagination)
     """
     inscriptions = Inscription.objects.filter(user=request.user).select_related('concours')
-    serializer = InscriptionListSerializer(inscriptions, many=True)
     
-    return Response(serializer.data)
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(inscriptions, request)
+    serializer = InscriptionListSerializer(page, many=True)
+    
+    return paginator.get_paginated_response(serializer.data)
 
 
 @swagger_auto_schema(
@@ -129,6 +216,7 @@ def inscription_detail(request, pk):
 @swagger_auto_schema(
     method='post',
     request_body=PaiementCreateSerializer,
+    manual_parameters=[PARAMETRE_IDEMPOTENCE],
     responses={
         201: openapi.Response('Paiement créé', PaiementDetailSerializer),
         400: 'Erreur de validation'
@@ -136,6 +224,7 @@ def inscription_detail(request, pk):
 )
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@idempotent
 def valider_paiement(request):
     """
     Soumettre un paiement pour validation
@@ -146,6 +235,8 @@ def valider_paiement(request):
     - reference_transaction: Référence de la transaction
     - montant: Montant payé en FCFA
     - capture_ecran: Capture d'écran de la preuve (File)
+    
+    En-tête optionnel Idempotency-Key : un renvoi reçoit la première réponse.
     """
     serializer = PaiementCreateSerializer(
         data=request.data,
@@ -186,4 +277,197 @@ def paiement_detail(request, inscription_id):
         }, status=status.HTTP_404_NOT_FOUND)
     
     serializer = PaiementDetailSerializer(paiement)
-    return Response(serializer.data)
\ No newline at end of file
+    return Response(serializer.data)
+
+
+@swagger_auto_schema(
+    method='post',
+    request_body=TeleversementSerializer,
+    responses={
+        201: 'URL de téléversement et jeton',
+        400: 'Erreur de validation'
+    }
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def demander_televersement(request):
+    """
+    Obtenir une URL pour envoyer un document directement au stockage
+    
+    Le client envoie le fichier en PUT sur `url` avec les `headers` fournis,
+    puis transmet `jeton` dans `cni_televersement`, `photo_televersement`
+    ou `capture_ecran_televersement` à la place du fichier.
+    
+    Required fields:
+    - type_document: cni, photo ou capture_ecran
+    - nom_fichier: Nom du fichier (pour l'extension)
+    - content_type: Type MIME du fichier
+    - taille: Taille en octets
+    """
+    serializer = TeleversementSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    
+    try:
+        televersement = creer_televersement(request, **serializer.validated_data)
+    except DjangoValidationError as e:
+        return Response({'error': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response(televersement, status=status.HTTP_201_CREATED)
+
+
+@csrf_exempt
+@require_http_methods(['PUT'])
+def televersement_local(request, signature):
+    """
+    Réception d'un téléversement direct sans S3 (développement)
+    
+    Équivalent local de l'URL présignée : la signature porte la clé et la
+    taille annoncée, le corps est écrit par blocs dans le stockage.
+    """
+    try:
+        data = lire_signature_locale(signature)
+    except signing.BadSignature:
+        return JsonResponse({'error': 'URL de téléversement invalide ou expirée'}, status=403)
+    
+    try:
+        longueur = int(request.headers.get('Content-Length', ''))
+    except ValueError:
+        return JsonResponse({'error': 'En-tête Content-Length requis'}, status=411)
+    
+    if longueur != data['taille']:
+        return JsonResponse({'error': 'Taille différente de celle annoncée'}, status=400)
+    
+    if default_storage.exists(data['cle']):
+        return JsonResponse({'error': 'Fichier déjà reçu'}, status=409)
+    
+    default_storage.save(data['cle'], File(LecteurLimite(request, longueur), name=data['cle']))
+    
+    return JsonResponse({'cle': data['cle']}, status=201)
+
+
+@swagger_auto_schema(
+    method='post',
+    request_body=TeleversementBlocsSerializer,
+    responses={
+        201: TeleversementBlocsSerializer,
+        400: 'Erreur de validation'
+    }
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def creer_televersement_blocs(request):
+    """
+    Démarrer un téléversement par blocs (reprenable)
+    
+    Le fichier est ensuite envoyé en `nombre_blocs` blocs de `taille_bloc`
+    octets (le dernier peut être plus court) sur
+    PUT /televersements/blocs/<id>/<index>/, dans n'importe quel ordre.
+    
+    Required fields:
+    - type_document: cni, photo ou capture_ecran
+    - nom_fichier: Nom du fichier (pour l'extension)
+    - taille: Taille totale en octets
+    - sha256: Empreinte du fichier complet (optionnel)
+    """
+    serializer = TeleversementBlocsSerializer(data=request.data, context={'request': request})
+    serializer.is_valid(raise_exception=True)
+    televersement = serializer.save()
+    
+    return Response(TeleversementBlocsSerializer(televersement).data, status=status.HTTP_201_CREATED)
+
+
+@swagger_auto_schema(
+    method='get',
+    responses={200: TeleversementBlocsSerializer}
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def etat_televersement(request, pk):
+    """
+    État d'un téléversement par blocs
+    
+    Après une coupure, le client relit `blocs_recus` et n'envoie que les
+    blocs manquants.
+    """
+    try:
+        televersement = Televersement.objects.get(id=pk, user=request.user)
+    except Televersement.DoesNotExist:
+        return Response({
+            'error': 'Téléversement non trouvé'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    return Response(TeleversementBlocsSerializer(televersement).data)
+
+
+@api_view(['PUT'])
+@permission_classes([IsAuthenticated])
+def envoyer_bloc(request, pk, index):
+    """
+    Envoyer un bloc d'un téléversement
+    
+    Le corps de la requête contient les octets bruts du bloc.
+    
+    Headers:
+    - Content-Length: Taille du bloc
+    - X-Checksum-Sha256: Empreinte hexadécimale du bloc
+    """
+    try:
+        televersement = Televersement.objects.get(id=pk, user=request.user)
+    except Televersement.DoesNotExist:
+        return Response({
+            'error': 'Téléversement non trouvé'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    sha256 = request.headers.get('X-Checksum-Sha256', '')
+    if len(sha256) != 64:
+        return Response({
+            'error': 'En-tête X-Checksum-Sha256 requis'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        longueur = int(request.headers.get('Content-Length', ''))
+    except ValueError:
+        return Response({
+            'error': 'En-tête Content-Length requis'
+        }, status=status.HTTP_411_LENGTH_REQUIRED)
+    
+    try:
+        televersement.ecrire_bloc(index, request.stream, longueur, sha256)
+    except DjangoValidationError as e:
+        return Response({'error': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({'index': index, 'recu': True}, status=status.HTTP_201_CREATED)
+
+
+@swagger_auto_schema(
+    method='post',
+    responses={
+        200: 'Jeton de téléversement',
+        400: 'Blocs manquants ou fichier corrompu'
+    }
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def terminer_televersement(request, pk):
+    """
+    Assembler les blocs reçus
+    
+    Retourne le même jeton que /televersements/, à transmettre dans
+    `cni_televersement`, `photo_televersement` ou `capture_ecran_televersement`.
+    """
+    try:
+        televersement = Televersement.objects.get(id=pk, user=request.user)
+    except Televersement.DoesNotExist:
+        return Response({
+            'error': 'Téléversement non trouvé'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    try:
+        cle = televersement.assembler()
+    except DjangoValidationError as e:
+        return Response({'error': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'jeton': creer_jeton(request.user, televersement.type_document, cle)
+    })
+
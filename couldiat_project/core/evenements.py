@@ -0,0 +1,126 @@
+"""
+Diffusion d'événements vers les clients connectés (Server-Sent Events)
+
+Le broker est choisi par le réglage EVENEMENTS_BROKER (chemin de classe).
+Le broker local ne relie que les clients d'un même processus : avec
+plusieurs workers ASGI, il faut une implémentation partagée (Redis
+pub/sub par exemple) respectant la même interface.
+"""
+import asyncio
+import logging
+import threading
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Nombre d'événements en attente par client avant resynchronisation
+TAILLE_FILE = 100
+
+# Événement envoyé à un client qui ne suit pas : il doit recharger ses listes
+RESYNCHRONISER = {'action': 'resynchroniser'}
+
+_broker = None
+
+
+class Abonnement:
+    """File d'événements d'un client, liée à sa boucle asyncio"""
+    
+    def __init__(self, broker, canal):
+        self.broker = broker
+        self.canal = canal
+        self.boucle = asyncio.get_running_loop()
+        self.file = asyncio.Queue(maxsize=TAILLE_FILE)
+    
+    def deposer(self, evenement):
+        """Ajouter un événement (depuis la boucle de l'abonnement)"""
+        if self.file.full():
+            # Client trop lent : inutile de garder un historique partiel
+            while not self.file.empty():
+                self.file.get_nowait()
+            evenement = RESYNCHRONISER
+        self.file.put_nowait(evenement)
+    
+    async def recevoir(self, delai=None):
+        """Prochain événement, ou None après `delai` secondes sans événement"""
+        try:
+            return await asyncio.wait_for(self.file.get(), delai)
+        except asyncio.TimeoutError:
+            return None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        self.broker.desabonner(self)
+
+
+class Broker(ABC):
+    """Interface des brokers d'événements"""
+    
+    @abstractmethod
+    def publier(self, canal, evenement):
+        """Diffuser un événement (dict sérialisable en JSON), depuis n'importe quel thread"""
+    
+    @abstractmethod
+    def abonner(self, canal):
+        """Créer un Abonnement, depuis une coroutine"""
+    
+    @abstractmethod
+    def desabonner(self, abonnement):
+        """Retirer un Abonnement (à la fermeture du flux)"""
+
+
+class LocalBroker(Broker):
+    """Broker en mémoire, limité au processus courant"""
+    
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self._abonnements = {}
+    
+    def publier(self, canal, evenement):
+        with self._verrou:
+            abonnements = list(self._abonnements.get(canal, ()))
+        
+        for abonnement in abonnements:
+            try:
+                abonnement.boucle.call_soon_threadsafe(abonnement.deposer, evenement)
+            except RuntimeError:
+                # Boucle fermée sans désabonnement
+                self.desabonner(abonnement)
+    
+    def abonner(self, canal):
+        abonnement = Abonnement(self, canal)
+        with self._verrou:
+            self._abonnements.setdefault(canal, set()).add(abonnement)
+        return abonnement
+    
+    def desabonner(self, abonnement):
+        with self._verrou:
+            self._abonnements.get(abonnement.canal, set()).discard(abonnement)
+
+
+def get_broker():
+    """Broker configuré, créé au premier usage"""
+    global _broker
+    if _broker is None:
+        _broker = import_string(settings.EVENEMENTS_BROKER)()
+    return _broker
+
+
+def publier_apres_commit(canal, evenement):
+    """
+    Publier l'événement une fois la transaction courante validée
+    
+    Une panne du broker est journalisée sans faire échouer la requête.
+    """
+    def publier():
+        try:
+            get_broker().publier(canal, evenement)
+        except Exception:
+            logger.exception('Publication impossible sur le canal %s', canal)
+    
+    transaction.on_commit(publier)
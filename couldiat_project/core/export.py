@@ -0,0 +1,194 @@
+"""
+Écriture en flux de fichiers CSV et XLSX
+
+Les générateurs produisent le fichier par morceaux à partir d'un itérable
+de lignes : utilisés avec un StreamingHttpResponse et QuerySet.iterator(),
+la mémoire consommée ne dépend pas du nombre de lignes.
+"""
+import csv
+import datetime
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from asgiref.sync import sync_to_async
+
+# Taille approximative des morceaux envoyés au client
+TAILLE_MORCEAU = 64 * 1024
+
+# Caractères de contrôle interdits en XML 1.0
+CONTROLE_XML = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_FIN = object()
+
+
+class _Tampon:
+    """Fichier en écriture seule dont le contenu est vidé à chaque lecture"""
+    
+    def __init__(self):
+        self.morceaux = []
+        self.taille = 0
+    
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self.morceaux.append(data)
+        self.taille += len(data)
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def vider(self):
+        data = b''.join(self.morceaux)
+        self.morceaux = []
+        self.taille = 0
+        return data
+
+
+def _texte(valeur):
+    if valeur is None:
+        return ''
+    if isinstance(valeur, datetime.datetime):
+        return valeur.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(valeur, datetime.date):
+        return valeur.isoformat()
+    return str(valeur)
+
+
+def _texte_csv(valeur):
+    texte = _texte(valeur)
+    # Empêcher l'interprétation en formule par le tableur (saisie des candidats)
+    if isinstance(valeur, str) and texte[:1] in ('=', '+', '-', '@', '\t', '\r'):
+        return "'" + texte
+    return texte
+
+
+def flux_csv(entetes, lignes):
+    """
+    Générer un CSV UTF-8 (avec BOM pour Excel), séparateur `;`
+    
+    Args:
+        entetes: Noms des colonnes
+        lignes: Itérable de tuples
+    """
+    tampon = _Tampon()
+    tampon.write('\ufeff')
+    writer = csv.writer(tampon, delimiter=';')
+    writer.writerow(entetes)
+    
+    for ligne in lignes:
+        writer.writerow([_texte_csv(valeur) for valeur in ligne])
+        if tampon.taille >= TAILLE_MORCEAU:
+            yield tampon.vider()
+    
+    yield tampon.vider()
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{nom}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def _cellule(valeur):
+    if isinstance(valeur, bool) or valeur is None:
+        valeur = _texte(valeur)
+    if isinstance(valeur, (int, float)):
+        return f'<c><v>{valeur}</v></c>'
+    texte = escape(CONTROLE_XML.sub('', _texte(valeur)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{texte}</t></is></c>'
+
+
+def flux_xlsx(entetes, lignes, nom_feuille='Export'):
+    """
+    Générer un classeur XLSX d'une feuille, sans dépendance externe
+    
+    Le classeur est écrit en ZIP « streaming » (descripteurs de données,
+    ZIP64) : rien n'est conservé en mémoire au-delà du morceau courant.
+    Les cellules texte sont en chaînes inline (pas de table partagée).
+    """
+    tampon = _Tampon()
+    
+    with zipfile.ZipFile(tampon, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        archive.writestr('_rels/.rels', _RELS)
+        archive.writestr('xl/workbook.xml', _WORKBOOK.format(nom=escape(nom_feuille[:31])))
+        archive.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+        
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as feuille:
+            feuille.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b'<sheetData>'
+            )
+            feuille.write(('<row>' + ''.join(_cellule(e) for e in entetes) + '</row>').encode())
+            
+            morceau = []
+            for ligne in lignes:
+                morceau.append('<row>' + ''.join(_cellule(v) for v in ligne) + '</row>')
+                if len(morceau) >= 500:
+                    feuille.write(''.join(morceau).encode())
+                    morceau = []
+                    if tampon.taille >= TAILLE_MORCEAU:
+                        yield tampon.vider()
+            
+            feuille.write(''.join(morceau).encode())
+            feuille.write(b'</sheetData></worksheet>')
+        
+        yield tampon.vider()
+    
+    yield tampon.vider()
+
+
+async def flux_asynchrone(morceaux):
+    """
+    Servir un générateur synchrone sous ASGI, un morceau à la fois
+    
+    Sous ASGI, StreamingHttpResponse lit un itérateur synchrone en entier
+    avant d'envoyer la réponse. Chaque morceau est ici produit par
+    sync_to_async, dans le thread de la requête : le curseur côté serveur
+    reste sur la même connexion et la mémoire ne dépend pas de la taille
+    du fichier.
+    """
+    morceaux = iter(morceaux)
+    try:
+        while True:
+            morceau = await sync_to_async(next)(morceaux, _FIN)
+            if morceau is _FIN:
+                return
+            yield morceau
+    finally:
+        # Client déconnecté : fermer le générateur (et son curseur)
+        if hasattr(morceaux, 'close'):
+            await sync_to_async(morceaux.close)()
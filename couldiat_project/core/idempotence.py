@@ -0,0 +1,133 @@
+"""
+Clés d'idempotence pour les créations sujettes aux nouvelles tentatives
+
+Un client qui renvoie une requête après une coupure réseau ajoute l'en-tête
+`Idempotency-Key` (un UUID généré par tentative logique). La première
+réponse est enregistrée en base (core.models.CleIdempotence) avec
+l'empreinte du contenu de la requête : partagée entre les processus, elle
+n'est pas évincée comme une entrée du cache. Les requêtes suivantes avec
+la même clé et le même contenu la reçoivent telle quelle, sans relancer
+la validation. Une clé réutilisée avec un autre contenu est refusée (422).
+"""
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.core.files.uploadedfile import UploadedFile
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import CleIdempotence
+
+# Durée de conservation des réponses
+DUREE_CONSERVATION = 24 * 60 * 60
+# Durée maximale d'un traitement en cours (protège contre un worker tué)
+DUREE_TRAITEMENT = 5 * 60
+
+LONGUEUR_MAX = 255
+
+
+def _valeur(valeur):
+    """Fichier représenté par son nom et sa taille, sans relire son contenu"""
+    if isinstance(valeur, UploadedFile):
+        return {'fichier': valeur.name, 'taille': valeur.size}
+    return valeur
+
+
+def empreinte_requete(request):
+    """
+    Empreinte du contenu de la requête, indépendante de son encodage
+    
+    Calculée sur les données analysées et non sur le corps brut : la
+    frontière multipart et l'ordre des clés JSON changent d'un envoi à
+    l'autre pour un même contenu. Les documents envoyés par jeton de
+    téléversement sont des champs texte, pris tels quels.
+    """
+    donnees = request.data
+    if hasattr(donnees, 'lists'):
+        donnees = {champ: [_valeur(v) for v in valeurs] for champ, valeurs in donnees.lists()}
+    
+    contenu = json.dumps(donnees, sort_keys=True, cls=DjangoJSONEncoder, default=str)
+    return hashlib.sha256(contenu.encode()).hexdigest()
+
+
+def _expiree(enregistree):
+    """Réponse plus ancienne que sa conservation, ou traitement abandonné"""
+    duree = DUREE_CONSERVATION if enregistree.statut is not None else DUREE_TRAITEMENT
+    return enregistree.created_at < timezone.now() - timedelta(seconds=duree)
+
+
+def idempotent(vue):
+    """
+    Décorateur de vue DRF (sous @api_view et @permission_classes)
+    
+    Les réponses 2xx et 4xx sont conservées ; une erreur 5xx ou une
+    exception libère la clé pour permettre une nouvelle tentative.
+    """
+    @wraps(vue)
+    def wrapper(request, *args, **kwargs):
+        cle = request.headers.get('Idempotency-Key')
+        if not cle:
+            return vue(request, *args, **kwargs)
+        
+        if len(cle) > LONGUEUR_MAX:
+            return Response({
+                'error': f'La clé d\'idempotence est limitée à {LONGUEUR_MAX} caractères'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        cles = CleIdempotence.objects.filter(user=request.user, chemin=request.path, cle=cle)
+        enregistree = cles.first()
+        if enregistree is not None and _expiree(enregistree):
+            cles.filter(pk=enregistree.pk).delete()
+            enregistree = None
+        
+        if enregistree is not None:
+            if enregistree.statut is None:
+                return _en_cours()
+            
+            if enregistree.empreinte != empreinte_requete(request):
+                return Response({
+                    'error': 'Cette clé d\'idempotence a déjà été utilisée pour une autre requête'
+                }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+            
+            response = Response(enregistree.reponse, status=enregistree.statut)
+            response['Idempotent-Replayed'] = 'true'
+            return response
+        
+        # La contrainte unique départage les requêtes simultanées
+        try:
+            with transaction.atomic():
+                enregistree = CleIdempotence.objects.create(
+                    user=request.user,
+                    chemin=request.path,
+                    cle=cle,
+                    empreinte=empreinte_requete(request)
+                )
+        except IntegrityError:
+            return _en_cours()
+        
+        try:
+            response = vue(request, *args, **kwargs)
+        except Exception:
+            enregistree.delete()
+            raise
+        
+        if response.status_code >= 500:
+            enregistree.delete()
+        else:
+            enregistree.statut = response.status_code
+            enregistree.reponse = response.data
+            enregistree.save(update_fields=['statut', 'reponse'])
+        return response
+    
+    return wrapper
+
+
+def _en_cours():
+    return Response({
+        'error': 'Une requête avec cette clé d\'idempotence est en cours de traitement'
+    }, status=status.HTTP_409_CONFLICT)
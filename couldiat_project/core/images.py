@@ -0,0 +1,280 @@
+"""
+Normalisation des images téléversées (photos, captures d'écran)
+
+Les images sont traitées hors de la requête, dans un pool de threads
+(Pillow libère le GIL pendant le décodage et l'encodage) :
+- détection du format réel par les octets magiques
+- application de l'orientation EXIF puis suppression des métadonnées
+- réencodage en WebP aux dimensions bornées
+- génération d'une miniature pour la revue des dossiers
+- empreinte perceptuelle (dHash) pour repérer les images réutilisées
+"""
+import io
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.dispatch import Signal
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+DIMENSION_MAX = 1600
+DIMENSION_MINIATURE = 320
+QUALITE_WEBP = 80
+METHODE_WEBP = 2  # 0 (rapide) à 6 (compact) : au-delà de 2, +2 à 7x de CPU pour ~1 %
+
+# Octets magiques : (décalage, signature) -> format
+SIGNATURES = [
+    (0, b'\xff\xd8\xff', 'jpeg'),
+    (0, b'\x89PNG\r\n\x1a\n', 'png'),
+    (8, b'WEBP', 'webp'),
+    (0, b'%PDF-', 'pdf'),
+]
+FORMATS_IMAGE = {'jpeg', 'png', 'webp'}
+
+_executor = None
+
+# Envoyé après l'enregistrement d'une image normalisée
+# (sender=modèle, pk, champ, empreinte)
+image_normalisee = Signal()
+
+
+def detecter_format(fichier):
+    """
+    Détecter le format réel d'un fichier d'après ses premiers octets
+    
+    Returns:
+        'jpeg', 'png', 'webp', 'pdf' ou None
+    """
+    position = fichier.tell() if hasattr(fichier, 'tell') else None
+    entete = fichier.read(16)
+    if position is not None:
+        fichier.seek(position)
+    
+    for decalage, signature, format_ in SIGNATURES:
+        if entete[decalage:decalage + len(signature)] == signature:
+            if format_ == 'webp' and entete[:4] != b'RIFF':
+                continue
+            return format_
+    return None
+
+
+def _encoder_webp(image, dimension):
+    copie = image.copy()
+    copie.thumbnail((dimension, dimension), Image.LANCZOS)
+    sortie = io.BytesIO()
+    # Sans exif= ni icc_profile=, Pillow n'écrit aucune métadonnée
+    copie.save(sortie, 'WEBP', quality=QUALITE_WEBP, method=METHODE_WEBP)
+    return sortie.getvalue()
+
+
+def empreinte_perceptuelle(image):
+    """
+    dHash 64 bits : sens du gradient de luminosité entre pixels voisins
+    d'une vignette 9x8
+    
+    Insensible au réencodage, au redimensionnement et aux recadrages
+    légers ; deux images proches ont une faible distance de Hamming.
+    
+    Returns:
+        Entier signé sur 64 bits (stockable dans un BigIntegerField)
+    """
+    pixels = image.convert('L').resize((9, 8), Image.BOX).tobytes()
+    valeur = 0
+    for ligne in range(0, 72, 9):
+        for colonne in range(ligne, ligne + 8):
+            valeur = (valeur << 1) | (pixels[colonne] > pixels[colonne + 1])
+    return valeur - (1 << 64) if valeur >> 63 else valeur
+
+
+def _preparer(image):
+    """
+    Orientation EXIF, mode et dimensions de l'image normalisée
+    
+    Partagé par la normalisation et l'indexation des captures existantes :
+    une même image donne la même empreinte par les deux chemins.
+    """
+    # JPEG : décoder directement à l'échelle réduite (1/2, 1/4, 1/8)
+    # la plus petite qui reste au-dessus de la taille cible
+    ratio = min(DIMENSION_MAX / max(image.size), 1)
+    image.draft('RGB', (int(image.width * ratio), int(image.height * ratio)))
+    image = ImageOps.exif_transpose(image)
+    image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+    image.thumbnail((DIMENSION_MAX, DIMENSION_MAX), Image.LANCZOS)
+    return image
+
+
+def _verifier_format(fichier):
+    if detecter_format(fichier) not in FORMATS_IMAGE:
+        raise ValueError('Le contenu du fichier n\'est pas une image JPG, PNG ou WEBP.')
+
+
+def normaliser_image(fichier):
+    """
+    Réencoder une image en WebP sans métadonnées
+    
+    Args:
+        fichier: Fichier binaire ouvert
+    
+    Returns:
+        (image, miniature, empreinte) : octets WebP et dHash de l'image
+    
+    Raises:
+        ValueError: Le contenu n'est pas une image JPG, PNG ou WEBP
+    """
+    _verifier_format(fichier)
+    
+    with Image.open(fichier) as image:
+        image = _preparer(image)
+        
+        return (
+            _encoder_webp(image, DIMENSION_MAX),
+            _encoder_webp(image, DIMENSION_MINIATURE),
+            empreinte_perceptuelle(image),
+        )
+
+
+def empreinte_image(fichier):
+    """
+    dHash d'une image, sans la réencoder
+    
+    Sert à indexer les images enregistrées avant le calcul des empreintes.
+    
+    Raises:
+        ValueError: Le contenu n'est pas une image JPG, PNG ou WEBP
+    """
+    _verifier_format(fichier)
+    
+    with Image.open(fichier) as image:
+        return empreinte_perceptuelle(_preparer(image))
+
+
+def chemin_miniature(nom):
+    """Emplacement de la miniature associée à une image normalisée"""
+    dossier, fichier = os.path.split(nom)
+    return os.path.join(dossier, 'miniatures', fichier)
+
+
+def est_normalisee(instance, champ, champ_miniature, champ_refus=None):
+    """Vrai si l'image du champ a déjà été traitée, refusée, ou est absente"""
+    nom = getattr(instance, champ).name
+    if not nom:
+        return True
+    if champ_refus and getattr(instance, champ_refus) == nom:
+        return True
+    return getattr(instance, champ_miniature).name == chemin_miniature(nom)
+
+
+def traiter_image(label_modele, pk, champ, champ_miniature, champ_empreinte=None, champ_refus=None):
+    """
+    Normaliser l'image d'une instance et enregistrer sa miniature
+    (et son empreinte perceptuelle si `champ_empreinte` est donné)
+    
+    La mise à jour est conditionnée au nom de fichier lu au départ : si
+    l'utilisateur a changé d'image entre-temps, le résultat est abandonné.
+    Une image illisible ou introuvable est notée dans `champ_refus` pour
+    ne pas être retraitée à chaque sauvegarde.
+    """
+    Model = apps.get_model(label_modele)
+    
+    try:
+        nom = Model.objects.values_list(champ, flat=True).get(pk=pk)
+    except Model.DoesNotExist:
+        return
+    if not nom:
+        return
+    
+    try:
+        with default_storage.open(nom, 'rb') as fichier:
+            image, miniature, empreinte = normaliser_image(fichier)
+    except FileNotFoundError:
+        logger.debug('Image introuvable : %s', nom)
+        _noter_refus(Model, pk, champ, nom, champ_refus)
+        return
+    except (ValueError, OSError, Image.DecompressionBombError) as e:
+        logger.warning('Image refusée %s #%s.%s : %s', label_modele, pk, champ, e)
+        _noter_refus(Model, pk, champ, nom, champ_refus)
+        return
+    
+    dossier = os.path.dirname(nom)
+    nouveau = default_storage.save(
+        os.path.join(dossier, f'{uuid.uuid4().hex}.webp'), ContentFile(image)
+    )
+    nom_miniature = default_storage.save(chemin_miniature(nouveau), ContentFile(miniature))
+    
+    champs = {champ: nouveau, champ_miniature: nom_miniature}
+    if champ_empreinte:
+        champs[champ_empreinte] = empreinte
+    
+    # update() ne déclenche pas post_save : pas de nouveau traitement
+    if Model.objects.filter(pk=pk, **{champ: nom}).update(**champs):
+        default_storage.delete(nom)
+        image_normalisee.send(sender=Model, pk=pk, champ=champ, empreinte=empreinte)
+    else:
+        default_storage.delete(nouveau)
+        default_storage.delete(nom_miniature)
+
+
+def _noter_refus(Model, pk, champ, nom, champ_refus):
+    """Noter le fichier refusé, s'il est toujours celui de l'instance"""
+    if champ_refus:
+        # update() ne déclenche pas post_save
+        Model.objects.filter(pk=pk, **{champ: nom}).update(**{champ_refus: nom})
+
+
+def _traiter_en_arriere_plan(*arguments):
+    """Exécution dans un thread du pool, qui libère sa connexion ensuite"""
+    try:
+        traiter_image(*arguments)
+    except Exception:
+        logger.exception('Normalisation impossible : %s #%s.%s', *arguments[:3])
+    finally:
+        connection.close()
+
+
+def get_executor():
+    """Pool de threads partagé, créé au premier usage"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_PIPELINE_WORKERS,
+            thread_name_prefix='images'
+        )
+    return _executor
+
+
+def planifier_normalisation(instance, champ, champ_miniature, champ_empreinte=None,
+                            champ_refus=None, update_fields=None):
+    """
+    Planifier la normalisation après le commit de la transaction en cours
+    
+    Rien n'est planifié pour une sauvegarde partielle (`update_fields` du
+    signal post_save) qui ne touche pas l'image, comme la mise à jour de
+    last_login à chaque connexion.
+    
+    Avec IMAGE_PIPELINE_WORKERS = 0, le traitement est exécuté directement
+    (tests, développement).
+    """
+    if update_fields is not None and champ not in update_fields:
+        return
+    if est_normalisee(instance, champ, champ_miniature, champ_refus):
+        return
+    
+    arguments = (
+        instance._meta.label, instance.pk, champ, champ_miniature, champ_empreinte, champ_refus
+    )
+    
+    def soumettre():
+        if settings.IMAGE_PIPELINE_WORKERS:
+            get_executor().submit(_traiter_en_arriere_plan, *arguments)
+        else:
+            traiter_image(*arguments)
+    
+    transaction.on_commit(soumettre)
@@ -0,0 +1,20 @@
+"""
+Commande pour supprimer les clés d'idempotence expirées
+Usage: python manage.py purge_idempotency_keys
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.idempotence import DUREE_CONSERVATION
+from core.models import CleIdempotence
+
+
+class Command(BaseCommand):
+    help = 'Supprimer les clés d\'idempotence plus anciennes que leur durée de conservation'
+    
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(seconds=DUREE_CONSERVATION)
+        total, _ = CleIdempotence.objects.filter(created_at__lt=limite).delete()
+        
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} clés d\'idempotence supprimées'))
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-17 07:51
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CleIdempotence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chemin', models.CharField(max_length=255, verbose_name='chemin')),
+                ('cle', models.CharField(max_length=255, verbose_name='clé')),
+                ('empreinte', models.CharField(help_text='SHA-256 du contenu de la requête (voir core.idempotence)', max_length=64, verbose_name='empreinte de la requête')),
+                ('statut', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='statut de la réponse')),
+                ('reponse', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True, verbose_name='réponse')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='date de création')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='utilisateur')),
+            ],
+            options={
+                'verbose_name': "clé d'idempotence",
+                'verbose_name_plural': "clés d'idempotence",
+                'indexes': [models.Index(fields=['created_at'], name='cle_idempotence_created_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'chemin', 'cle'), name='cle_idempotence_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+"""
+Modèles partagés par les applications
+"""
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class CleIdempotence(models.Model):
+    """
+    Requête reçue avec un en-tête Idempotency-Key, et sa réponse
+    
+    La contrainte unique (utilisateur, chemin, clé) garantit qu'une seule
+    requête traite une clé, quel que soit le processus qui la reçoit. Tant
+    que la réponse n'est pas enregistrée (statut vide), le traitement est
+    en cours.
+    """
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name=_('utilisateur')
+    )
+    chemin = models.CharField(_('chemin'), max_length=255)
+    cle = models.CharField(_('clé'), max_length=255)
+    empreinte = models.CharField(
+        _('empreinte de la requête'),
+        max_length=64,
+        help_text=_("SHA-256 du contenu de la requête (voir core.idempotence)")
+    )
+    statut = models.PositiveSmallIntegerField(_('statut de la réponse'), null=True, blank=True)
+    reponse = models.JSONField(_('réponse'), null=True, blank=True, encoder=DjangoJSONEncoder)
+    
+    created_at = models.DateTimeField(_('date de création'), auto_now_add=True)
+    
+    class Meta:
+        verbose_name = _('clé d\'idempotence')
+        verbose_name_plural = _('clés d\'idempotence')
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'chemin', 'cle'], name='cle_idempotence_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['created_at'], name='cle_idempotence_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.chemin} {self.cle}"
@@ -0,0 +1,210 @@
+"""
+Pagination par curseur (keyset) pour les listes de l'API
+"""
+import base64
+import datetime
+import decimal
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pagination par curseur sur l'ordre du queryset, départagé par `id`
+    
+    Au lieu de OFFSET, chaque page filtre sur la position du dernier élément
+    de la page précédente, par exemple `(created_at, id) < (c, i)` pour
+    l'ordre `-created_at` : le coût d'une page ne dépend pas de sa profondeur.
+    Le nombre total n'est calculé que si le client le demande (`?count=true`).
+    
+    L'ordre est celui du queryset (order_by() ou Meta.ordering). Il doit
+    porter sur des champs ou annotations non nuls du modèle.
+    
+    Query Parameters:
+    - cursor: Curseur opaque renvoyé dans `next` / `previous`
+    - page_size: Taille de page (max 100)
+    - count: true pour inclure le nombre total d'éléments
+    """
+    
+    page_size = api_settings.PAGE_SIZE or 50
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Curseur invalide'
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.model = queryset.model
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        self.count = None
+        
+        if request.query_params.get(self.count_query_param, '').lower() in ('1', 'true'):
+            self.count = queryset.count()
+        
+        position, reverse = self.decode_cursor(request)
+        ordering = self.ordering
+        
+        if reverse:
+            ordering = [(field, not descending) for field, descending in ordering]
+        
+        queryset = queryset.order_by(*[
+            f'-{field}' if descending else field for field, descending in ordering
+        ])
+        if position is not None:
+            queryset = queryset.filter(self.position_filter(ordering, position))
+        
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        
+        if reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        
+        self.page = results
+        return results
+    
+    def get_paginated_response(self, data):
+        response = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        
+        if self.count is not None:
+            response = {'count': self.count, **response}
+        
+        return Response(response)
+    
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer', 'example': 123},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+    
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        
+        return min(max(page_size, 1), self.max_page_size)
+    
+    def get_ordering(self, queryset):
+        """Liste de (champ, décroissant) se terminant par la clé primaire"""
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        result = []
+        
+        for field in ordering:
+            if not isinstance(field, str) or '__' in field or field.lstrip('-') == '?':
+                raise ImproperlyConfigured(
+                    'KeysetPagination requiert un tri sur des champs du modèle, '
+                    f'pas sur {field!r}.'
+                )
+            result.append((field.lstrip('-'), field.startswith('-')))
+        
+        pk_name = queryset.model._meta.pk.name
+        if not any(field in ('pk', pk_name) for field, _ in result):
+            descending = result[0][1] if result else False
+            result.append((pk_name, descending))
+        
+        return result
+    
+    def position_filter(self, ordering, position):
+        """
+        Condition lexicographique « après la position » :
+        (a > x) OR (a = x AND b > y) OR ...
+        """
+        condition = Q()
+        egalites = {}
+        
+        for (field, descending), value in zip(ordering, position):
+            lookup = 'lt' if descending else 'gt'
+            condition |= Q(**egalites, **{f'{field}__{lookup}': value})
+            egalites[field] = value
+        
+        return condition
+    
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+    
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+    
+    def encode_cursor(self, obj, reverse):
+        payload = {'p': [self.to_json(getattr(obj, field)) for field, _ in self.ordering]}
+        if reverse:
+            payload['r'] = 1
+        
+        cursor = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(',', ':')).encode()
+        ).decode().rstrip('=')
+        
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+    
+    def decode_cursor(self, request):
+        """Retourne (position, reverse) ; position est None sans curseur"""
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            values = payload['p']
+            if len(values) != len(self.ordering):
+                raise ValueError
+            position = [
+                self.from_json(field, value) for (field, _), value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        
+        return position, bool(payload.get('r'))
+    
+    def to_json(self, value):
+        if isinstance(value, (datetime.date, datetime.time)):
+            # isoformat() conserve les microsecondes (nécessaire pour l'égalité)
+            return value.isoformat()
+        if isinstance(value, (decimal.Decimal, datetime.timedelta)):
+            return str(value)
+        return value
+    
+    def from_json(self, field, value):
+        try:
+            model_field = self.model._meta.get_field(field)
+        except FieldDoesNotExist:
+            if field != 'pk':
+                # Annotation (ex: rang de recherche) : valeur JSON brute
+                return value
+            model_field = self.model._meta.pk
+        
+        try:
+            return model_field.to_python(value)
+        except Exception:
+            raise ValueError(value)
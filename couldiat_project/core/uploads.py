@@ -0,0 +1,294 @@
+"""
+Téléversement direct des documents vers le stockage
+
+Le client demande une URL de téléversement (PUT présigné S3 si USE_S3,
+sinon URL signée servie par l'application en développement), envoie le
+fichier directement dessus, puis transmet le jeton reçu à l'endpoint de
+création. Le fichier ne transite plus par les workers gunicorn.
+
+À la vérification du jeton, le contenu réel du fichier (octets magiques)
+est contrôlé. L'appelant enregistre ensuite l'utilisation du document dans
+sa transaction (voir concours.models.TeleversementUtilise) : un document ne
+peut être rattaché qu'à un seul enregistrement.
+"""
+import hashlib
+import io
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.urls import reverse
+
+from .images import detecter_format
+
+# Types de documents acceptés : dossier de stockage, extensions, taille max
+TYPES_DOCUMENTS = {
+    'cni': {
+        'dossier': 'inscriptions/cni/',
+        'extensions': ['pdf', 'jpg', 'jpeg', 'png', 'webp'],
+        'types_mime': ['application/pdf', 'image/jpeg', 'image/png', 'image/webp'],
+        'taille_max_mb': 5,
+    },
+    'photo': {
+        'dossier': 'inscriptions/photos/',
+        'extensions': ['jpg', 'jpeg', 'png', 'webp'],
+        'types_mime': ['image/jpeg', 'image/png', 'image/webp'],
+        'taille_max_mb': 2,
+    },
+    'capture_ecran': {
+        'dossier': 'paiements/preuves/',
+        'extensions': ['jpg', 'jpeg', 'png', 'webp'],
+        'types_mime': ['image/jpeg', 'image/png', 'image/webp'],
+        'taille_max_mb': 3,
+    },
+}
+
+# Format réel attendu (voir core.images.detecter_format) selon l'extension
+FORMATS_EXTENSIONS = {'pdf': 'pdf', 'jpg': 'jpeg', 'jpeg': 'jpeg', 'png': 'png', 'webp': 'webp'}
+
+SIGNING_SALT = 'core.uploads'
+URL_EXPIRATION = 15 * 60  # 15 minutes pour envoyer le fichier
+JETON_EXPIRATION = 24 * 60 * 60  # 24 heures pour l'utiliser
+
+
+def taille_max(type_document):
+    """Taille maximale en octets pour un type de document"""
+    return TYPES_DOCUMENTS[type_document]['taille_max_mb'] * 1024 * 1024
+
+
+def generer_cle(type_document, nom_fichier):
+    """
+    Générer la clé de stockage d'un document
+    
+    Raises:
+        ValidationError: Type de document ou extension non supportés
+    """
+    if type_document not in TYPES_DOCUMENTS:
+        raise ValidationError('Type de document inconnu.')
+    
+    config = TYPES_DOCUMENTS[type_document]
+    ext = nom_fichier.rsplit('.', 1)[-1].lower() if '.' in nom_fichier else ''
+    
+    if ext not in config['extensions']:
+        raise ValidationError(
+            f'Format non supporté. Utilisez: {", ".join(config["extensions"]).upper()}'
+        )
+    
+    return f"{config['dossier']}{uuid.uuid4().hex}.{ext}"
+
+
+def valider_document(type_document, nom_fichier, taille):
+    """
+    Vérifier le format et la taille annoncés d'un document
+    
+    Returns:
+        La clé de stockage attribuée au document
+    """
+    cle = generer_cle(type_document, nom_fichier)
+    
+    if taille > taille_max(type_document):
+        raise ValidationError(
+            f'La taille du fichier ne doit pas dépasser '
+            f'{TYPES_DOCUMENTS[type_document]["taille_max_mb"]}MB.'
+        )
+    
+    return cle
+
+
+def creer_jeton(user, type_document, cle):
+    """Jeton prouvant que `cle` a été attribuée à `user` pour `type_document`"""
+    return signing.dumps(
+        {'cle': cle, 'user': user.pk, 'type': type_document},
+        salt=SIGNING_SALT
+    )
+
+
+def creer_televersement(request, type_document, nom_fichier, content_type, taille):
+    """
+    Préparer un téléversement direct
+    
+    Args:
+        request: Requête de l'utilisateur (pour construire l'URL locale)
+        type_document: 'cni', 'photo' ou 'capture_ecran'
+        nom_fichier: Nom du fichier côté client (pour l'extension)
+        content_type: Type MIME annoncé
+        taille: Taille du fichier en octets
+    
+    Returns:
+        dict avec l'URL de PUT, les en-têtes à envoyer et le jeton à
+        transmettre ensuite à l'endpoint de création
+    """
+    cle = valider_document(type_document, nom_fichier, taille)
+    
+    if content_type not in TYPES_DOCUMENTS[type_document]['types_mime']:
+        raise ValidationError('Type de fichier non supporté pour ce document.')
+    
+    if settings.USE_S3:
+        url = default_storage.connection.meta.client.generate_presigned_url(
+            'put_object',
+            Params={
+                'Bucket': default_storage.bucket_name,
+                'Key': default_storage._normalize_name(cle),
+                'ContentType': content_type,
+                'ContentLength': taille,
+            },
+            ExpiresIn=URL_EXPIRATION,
+        )
+    else:
+        signature = signing.dumps(
+            {'cle': cle, 'type': type_document, 'taille': taille},
+            salt=SIGNING_SALT
+        )
+        url = request.build_absolute_uri(
+            reverse('concours:televersement_local', args=[signature])
+        )
+    
+    return {
+        'url': url,
+        'methode': 'PUT',
+        'headers': {'Content-Type': content_type},
+        'expire_dans': URL_EXPIRATION,
+        'jeton': creer_jeton(request.user, type_document, cle),
+    }
+
+
+def lire_signature_locale(signature):
+    """Décoder la signature d'une URL de téléversement locale"""
+    return signing.loads(signature, salt=SIGNING_SALT, max_age=URL_EXPIRATION)
+
+
+def lire_entete(cle, taille=16):
+    """Premiers octets d'un fichier du stockage, sans le télécharger en entier"""
+    if settings.USE_S3:
+        reponse = default_storage.connection.meta.client.get_object(
+            Bucket=default_storage.bucket_name,
+            Key=default_storage._normalize_name(cle),
+            Range=f'bytes=0-{taille - 1}',
+        )
+        return reponse['Body'].read()
+    
+    with default_storage.open(cle, 'rb') as fichier:
+        return fichier.read(taille)
+
+
+def verifier_televersement(jeton, user, type_document):
+    """
+    Vérifier un jeton de téléversement et le fichier correspondant
+    
+    Un fichier dont le contenu ne correspond pas à son extension est
+    supprimé du stockage. L'usage unique du document est garanti par
+    l'appelant, à l'enregistrement.
+    
+    Returns:
+        La clé de stockage, à affecter au FileField
+    
+    Raises:
+        ValidationError: Jeton invalide ou expiré, fichier absent, trop
+            lourd ou d'un format différent de celui annoncé
+    """
+    try:
+        data = signing.loads(jeton, salt=SIGNING_SALT, max_age=JETON_EXPIRATION)
+    except signing.BadSignature:
+        raise ValidationError('Jeton de téléversement invalide ou expiré.')
+    
+    if data.get('user') != user.pk or data.get('type') != type_document:
+        raise ValidationError('Jeton de téléversement invalide ou expiré.')
+    
+    cle = data['cle']
+    if not default_storage.exists(cle):
+        raise ValidationError('Le fichier n\'a pas encore été reçu.')
+    
+    if default_storage.size(cle) > taille_max(type_document):
+        raise ValidationError(
+            f'La taille du fichier ne doit pas dépasser '
+            f'{TYPES_DOCUMENTS[type_document]["taille_max_mb"]}MB.'
+        )
+    
+    extension = cle.rsplit('.', 1)[-1].lower()
+    if detecter_format(io.BytesIO(lire_entete(cle))) != FORMATS_EXTENSIONS.get(extension):
+        default_storage.delete(cle)
+        raise ValidationError('Le contenu du fichier ne correspond pas à son format.')
+    
+    return cle
+
+
+class LecteurLimite(io.RawIOBase):
+    """
+    Lecture d'un flux bornée à `taille` octets, avec empreinte SHA-256
+    
+    Permet de passer le corps d'une requête à `default_storage.save()` sans
+    le charger en mémoire. Flux non repositionnable : le stockage S3 le lit
+    alors d'un bout à l'autre sans chercher à le mesurer.
+    """
+    
+    def __init__(self, flux, taille):
+        self.flux = flux
+        self.restant = taille
+        self.empreinte = hashlib.sha256()
+    
+    def readable(self):
+        return True
+    
+    def readinto(self, tampon):
+        data = self.flux.read(min(len(tampon), self.restant))
+        taille = len(data)
+        tampon[:taille] = data
+        self.restant -= taille
+        self.empreinte.update(data)
+        return taille
+
+
+class LecteurBlocs(io.RawIOBase):
+    """
+    Lecture séquentielle de plusieurs fichiers du stockage comme un seul
+    
+    Sert à assembler un téléversement par blocs sans charger le fichier
+    complet en mémoire. Seul le retour au début (seek(0)) est supporté :
+    le flux se déclare non repositionnable, pour que le stockage S3 ne
+    cherche pas à le mesurer par seek(0, 2).
+    """
+    
+    def __init__(self, storage, chemins):
+        self.storage = storage
+        self.chemins = list(chemins)
+        self.courant = None
+        self.seek(0)
+    
+    def readable(self):
+        return True
+    
+    def seek(self, offset, whence=0):
+        if offset != 0 or whence != 0:
+            raise io.UnsupportedOperation('Seul seek(0) est supporté')
+        self._fermer_courant()
+        self.restants = list(self.chemins)
+        self.empreinte = hashlib.sha256()
+        return 0
+    
+    def readinto(self, tampon):
+        while True:
+            if self.courant is None:
+                if not self.restants:
+                    return 0
+                self.courant = self.storage.open(self.restants.pop(0), 'rb')
+            
+            data = self.courant.read(len(tampon))
+            if data:
+                break
+            self._fermer_courant()
+        
+        taille = len(data)
+        tampon[:taille] = data
+        self.empreinte.update(data)
+        return taille
+    
+    def close(self):
+        self._fermer_courant()
+        super().close()
+    
+    def _fermer_courant(self):
+        if self.courant is not None:
+            self.courant.close()
+            self.courant = None
@@ -4,6 +4,8 @@ Validateurs personnalisés pour les fichiers
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 
+from .images import FORMATS_IMAGE, detecter_format
+
 
 def validate_file_size(file, max_size_mb=5):
     """
@@ -44,6 +46,12 @@ def validate_image(file):
         raise ValidationError(
             _('Le type de fichier n\'est pas valide. Utilisez une image JPG, PNG ou WEBP.')
         )
+    
+    # Vérifier le contenu réel (le MIME type est déclaré par le client)
+    if detecter_format(file) not in FORMATS_IMAGE:
+        raise ValidationError(
+            _('Le contenu du fichier n\'est pas une image JPG, PNG ou WEBP.')
+        )
 
 
 def validate_pdf(file):
@@ -68,6 +76,12 @@ def validate_pdf(file):
         raise ValidationError(
             _('Le type de fichier n\'est pas valide. Utilisez un PDF.')
         )
+    
+    # Vérifier le contenu réel (le MIME type est déclaré par le client)
+    if detecter_format(file) != 'pdf':
+        raise ValidationError(
+            _('Le contenu du fichier n\'est pas un PDF.')
+        )
 
 
 def validate_document(file):
@@ -83,4 +97,10 @@ def validate_document(file):
     if ext not in valid_extensions:
         raise ValidationError(
             _(f'Format non supporté. Utilisez: {", ".join(valid_extensions).upper()}')
+        )
+    
+    # Vérifier le contenu réel
+    if detecter_format(file) not in FORMATS_IMAGE | {'pdf'}:
+        raise ValidationError(
+            _('Le contenu du fichier n\'est pas une image ou un PDF.')
         )
\ No newline at end of file
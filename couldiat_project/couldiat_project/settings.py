@@ -34,6 +34,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third party
     'rest_framework',
@@ -45,6 +46,7 @@ INSTALLED_APPS = [
     'django_filters',
     
     # Local apps
+    'core',
     'accounts',
     'concours',
     'formation',
@@ -87,10 +89,12 @@ WSGI_APPLICATION = 'couldiat_project.wsgi.application'
 if config('DATABASE_URL', default=None):
     # Render.com ou autres plateformes qui fournissent DATABASE_URL
     DATABASES = {
+        # Pas de connexions persistantes : sous ASGI (worker uvicorn), le code
+        # synchrone de chaque requête tourne dans son propre thread, qui
+        # garderait sa connexion ouverte jusqu'à épuiser max_connections
         'default': dj_database_url.config(
             default=config('DATABASE_URL'),
-            conn_max_age=600,
-            conn_health_checks=True,
+            conn_max_age=0,
         )
     }
 else:
@@ -149,6 +153,12 @@ else:
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Normalisation des images téléversées : threads du pool (0 = synchrone)
+IMAGE_PIPELINE_WORKERS = int(config('IMAGE_PIPELINE_WORKERS', default=str(os.cpu_count() or 2)))
+
+# Diffusion des événements de la file de revue (voir core.evenements)
+EVENEMENTS_BROKER = config('EVENEMENTS_BROKER', default='core.evenements.LocalBroker')
+
 # REST FRAMEWORK Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -157,7 +167,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
     'PAGE_SIZE': 50,
     'DATETIME_FORMAT': '%Y-%m-%dT%H:%M:%SZ',
     'DATE_FORMAT': '%Y-%m-%d',
@@ -213,15 +223,27 @@ CORS_ALLOW_HEADERS = [
     'authorization',
     'content-type',
     'dnt',
+    'idempotency-key',
+    'if-none-match',
     'origin',
     'user-agent',
+    'x-checksum-sha256',
     'x-csrftoken',
     'x-requested-with',
 ]
 
+# En-têtes de réponse lisibles par le JavaScript du client
+CORS_EXPOSE_HEADERS = [
+    'etag',
+    'idempotent-replayed',
+]
+
 # ============================================================================
-# CACHE CONFIGURATION (pour les codes OTP de réinitialisation)
+# CACHE CONFIGURATION (codes OTP, catalogue des concours, QCM)
 # ============================================================================
+# LocMemCache est propre à chaque processus : suffisant avec un seul worker
+# (gunicorn.conf.py). Avec plusieurs workers, passer au cache Redis ci-dessous
+# pour que l'invalidation et les ETag soient partagés.
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
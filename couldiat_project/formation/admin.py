@@ -3,7 +3,7 @@ Configuration de l'interface admin pour Formation
 """
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Matiere, Chapitre, Question, ProgressionChapitre
+from .models import Matiere, Chapitre, Question, ProgressionChapitre, ProgressionMatiere
 
 
 @admin.register(Matiere)
@@ -141,4 +141,28 @@ class ProgressionChapitreAdmin(admin.ModelAdmin):
             color,
             obj.meilleur_score
         )
-    score_badge.short_description = 'Meilleur score'
\ No newline at end of file
+    score_badge.short_description = 'Meilleur score'
+
+
+@admin.register(ProgressionMatiere)
+class ProgressionMatiereAdmin(admin.ModelAdmin):
+    """Admin pour les résumés de progression (lecture seule, voir rebuild_progress_summaries)"""
+    
+    list_display = [
+        'user',
+        'matiere',
+        'chapitres_termines',
+        'score_moyen',
+        'temps_total',
+        'derniere_activite'
+    ]
+    list_filter = ['matiere']
+    search_fields = ['user__email', 'user__nom', 'user__prenom']
+    list_select_related = ['user', 'matiere']
+    ordering = ['matiere', '-chapitres_termines', '-somme_meilleurs_scores']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,86 @@
+"""
+Corrigé des QCM, mis en cache par chapitre
+
+Le corrigé d'un chapitre est chargé en une requête sous forme compacte :
+les id des questions triés et les bonnes réponses dans le même ordre,
+dans deux tableaux d'entiers (array). Il est partagé par le cache sous la
+version des questions du chapitre (Chapitre.version_questions, comme le
+paquet de questions, voir paquets.py) : corrigé et paquet changent
+ensemble, quel que soit le processus qui a modifié les questions.
+
+Une soumission est notée en une passe : chaque question est placée dans
+le corrigé, puis les réponses sont comparées en un seul parcours.
+"""
+import operator
+from array import array
+
+from django.core.cache import cache
+
+from .models import Question
+
+CORRIGE_TIMEOUT = 60 * 60  # 1 heure (les versions dépassées expirent d'elles-mêmes)
+
+
+class QuestionsInvalides(ValueError):
+    """Questions absentes du chapitre ou présentes plusieurs fois"""
+
+
+def cle_corrige(chapitre_id, version):
+    return f'formation:corrige:{chapitre_id}:{version}'
+
+
+class Corrige:
+    """Corrigé d'un chapitre : id des questions triés et bonnes réponses"""
+    
+    def __init__(self, ids, reponses):
+        self.ids = ids
+        self.reponses = reponses
+        self.positions = {question_id: i for i, question_id in enumerate(ids)}
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def noter(self, reponses):
+        """
+        Nombre de bonnes réponses d'une soumission
+        
+        Args:
+            reponses: Liste de {'question_id', 'reponse_index'}
+        
+        Raises:
+            QuestionsInvalides: Question hors du chapitre ou en double
+        """
+        positions = [self.positions.get(r['question_id']) for r in reponses]
+        if None in positions:
+            raise QuestionsInvalides('Certaines questions n\'appartiennent pas à ce chapitre.')
+        if len(set(positions)) != len(positions):
+            raise QuestionsInvalides('Chaque question ne peut être répondue qu\'une fois.')
+        
+        attendues = map(self.reponses.__getitem__, positions)
+        donnees = map(operator.itemgetter('reponse_index'), reponses)
+        return sum(map(operator.eq, attendues, donnees))
+
+
+def charger_corrige(chapitre_id, version):
+    """
+    Corrigé du chapitre à cette version, depuis le cache ou en une requête
+    
+    `version` doit avoir été lue avant les questions (voir paquets.py).
+    """
+    cle = cle_corrige(chapitre_id, version)
+    valeur = cache.get(cle)
+    
+    if valeur is None:
+        lignes = Question.objects.filter(chapitre_id=chapitre_id).order_by('id').values_list(
+            'id', 'correct_answer'
+        )
+        ids = array('q')
+        reponses = array('h')
+        for question_id, correct_answer in lignes:
+            ids.append(question_id)
+            reponses.append(correct_answer)
+        valeur = (ids, reponses)
+        cache.set(cle, valeur, CORRIGE_TIMEOUT)
+    
+    return Corrige(*valeur)
+
@@ -0,0 +1,17 @@
+"""
+Commande pour reconstruire les résumés de progression par matière
+Usage: python manage.py rebuild_progress_summaries
+
+À lancer après une modification des progressions hors de l'API
+(admin, import, suppression de chapitres).
+"""
+from django.core.management.base import BaseCommand
+from formation.models import ProgressionMatiere
+
+
+class Command(BaseCommand):
+    help = 'Recalculer les résumés de progression par matière depuis les progressions de chapitre'
+    
+    def handle(self, *args, **options):
+        total = ProgressionMatiere.reconstruire()
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} résumés de progression reconstruits'))
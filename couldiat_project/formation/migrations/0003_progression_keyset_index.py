@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formation', '0002_abonnement'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='progressionchapitre',
+            index=models.Index(fields=['user', '-updated_at', '-id'], name='progression_user_recent_idx'),
+        ),
+    ]
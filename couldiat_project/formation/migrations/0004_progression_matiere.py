@@ -0,0 +1,66 @@
+# Generated by Django 5.2.7 on 2026-10-17 05:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+
+
+def remplir_resumes(apps, schema_editor):
+    """Résumés initiaux depuis les progressions existantes (voir ProgressionMatiere.reconstruire)"""
+    ProgressionChapitre = apps.get_model('formation', 'ProgressionChapitre')
+    ProgressionMatiere = apps.get_model('formation', 'ProgressionMatiere')
+
+    lignes = ProgressionChapitre.objects.filter(tentatives__gt=0).values(
+        'user_id', 'chapitre__matiere_id'
+    ).annotate(
+        termines=Count('id', filter=Q(statut='termine')),
+        notes=Count('meilleur_score'),
+        somme=Sum('meilleur_score', default=0),
+        temps=Sum('temps_ecoule', default=0),
+        activite=Max('updated_at'),
+    ).order_by()
+
+    ProgressionMatiere.objects.bulk_create([
+        ProgressionMatiere(
+            user_id=ligne['user_id'],
+            matiere_id=ligne['chapitre__matiere_id'],
+            chapitres_termines=ligne['termines'],
+            chapitres_notes=ligne['notes'],
+            somme_meilleurs_scores=ligne['somme'],
+            temps_total=ligne['temps'],
+            derniere_activite=ligne['activite'],
+        )
+        for ligne in lignes
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formation', '0003_progression_keyset_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgressionMatiere',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chapitres_termines', models.PositiveIntegerField(default=0, verbose_name='chapitres terminés')),
+                ('chapitres_notes', models.PositiveIntegerField(default=0, help_text='Chapitres ayant un meilleur score', verbose_name='chapitres notés')),
+                ('somme_meilleurs_scores', models.PositiveIntegerField(default=0, verbose_name='somme des meilleurs scores')),
+                ('temps_total', models.PositiveIntegerField(default=0, help_text='Somme des temps de la dernière tentative de chaque chapitre, en secondes', verbose_name='temps total')),
+                ('derniere_activite', models.DateTimeField(blank=True, null=True, verbose_name='dernière activité')),
+                ('matiere', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progressions_utilisateurs', to='formation.matiere', verbose_name='matière')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progressions_matieres', to=settings.AUTH_USER_MODEL, verbose_name='utilisateur')),
+            ],
+            options={
+                'verbose_name': 'progression matière',
+                'verbose_name_plural': 'progressions matières',
+                'indexes': [models.Index(fields=['matiere', '-chapitres_termines', '-somme_meilleurs_scores'], name='progression_matiere_rang_idx')],
+                'unique_together': {('user', 'matiere')},
+            },
+        ),
+        migrations.RunPython(remplir_resumes, migrations.RunPython.noop),
+    ]
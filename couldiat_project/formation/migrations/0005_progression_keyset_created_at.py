@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-17 06:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formation', '0004_progression_matiere'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='progressionchapitre',
+            name='progression_user_recent_idx',
+        ),
+        migrations.AddIndex(
+            model_name='progressionchapitre',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='progression_user_recent_idx'),
+        ),
+    ]
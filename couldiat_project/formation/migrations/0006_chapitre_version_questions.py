@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 07:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formation', '0005_progression_keyset_created_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chapitre',
+            name='version_questions',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text="Incrémentée à chaque modification d'une question (voir signals.py) : version du paquet et du corrigé en cache", verbose_name='version des questions'),
+        ),
+    ]
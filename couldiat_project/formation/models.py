@@ -1,7 +1,9 @@
 """
 Modèles pour l'application Formation (QCM) avec Abonnement
 """
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from datetime import datetime, date
@@ -114,6 +116,24 @@ class Abonnement(models.Model):
         return False
 
 
+class MatiereQuerySet(models.QuerySet):
+    """QuerySet pour les matières"""
+    
+    def avec_progression(self, user):
+        """
+        Annoter le nombre de chapitres (`nb_chapitres`) et de chapitres
+        terminés par l'utilisateur (`nb_termines`), en une requête groupée
+        
+        Les chapitres terminés sont lus dans la ligne ProgressionMatiere
+        de l'utilisateur (index unique user, matiere).
+        """
+        resume = ProgressionMatiere.objects.filter(matiere=OuterRef('pk'), user=user)
+        return self.annotate(
+            nb_chapitres=Count('chapitres'),
+            nb_termines=Coalesce(Subquery(resume.values('chapitres_termines')[:1]), 0),
+        )
+
+
 class Matiere(models.Model):
     """Matières de formation (QCM)"""
     
@@ -133,6 +153,8 @@ class Matiere(models.Model):
     created_at = models.DateTimeField(_('date de création'), auto_now_add=True)
     updated_at = models.DateTimeField(_('date de modification'), auto_now=True)
     
+    objects = MatiereQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('matière')
         verbose_name_plural = _('matières')
@@ -164,6 +186,13 @@ class Chapitre(models.Model):
     numero = models.IntegerField(_('numéro'))
     titre = models.CharField(_('titre'), max_length=200)
     ordre = models.IntegerField(_('ordre'), default=0)
+    version_questions = models.PositiveIntegerField(
+        _('version des questions'),
+        default=0,
+        editable=False,
+        help_text=_("Incrémentée à chaque modification d'une question (voir signals.py) : "
+                    "version du paquet et du corrigé en cache")
+    )
     
     created_at = models.DateTimeField(_('date de création'), auto_now_add=True)
     updated_at = models.DateTimeField(_('date de modification'), auto_now=True)
@@ -287,6 +316,10 @@ class ProgressionChapitre(models.Model):
         verbose_name_plural = _('progressions chapitres')
         unique_together = ['user', 'chapitre']
         ordering = ['-updated_at']
+        indexes = [
+            # Pagination par curseur sur (created_at, id), fixe pendant le parcours
+            models.Index(fields=['user', '-created_at', '-id'], name='progression_user_recent_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.chapitre} ({self.get_statut_display()})"
@@ -296,4 +329,127 @@ class ProgressionChapitre(models.Model):
         if self.score is not None:
             if self.meilleur_score is None or self.score > self.meilleur_score:
                 self.meilleur_score = self.score
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+class ProgressionMatiere(models.Model):
+    """
+    Résumé de la progression d'un utilisateur sur une matière
+    
+    Tenu à jour dans la transaction de chaque soumission de QCM (voir
+    enregistrer_tentative) : les écrans de progression lisent une ligne au
+    lieu de compter les ProgressionChapitre. Chaque total est dérivé de
+    l'état courant des progressions de chapitre (dernier temps, meilleur
+    score), ce qui permet de tout reconstruire à l'identique avec la
+    commande rebuild_progress_summaries après une modification manuelle.
+    """
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='progressions_matieres',
+        verbose_name=_('utilisateur')
+    )
+    matiere = models.ForeignKey(
+        Matiere,
+        on_delete=models.CASCADE,
+        related_name='progressions_utilisateurs',
+        verbose_name=_('matière')
+    )
+    chapitres_termines = models.PositiveIntegerField(_('chapitres terminés'), default=0)
+    chapitres_notes = models.PositiveIntegerField(
+        _('chapitres notés'),
+        default=0,
+        help_text=_("Chapitres ayant un meilleur score")
+    )
+    somme_meilleurs_scores = models.PositiveIntegerField(_('somme des meilleurs scores'), default=0)
+    temps_total = models.PositiveIntegerField(
+        _('temps total'),
+        default=0,
+        help_text=_("Somme des temps de la dernière tentative de chaque chapitre, en secondes")
+    )
+    derniere_activite = models.DateTimeField(_('dernière activité'), null=True, blank=True)
+    
+    class Meta:
+        verbose_name = _('progression matière')
+        verbose_name_plural = _('progressions matières')
+        unique_together = ['user', 'matiere']
+        indexes = [
+            # Classements par matière
+            models.Index(
+                fields=['matiere', '-chapitres_termines', '-somme_meilleurs_scores'],
+                name='progression_matiere_rang_idx'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.get_full_name()} - {self.matiere} ({self.chapitres_termines} terminés)"
+    
+    @property
+    def score_moyen(self):
+        """Moyenne des meilleurs scores des chapitres notés"""
+        if not self.chapitres_notes:
+            return None
+        return round(self.somme_meilleurs_scores / self.chapitres_notes)
+    
+    @classmethod
+    def enregistrer_tentative(cls, progression, avant=None):
+        """
+        Répercuter une tentative sur le résumé de la matière
+        
+        Args:
+            progression: ProgressionChapitre après la tentative (déjà enregistrée)
+            avant: (statut, meilleur_score, temps_ecoule) avant la tentative,
+                None pour une nouvelle progression
+        """
+        statut, meilleur_score, temps_ecoule = avant or (None, None, None)
+        filtre = {'user_id': progression.user_id, 'matiere_id': progression.chapitre.matiere_id}
+        valeurs = {
+            'chapitres_termines': F('chapitres_termines')
+            + int(progression.statut == 'termine') - int(statut == 'termine'),
+            'chapitres_notes': F('chapitres_notes')
+            + int(progression.meilleur_score is not None) - int(meilleur_score is not None),
+            'somme_meilleurs_scores': F('somme_meilleurs_scores')
+            + (progression.meilleur_score or 0) - (meilleur_score or 0),
+            'temps_total': F('temps_total') + (progression.temps_ecoule or 0) - (temps_ecoule or 0),
+            'derniere_activite': progression.updated_at,
+        }
+        
+        with transaction.atomic():
+            if not cls.objects.filter(**filtre).update(**valeurs):
+                cls.objects.get_or_create(**filtre)
+                cls.objects.filter(**filtre).update(**valeurs)
+    
+    @classmethod
+    def reconstruire(cls):
+        """
+        Recalculer tous les résumés depuis les progressions de chapitre
+        
+        Returns:
+            Nombre de résumés écrits
+        """
+        lignes = ProgressionChapitre.objects.filter(tentatives__gt=0).values(
+            'user_id', 'chapitre__matiere_id'
+        ).annotate(
+            termines=Count('id', filter=Q(statut='termine')),
+            notes=Count('meilleur_score'),
+            somme=Sum('meilleur_score', default=0),
+            temps=Sum('temps_ecoule', default=0),
+            activite=Max('updated_at'),
+        ).order_by()
+        
+        with transaction.atomic():
+            cls.objects.all().delete()
+            resumes = cls.objects.bulk_create([
+                cls(
+                    user_id=ligne['user_id'],
+                    matiere_id=ligne['chapitre__matiere_id'],
+                    chapitres_termines=ligne['termines'],
+                    chapitres_notes=ligne['notes'],
+                    somme_meilleurs_scores=ligne['somme'],
+                    temps_total=ligne['temps'],
+                    derniere_activite=ligne['activite'],
+                )
+                for ligne in lignes
+            ], batch_size=1000)
+        
+        return len(resumes)
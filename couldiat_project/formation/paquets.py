@@ -0,0 +1,56 @@
+"""
+Paquets de questions pré-sérialisés, par chapitre
+
+Les questions d'un chapitre ne changent que lorsqu'un administrateur les
+modifie : le JSON servi aux élèves est construit une fois, compressé en
+gzip et mis en cache avec son empreinte, qui sert d'ETag.
+
+La clé du cache contient Chapitre.version_questions, incrémentée en base
+dans la transaction de chaque modification d'une question (voir
+signals.py) et lue dans la requête qui contrôle l'accès : une modification
+faite depuis un autre processus (shell, commande, autre worker) rend
+aussitôt l'ancien paquet inaccessible, et un paquet construit avec des
+données anciennes ne peut être rangé que sous une ancienne version.
+"""
+import gzip
+import hashlib
+
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+
+from .models import Question
+from .serializers import QuestionSerializer
+
+
+# Les paquets des versions dépassées expirent d'eux-mêmes
+PAQUET_TIMEOUT = 24 * 60 * 60
+
+
+def cle_paquet(chapitre_id, version):
+    return f'formation:paquet:{chapitre_id}:{version}'
+
+
+def construire_paquet(chapitre_id, version):
+    """
+    Sérialiser les questions du chapitre et mettre le paquet en cache
+    
+    `version` doit avoir été lue avant les questions : le paquet contient
+    alors les questions de cette version ou d'une plus récente.
+    
+    Returns:
+        dict {'version': empreinte du JSON, 'gzip': JSON compressé}
+    """
+    questions = Question.objects.filter(chapitre_id=chapitre_id)
+    contenu = JSONRenderer().render(QuestionSerializer(questions, many=True).data)
+    paquet = {
+        'version': hashlib.sha256(contenu).hexdigest()[:32],
+        # mtime fixe : même contenu, mêmes octets
+        'gzip': gzip.compress(contenu, mtime=0),
+    }
+    cache.set(cle_paquet(chapitre_id, version), paquet, PAQUET_TIMEOUT)
+    return paquet
+
+
+def paquet_chapitre(chapitre_id, version):
+    """Paquet du chapitre à cette version, depuis le cache ou reconstruit en une requête"""
+    return cache.get(cle_paquet(chapitre_id, version)) or construire_paquet(chapitre_id, version)
@@ -2,6 +2,7 @@
 Serializers pour l'application Formation avec Abonnement
 """
 from rest_framework import serializers
+from .corrige import QuestionsInvalides, charger_corrige
 from .models import Matiere, Chapitre, Question, ProgressionChapitre, Abonnement
 
 
@@ -58,8 +59,14 @@ class AbonnementCreateSerializer(serializers.ModelSerializer):
 
 
 class MatiereListSerializer(serializers.ModelSerializer):
-    """Serializer pour la liste des matières"""
-    nombre_chapitres = serializers.ReadOnlyField()
+    """
+    Serializer pour la liste des matières
+    
+    Lit les annotations `nb_chapitres` et `nb_termines` (voir
+    Matiere.objects.avec_progression) et le contexte `abonnement_actif`
+    lorsqu'ils sont présents, sinon interroge la base pour chaque matière.
+    """
+    nombre_chapitres = serializers.SerializerMethodField()
     progression = serializers.SerializerMethodField()
     abonnement_requis = serializers.SerializerMethodField()
     
@@ -75,8 +82,15 @@ class MatiereListSerializer(serializers.ModelSerializer):
             'abonnement_requis',
         ]
     
+    def get_nombre_chapitres(self, obj):
+        nombre = getattr(obj, 'nb_chapitres', None)
+        return obj.nombre_chapitres if nombre is None else nombre
+    
     def get_abonnement_requis(self, obj):
         """Vérifier si un abonnement est requis"""
+        if 'abonnement_actif' in self.context:
+            return not self.context['abonnement_actif']
+        
         request = self.context.get('request')
         if not request or not request.user.is_authenticated:
             return True
@@ -90,30 +104,38 @@ class MatiereListSerializer(serializers.ModelSerializer):
     
     def get_progression(self, obj):
         """Calculer la progression de l'utilisateur pour cette matière"""
-        request = self.context.get('request')
-        if not request or not request.user.is_authenticated:
-            return 0
+        total_chapitres = getattr(obj, 'nb_chapitres', None)
+        chapitres_termines = getattr(obj, 'nb_termines', None)
         
-        user = request.user
-        total_chapitres = obj.chapitres.count()
+        if total_chapitres is None or chapitres_termines is None:
+            request = self.context.get('request')
+            if not request or not request.user.is_authenticated:
+                return 0
+            
+            total_chapitres = obj.chapitres.count()
+            chapitres_termines = ProgressionChapitre.objects.filter(
+                user=request.user,
+                chapitre__matiere=obj,
+                statut='termine'
+            ).count()
         
         if total_chapitres == 0:
             return 0
         
-        chapitres_termines = ProgressionChapitre.objects.filter(
-            user=user,
-            chapitre__matiere=obj,
-            statut='termine'
-        ).count()
-        
         return int((chapitres_termines / total_chapitres) * 100)
 
 
 class ChapitreListSerializer(serializers.ModelSerializer):
-    """Serializer pour la liste des chapitres"""
+    """
+    Serializer pour la liste des chapitres
+    
+    Contexte optionnel `progressions` : {chapitre_id: (statut, meilleur_score)}
+    pour l'utilisateur, chargé en une requête par la vue. Le nombre de
+    questions est lu dans l'annotation `nb_questions` si elle est présente.
+    """
     statut = serializers.SerializerMethodField()
     score = serializers.SerializerMethodField()
-    nombre_questions = serializers.ReadOnlyField()
+    nombre_questions = serializers.SerializerMethodField()
     
     class Meta:
         model = Chapitre
@@ -126,35 +148,34 @@ class ChapitreListSerializer(serializers.ModelSerializer):
             'nombre_questions',
         ]
     
-    def get_statut(self, obj):
-        """Récupérer le statut du chapitre pour l'utilisateur"""
+    def _progression(self, obj):
+        """(statut, meilleur_score) de l'utilisateur sur le chapitre, ou None"""
+        progressions = self.context.get('progressions')
+        if progressions is not None:
+            return progressions.get(obj.id)
+        
         request = self.context.get('request')
         if not request or not request.user.is_authenticated:
-            return 'verrouille'
+            return None
         
-        try:
-            progression = ProgressionChapitre.objects.get(
-                user=request.user,
-                chapitre=obj
-            )
-            return progression.statut
-        except ProgressionChapitre.DoesNotExist:
-            return 'verrouille'
+        return ProgressionChapitre.objects.filter(
+            user=request.user,
+            chapitre=obj
+        ).values_list('statut', 'meilleur_score').first()
+    
+    def get_statut(self, obj):
+        """Récupérer le statut du chapitre pour l'utilisateur"""
+        progression = self._progression(obj)
+        return progression[0] if progression else 'verrouille'
     
     def get_score(self, obj):
         """Récupérer le score du chapitre pour l'utilisateur"""
-        request = self.context.get('request')
-        if not request or not request.user.is_authenticated:
-            return None
-        
-        try:
-            progression = ProgressionChapitre.objects.get(
-                user=request.user,
-                chapitre=obj
-            )
-            return progression.meilleur_score
-        except ProgressionChapitre.DoesNotExist:
-            return None
+        progression = self._progression(obj)
+        return progression[1] if progression else None
+    
+    def get_nombre_questions(self, obj):
+        nombre = getattr(obj, 'nb_questions', None)
+        return obj.nombre_questions if nombre is None else nombre
 
 
 class QuestionSerializer(serializers.ModelSerializer):
@@ -200,25 +221,28 @@ class SubmitQCMSerializer(serializers.Serializer):
         min_length=1
     )
     
-    def validate_chapitre_id(self, value):
-        """Valider que le chapitre existe"""
-        try:
-            chapitre = Chapitre.objects.get(id=value)
-        except Chapitre.DoesNotExist:
-            raise serializers.ValidationError("Ce chapitre n'existe pas.")
-        return value
-    
-    def validate_reponses(self, value):
-        """Valider que toutes les questions existent"""
-        question_ids = [r['question_id'] for r in value]
-        existing_questions = Question.objects.filter(id__in=question_ids).count()
+    def validate(self, attrs):
+        """
+        Valider le chapitre et noter la soumission avec le corrigé en cache
         
-        if existing_questions != len(question_ids):
-            raise serializers.ValidationError(
-                "Certaines questions n'existent pas."
+        Ajoute `chapitre` et `bonnes_reponses` aux données validées.
+        """
+        chapitre = Chapitre.objects.filter(id=attrs['chapitre_id']).first()
+        if chapitre is None:
+            raise serializers.ValidationError({
+                'chapitre_id': "Ce chapitre n'existe pas."
+            })
+        
+        try:
+            bonnes_reponses = charger_corrige(chapitre.id, chapitre.version_questions).noter(
+                attrs['reponses']
             )
+        except QuestionsInvalides as e:
+            raise serializers.ValidationError({'reponses': str(e)})
         
-        return value
+        attrs['chapitre'] = chapitre
+        attrs['bonnes_reponses'] = bonnes_reponses
+        return attrs
 
 
 class ProgressionChapitreSerializer(serializers.ModelSerializer):
@@ -0,0 +1,47 @@
+"""
+Signaux pour l'application Formation
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .models import Chapitre, Question
+from .paquets import cle_paquet, construire_paquet
+
+
+@receiver(post_init, sender=Question)
+def memoriser_chapitre(sender, instance, **kwargs):
+    """Chapitre chargé, pour mettre à jour aussi l'ancien chapitre en cas de déplacement"""
+    instance._chapitre_initial = instance.__dict__.get('chapitre_id')
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def question_modifiee(sender, instance, **kwargs):
+    """
+    Changer la version des chapitres concernés, dans la transaction de la
+    modification, puis reconstruire leur paquet après le commit
+    
+    Les modifications en masse (bulk_create, update) ne passent pas par ce
+    signal : elles doivent incrémenter Chapitre.version_questions.
+    """
+    chapitres = {instance.chapitre_id, instance._chapitre_initial} - {None}
+    Chapitre.objects.filter(pk__in=chapitres).update(version_questions=F('version_questions') + 1)
+    
+    def reconstruire():
+        versions = Chapitre.objects.filter(pk__in=chapitres).values_list('pk', 'version_questions')
+        for chapitre_id, version in versions:
+            construire_paquet(chapitre_id, version)
+    
+    transaction.on_commit(reconstruire)
+    instance._chapitre_initial = instance.chapitre_id
+
+
+@receiver(post_delete, sender=Chapitre)
+def supprimer_paquet_chapitre(sender, instance, **kwargs):
+    """Retirer du cache le paquet d'un chapitre supprimé"""
+    # La clé est calculée tout de suite : Django remet pk à None après la suppression
+    cle = cle_paquet(instance.pk, instance.version_questions)
+    transaction.on_commit(lambda: cache.delete(cle))
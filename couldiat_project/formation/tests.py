@@ -1,3 +1,450 @@
-from django.test import TestCase
+"""
+Tests pour l'application Formation
+"""
+import gzip
+import json
+from datetime import date
+from io import StringIO
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from .models import Abonnement, Chapitre, Matiere, ProgressionChapitre, ProgressionMatiere, Question
+from .serializers import QuestionSerializer
+
+
+def creer_abonne(email='eleve@example.com'):
+    user = User.objects.create_user(
+        email=email,
+        password='motdepasse123',
+        nom='Kabore',
+        prenom='Issa',
+    )
+    Abonnement.objects.create(user=user, date_debut=date.today(), montant_paye=10000)
+    return user
+
+
+def creer_chapitre(matiere, numero, nombre_questions):
+    chapitre = Chapitre.objects.create(
+        matiere=matiere, numero=numero, titre=f'Chapitre {numero}', ordre=numero
+    )
+    Question.objects.bulk_create([
+        Question(
+            chapitre=chapitre,
+            question=f'Question {i}',
+            options=['A', 'B', 'C', 'D'],
+            correct_answer=i % 4,
+            ordre=i,
+        )
+        for i in range(nombre_questions)
+    ])
+    return chapitre
+
+
+class SubmitQCMTests(APITestCase):
+    """Notation avec le corrigé en cache, en un nombre constant de requêtes"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = creer_abonne()
+        self.client.force_authenticate(self.user)
+        self.matiere = Matiere.objects.create(nom='Mathématiques', icon='📘', color='#6366F1')
+        self.chapitre = creer_chapitre(self.matiere, 1, 40)
+        self.url = reverse('formation:submit_qcm')
+
+    def _soumettre(self, chapitre, reponses):
+        return self.client.post(self.url, {
+            'chapitre_id': chapitre.pk,
+            'temps_ecoule': 120,
+            'reponses': reponses,
+        }, format='json')
+
+    def _reponses(self, chapitre, justes):
+        """Réponses aux questions du chapitre, les `justes` premières correctes"""
+        return [
+            {
+                'question_id': question.pk,
+                'reponse_index': question.correct_answer if i < justes else (question.correct_answer + 1) % 4,
+            }
+            for i, question in enumerate(chapitre.questions.order_by('id'))
+        ]
+
+    def test_score(self):
+        response = self._soumettre(self.chapitre, self._reponses(self.chapitre, 30))
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['bonnes_reponses'], 30)
+        self.assertEqual(response.data['total_questions'], 40)
+        self.assertEqual(response.data['score'], 75)
+
+    def test_requetes_independantes_du_nombre_de_reponses(self):
+        creer_chapitre(self.matiere, 2, 3)
+        reponses = self._reponses(self.chapitre, 40)
+        mesures = []
+
+        # Même parcours pour chaque élève : première tentative, chapitre suivant débloqué
+        for i, nombre in enumerate([40, 3, 40]):
+            self.client.force_authenticate(creer_abonne(f'eleve{i}@example.com'))
+            with CaptureQueriesContext(connection) as requetes:
+                response = self._soumettre(self.chapitre, reponses[:nombre])
+            self.assertEqual(response.status_code, 200, response.data)
+            mesures.append(len(requetes))
+
+        # Seule la première soumission charge le corrigé
+        self.assertEqual(mesures[0], mesures[2] + 1)
+        self.assertEqual(mesures[1], mesures[2])
+
+    def test_question_d_un_autre_chapitre(self):
+        autre = creer_chapitre(self.matiere, 2, 1)
+        reponses = self._reponses(self.chapitre, 40)
+        reponses[0]['question_id'] = autre.questions.get().pk
+
+        response = self._soumettre(self.chapitre, reponses)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('reponses', response.data)
+
+    def test_question_en_double(self):
+        reponses = self._reponses(self.chapitre, 40)
+        reponses.append(reponses[0])
+
+        response = self._soumettre(self.chapitre, reponses)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('reponses', response.data)
+
+    def test_chapitre_inexistant(self):
+        response = self.client.post(self.url, {
+            'chapitre_id': 0,
+            'temps_ecoule': 10,
+            'reponses': [{'question_id': 1, 'reponse_index': 0}],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('chapitre_id', response.data)
+
+    def test_corrige_invalide_a_la_modification(self):
+        reponses = self._reponses(self.chapitre, 40)
+        self._soumettre(self.chapitre, reponses)
+
+        question = Question.objects.get(pk=reponses[0]['question_id'])
+        question.correct_answer = (question.correct_answer + 1) % 4
+        with self.captureOnCommitCallbacks(execute=True):
+            question.save()
+
+        response = self._soumettre(self.chapitre, reponses)
+        self.assertEqual(response.data['bonnes_reponses'], 39)
+
+    def test_corrige_modifie_par_un_autre_processus(self):
+        reponses = self._reponses(self.chapitre, 40)
+        self._soumettre(self.chapitre, reponses)
+
+        # Les on_commit de ce processus ne sont pas exécutés : seule la base change
+        question = Question.objects.get(pk=reponses[0]['question_id'])
+        question.correct_answer = (question.correct_answer + 1) % 4
+        with self.captureOnCommitCallbacks():
+            question.save()
+
+        response = self._soumettre(self.chapitre, reponses)
+        self.assertEqual(response.data['bonnes_reponses'], 39)
+
+    def test_corrige_invalide_au_deplacement(self):
+        autre = creer_chapitre(self.matiere, 2, 1)
+        reponses = self._reponses(self.chapitre, 40)
+        self._soumettre(self.chapitre, reponses)
+
+        question = Question.objects.get(pk=reponses[0]['question_id'])
+        question.chapitre = autre
+        with self.captureOnCommitCallbacks(execute=True):
+            question.save()
+
+        response = self._soumettre(self.chapitre, reponses)
+        self.assertEqual(response.status_code, 400)
+
+
+class QuestionsChapitreTests(APITestCase):
+    """Paquet de questions pré-sérialisé, servi depuis le cache avec ETag"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = creer_abonne()
+        self.matiere = Matiere.objects.create(nom='Mathématiques', icon='📘', color='#6366F1')
+        self.chapitre = creer_chapitre(self.matiere, 1, 20)
+        ProgressionChapitre.objects.create(user=self.user, chapitre=self.chapitre, statut='en_cours')
+        self.url = reverse('formation:questions_chapitre', args=[self.chapitre.pk])
+        self.attendu = json.loads(json.dumps(
+            QuestionSerializer(self.chapitre.questions.all(), many=True).data
+        ))
+
+    def _get(self, user=None, **headers):
+        # Nouvelle instance : l'abonnement n'est pas déjà en mémoire
+        self.client.force_authenticate(user or User.objects.get(pk=self.user.pk))
+        return self.client.get(self.url, headers=headers)
+
+    def test_paquet_gzip(self):
+        response = self._get(accept_encoding='gzip, deflate')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(response.content)), self.attendu)
+
+    def test_paquet_non_compresse(self):
+        response = self._get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.json(), self.attendu)
+
+    def test_requetes_et_etag(self):
+        etag = self._get()['ETag']
+
+        user = User.objects.get(pk=self.user.pk)
+
+        # Abonnement et progression : le paquet vient du cache
+        with self.assertNumQueries(2):
+            response = self._get(user, if_none_match=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_reconstruit_a_la_modification(self):
+        etag = self._get()['ETag']
+
+        question = self.chapitre.questions.first()
+        question.question = 'Question modifiée'
+        with self.captureOnCommitCallbacks(execute=True):
+            question.save()
+
+        response = self._get(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()[0]['question'], 'Question modifiée')
+
+    def test_paquet_modifie_par_un_autre_processus(self):
+        etag = self._get()['ETag']
+
+        # Modification depuis un autre processus : aucun on_commit exécuté ici
+        question = self.chapitre.questions.first()
+        question.question = 'Question modifiée'
+        with self.captureOnCommitCallbacks():
+            question.save()
+
+        response = self._get(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['question'], 'Question modifiée')
+
+    def test_acces(self):
+        verrouille = creer_chapitre(self.matiere, 2, 1)
+        ProgressionChapitre.objects.create(user=self.user, chapitre=verrouille, statut='verrouille')
+        indisponible = creer_chapitre(self.matiere, 3, 1)
+        self.client.force_authenticate(self.user)
+
+        for chapitre_id, statut in [(verrouille.pk, 403), (indisponible.pk, 403), (0, 404)]:
+            response = self.client.get(reverse('formation:questions_chapitre', args=[chapitre_id]))
+            self.assertEqual(response.status_code, statut)
+
+
+class ChapitresMatiereTests(APITestCase):
+    """Liste des chapitres : progressions en une requête, nombre de questions annoté"""
+
+    def setUp(self):
+        self.user = creer_abonne()
+        self.matiere = Matiere.objects.create(nom='Mathématiques', icon='📘', color='#6366F1')
+        # Créés dans le désordre : la liste doit suivre `ordre`
+        self.chapitres = Chapitre.objects.bulk_create([
+            Chapitre(matiere=self.matiere, numero=i, titre=f'Chapitre {i}', ordre=i)
+            for i in range(100, 0, -1)
+        ])[::-1]
+        Question.objects.bulk_create([
+            Question(chapitre=chapitre, question='Q', options=['A', 'B', 'C', 'D'], correct_answer=0)
+            for i, chapitre in enumerate(self.chapitres)
+            for _ in range(i % 3)
+        ])
+        self.url = reverse('formation:chapitres_matiere', args=[self.matiere.pk])
+
+    def test_budget_de_requetes(self):
+        ProgressionChapitre.objects.create(
+            user=self.user, chapitre=self.chapitres[0], statut='termine', score=80
+        )
+        ProgressionChapitre.objects.create(user=self.user, chapitre=self.chapitres[1], statut='en_cours')
+        self.client.force_authenticate(User.objects.get(pk=self.user.pk))
+
+        # Abonnement, matière, chapitres annotés, progressions
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        chapitres = response.data['chapitres']
+        self.assertEqual(len(chapitres), 100)
+        self.assertEqual([c['numero'] for c in chapitres], list(range(1, 101)))
+        self.assertEqual([c['statut'] for c in chapitres[:3]], ['termine', 'en_cours', 'verrouille'])
+        self.assertEqual([c['score'] for c in chapitres[:3]], [80, None, None])
+        self.assertEqual([c['nombre_questions'] for c in chapitres[:4]], [0, 1, 2, 0])
+
+    def test_premier_chapitre_debloque(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.data['chapitres'][0]['statut'], 'en_cours')
+        self.assertTrue(
+            ProgressionChapitre.objects.filter(user=self.user, chapitre=self.chapitres[0]).exists()
+        )
+
+
+class ListeMatieresTests(APITestCase):
+    """Accueil de la formation : agrégation groupée, abonnement lu une fois"""
+
+    def setUp(self):
+        self.user = creer_abonne()
+        # Créées dans le désordre : la liste doit suivre `ordre`
+        self.matieres = Matiere.objects.bulk_create([
+            Matiere(nom=f'Matière {i:02d}', icon='📘', color='#6366F1', ordre=i)
+            for i in range(29, -1, -1)
+        ])[::-1]
+        self.chapitres = Chapitre.objects.bulk_create([
+            Chapitre(matiere=matiere, numero=n, titre=f'Chapitre {n}', ordre=n)
+            for matiere in self.matieres
+            for n in range(4)
+        ])
+        # Progressions d'un autre élève : ne doivent pas être comptées
+        autre = creer_abonne('autre@example.com')
+        ProgressionChapitre.objects.bulk_create([
+            ProgressionChapitre(user=autre, chapitre=chapitre, statut='termine', tentatives=1)
+            for chapitre in self.chapitres
+        ])
+        self.url = reverse('formation:liste_matieres')
+
+    def test_budget_de_requetes(self):
+        ProgressionChapitre.objects.bulk_create([
+            ProgressionChapitre(user=self.user, chapitre=self.chapitres[0], statut='termine', tentatives=1),
+            ProgressionChapitre(user=self.user, chapitre=self.chapitres[1], statut='en_cours'),
+        ])
+        ProgressionMatiere.reconstruire()
+        self.client.force_authenticate(User.objects.get(pk=self.user.pk))
+
+        # Abonnement, matières agrégées avec le résumé de l'utilisateur
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+
+        matieres = response.data['matieres']
+        self.assertEqual([m['id'] for m in matieres], [m.pk for m in self.matieres])
+        self.assertEqual(matieres[0]['nombre_chapitres'], 4)
+        self.assertEqual([m['progression'] for m in matieres[:2]], [25, 0])
+        self.assertFalse(matieres[0]['abonnement_requis'])
+
+    def test_sans_abonnement(self):
+        user = User.objects.create_user(
+            email='visiteur@example.com', password='motdepasse123', nom='Sawadogo', prenom='Ali'
+        )
+        self.client.force_authenticate(user)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+
+        self.assertFalse(response.data['abonnement_actif'])
+        self.assertTrue(all(m['abonnement_requis'] for m in response.data['matieres']))
+
+
+class ProgressionMatiereTests(APITestCase):
+    """Résumé par matière tenu à jour à chaque soumission, reconstructible"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = creer_abonne()
+        self.client.force_authenticate(self.user)
+        self.matiere = Matiere.objects.create(nom='Mathématiques', icon='📘', color='#6366F1')
+        self.chapitres = [creer_chapitre(self.matiere, n, 4) for n in range(1, 4)]
+
+    def _soumettre(self, chapitre, justes, temps):
+        questions = list(chapitre.questions.order_by('id'))
+        response = self.client.post(reverse('formation:submit_qcm'), {
+            'chapitre_id': chapitre.pk,
+            'temps_ecoule': temps,
+            'reponses': [
+                {
+                    'question_id': q.pk,
+                    'reponse_index': q.correct_answer if i < justes else (q.correct_answer + 1) % 4,
+                }
+                for i, q in enumerate(questions)
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+
+    def _resume(self):
+        resume = ProgressionMatiere.objects.get(user=self.user, matiere=self.matiere)
+        return (
+            resume.chapitres_termines,
+            resume.chapitres_notes,
+            resume.somme_meilleurs_scores,
+            resume.temps_total,
+            resume.derniere_activite,
+        )
+
+    def test_mise_a_jour_incrementale(self):
+        self._soumettre(self.chapitres[0], 2, 60)
+        self._soumettre(self.chapitres[1], 4, 30)
+        # Nouvelle tentative moins bonne : le meilleur score reste, le temps est remplacé
+        self._soumettre(self.chapitres[0], 1, 90)
+
+        resume = ProgressionMatiere.objects.get(user=self.user, matiere=self.matiere)
+        self.assertEqual(resume.chapitres_termines, 2)
+        self.assertEqual(resume.somme_meilleurs_scores, 150)
+        self.assertEqual(resume.score_moyen, 75)
+        self.assertEqual(resume.temps_total, 120)
+
+        # Le chapitre 3, débloqué mais non soumis, ne compte pas
+        incremental = self._resume()
+        ProgressionMatiere.reconstruire()
+        self.assertEqual(self._resume(), incremental)
+
+    def test_progression_de_l_accueil(self):
+        self._soumettre(self.chapitres[0], 4, 60)
+
+        response = self.client.get(reverse('formation:liste_matieres'))
+
+        self.assertEqual(response.data['matieres'][0]['progression'], 33)
+
+    def test_commande_de_reconstruction(self):
+        self._soumettre(self.chapitres[0], 4, 60)
+        ProgressionMatiere.objects.update(chapitres_termines=0, somme_meilleurs_scores=0)
+
+        sortie = StringIO()
+        call_command('rebuild_progress_summaries', stdout=sortie)
+
+        self.assertIn('1 résumés', sortie.getvalue())
+        self.assertEqual(self._resume()[:3], (1, 1, 100))
+
+
+class MaProgressionTests(APITestCase):
+    """Pagination de la progression, stable quand une tentative la modifie"""
+
+    def setUp(self):
+        self.user = creer_abonne()
+        self.client.force_authenticate(self.user)
+        matiere = Matiere.objects.create(nom='Mathématiques', icon='📘', color='#6366F1')
+        self.progressions = [
+            ProgressionChapitre.objects.create(
+                user=self.user,
+                chapitre=Chapitre.objects.create(matiere=matiere, numero=i, titre=f'Chapitre {i}', ordre=i),
+            )
+            for i in range(1, 6)
+        ]
+
+    def test_tentative_pendant_le_parcours(self):
+        url = reverse('formation:ma_progression') + '?page_size=2'
+        ids = []
+        while url:
+            response = self.client.get(url)
+            ids += [item['id'] for item in response.data['results']]
+            url = response.data['next']
+            if len(ids) == 2:
+                # Tentative sur un chapitre pas encore parcouru
+                self.progressions[0].score = 60
+                self.progressions[0].save()
+
+        self.assertEqual(ids, [progression.pk for progression in reversed(self.progressions)])
@@ -1,15 +1,22 @@
 """
 Views pour l'application Formation avec gestion d'abonnement
 """
+import gzip
+
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db import transaction
+from django.db.models import Count
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
-from .models import Matiere, Chapitre, Question, ProgressionChapitre, Abonnement
+from core.pagination import KeysetPagination
+from .models import Matiere, Chapitre, ProgressionChapitre, ProgressionMatiere, Abonnement
+from .paquets import paquet_chapitre
 from .serializers import (
     MatiereListSerializer,
     ChapitreListSerializer,
@@ -34,7 +41,7 @@ def verifier_abonnement(user):
             return False, abonnement, f"Votre abonnement a expiré le {abonnement.date_fin}. Veuillez renouveler."
         
         return True, abonnement, None
-        
+    
     except Abonnement.DoesNotExist:
         return False, None, "Vous devez souscrire à un abonnement pour accéder à la formation."
 
@@ -113,11 +120,13 @@ def liste_matieres(request):
     # Vérifier l'abonnement
     est_actif, abonnement, message = verifier_abonnement(request.user)
     
-    matieres = Matiere.objects.all()
+    # Nombre de chapitres et chapitres terminés par matière : une requête
+    # (Meta.ordering n'est pas appliqué aux requêtes groupées)
+    matieres = Matiere.objects.avec_progression(request.user).order_by('ordre', 'nom')
     serializer = MatiereListSerializer(
         matieres,
         many=True,
-        context={'request': request}
+        context={'request': request, 'abonnement_actif': est_actif}
     )
     
     response_data = {
@@ -171,21 +180,33 @@ def chapitres_matiere(request, matiere_id):
             'error': 'Matière non trouvée'
         }, status=status.HTTP_404_NOT_FOUND)
     
-    chapitres = matiere.chapitres.all()
+    # Meta.ordering n'est pas appliqué aux requêtes groupées
+    chapitres = list(
+        matiere.chapitres.annotate(nb_questions=Count('questions')).order_by('ordre', 'numero')
+    )
+    
+    # Progressions de l'utilisateur sur la matière, en une requête
+    progressions = {
+        chapitre_id: (statut, meilleur_score)
+        for chapitre_id, statut, meilleur_score in ProgressionChapitre.objects.filter(
+            user=request.user,
+            chapitre__matiere_id=matiere.id
+        ).values_list('chapitre_id', 'statut', 'meilleur_score')
+    }
     
     # Initialiser la progression pour le premier chapitre si nécessaire
-    if chapitres.exists():
-        premier_chapitre = chapitres.first()
-        ProgressionChapitre.objects.get_or_create(
+    if chapitres and chapitres[0].id not in progressions:
+        progression, _ = ProgressionChapitre.objects.get_or_create(
             user=request.user,
-            chapitre=premier_chapitre,
+            chapitre=chapitres[0],
             defaults={'statut': 'en_cours'}
         )
+        progressions[chapitres[0].id] = (progression.statut, progression.meilleur_score)
     
     serializer = ChapitreListSerializer(
         chapitres,
         many=True,
-        context={'request': request}
+        context={'request': request, 'progressions': progressions}
     )
     
     return Response({
@@ -208,6 +229,11 @@ def questions_chapitre(request, chapitre_id):
     """
     Liste des questions d'un chapitre (SANS les réponses correctes)
     Nécessite un abonnement actif
+    
+    Le JSON est servi depuis le paquet en cache du chapitre (compressé en
+    gzip si le client l'accepte). L'ETag est la version du contenu : les
+    requêtes conditionnelles (If-None-Match) reçoivent un 304 après les
+    contrôles d'accès.
     """
     # Vérifier l'abonnement
     est_actif, abonnement, message = verifier_abonnement(request.user)
@@ -218,33 +244,45 @@ def questions_chapitre(request, chapitre_id):
             'abonnement_requis': True
         }, status=status.HTTP_403_FORBIDDEN)
     
-    try:
-        chapitre = Chapitre.objects.get(id=chapitre_id)
-    except Chapitre.DoesNotExist:
-        return Response({
-            'error': 'Chapitre non trouvé'
-        }, status=status.HTTP_404_NOT_FOUND)
+    # Vérifier que le chapitre est accessible (en_cours ou termine) : une requête
+    # avec la version des questions (clé du paquet en cache)
+    progression = ProgressionChapitre.objects.filter(
+        user=request.user,
+        chapitre_id=chapitre_id
+    ).values_list('statut', 'chapitre__version_questions').first()
     
-    # Vérifier que le chapitre est accessible (en_cours ou termine)
-    try:
-        progression = ProgressionChapitre.objects.get(
-            user=request.user,
-            chapitre=chapitre
-        )
-        
-        if progression.statut == 'verrouille':
+    if progression is None:
+        if not Chapitre.objects.filter(id=chapitre_id).exists():
             return Response({
-                'error': 'Ce chapitre est verrouillé. Complétez le chapitre précédent.'
-            }, status=status.HTTP_403_FORBIDDEN)
-    except ProgressionChapitre.DoesNotExist:
+                'error': 'Chapitre non trouvé'
+            }, status=status.HTTP_404_NOT_FOUND)
         return Response({
             'error': 'Ce chapitre n\'est pas encore disponible.'
         }, status=status.HTTP_403_FORBIDDEN)
     
-    questions = chapitre.questions.all()
-    serializer = QuestionSerializer(questions, many=True)
+    statut_progression, version = progression
+    if statut_progression == 'verrouille':
+        return Response({
+            'error': 'Ce chapitre est verrouillé. Complétez le chapitre précédent.'
+        }, status=status.HTTP_403_FORBIDDEN)
+    
+    # Paquet pré-sérialisé et compressé, versionné par son contenu
+    paquet = paquet_chapitre(chapitre_id, version)
+    # ETag faible : les versions gzip et non compressée ont le même contenu
+    etag = f'W/"{paquet["version"]}"'
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache', 'Vary': 'Accept-Encoding'}
     
-    return Response(serializer.data)
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        return HttpResponseNotModified(headers=headers)
+    
+    if 'gzip' in request.headers.get('Accept-Encoding', ''):
+        return HttpResponse(
+            paquet['gzip'],
+            content_type='application/json',
+            headers={**headers, 'Content-Encoding': 'gzip'}
+        )
+    
+    return HttpResponse(gzip.decompress(paquet['gzip']), content_type='application/json', headers=headers)
 
 
 @swagger_auto_schema(
@@ -277,29 +315,16 @@ def submit_qcm(request):
     if not serializer.is_valid():
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    chapitre_id = serializer.validated_data['chapitre_id']
+    # Chapitre et nombre de bonnes réponses (corrigé en cache), voir SubmitQCMSerializer
+    chapitre = serializer.validated_data['chapitre']
     temps_ecoule = serializer.validated_data['temps_ecoule']
-    reponses = serializer.validated_data['reponses']
-    
-    # Récupérer le chapitre
-    chapitre = Chapitre.objects.get(id=chapitre_id)
-    
-    # Calculer le score
-    total_questions = len(reponses)
-    bonnes_reponses = 0
-    
-    for reponse in reponses:
-        try:
-            question = Question.objects.get(id=reponse['question_id'])
-            if question.correct_answer == reponse['reponse_index']:
-                bonnes_reponses += 1
-        except Question.DoesNotExist:
-            continue
+    bonnes_reponses = serializer.validated_data['bonnes_reponses']
+    total_questions = len(serializer.validated_data['reponses'])
     
     score = int((bonnes_reponses / total_questions) * 100) if total_questions > 0 else 0
     
-    # Mettre à jour la progression
-    progression, created = ProgressionChapitre.objects.get_or_create(
+    # Mettre à jour la progression (verrouillée : le résumé dépend de l'état précédent)
+    progression, created = ProgressionChapitre.objects.select_for_update().get_or_create(
         user=request.user,
         chapitre=chapitre,
         defaults={
@@ -309,18 +334,23 @@ def submit_qcm(request):
             'tentatives': 1
         }
     )
+    avant = None
     
     if not created:
+        avant = (progression.statut, progression.meilleur_score, progression.temps_ecoule)
         progression.statut = 'termine'
         progression.score = score
         progression.temps_ecoule = temps_ecoule
         progression.tentatives += 1
         progression.save()
     
+    # Résumé de la matière, dans la même transaction
+    ProgressionMatiere.enregistrer_tentative(progression, avant)
+    
     # Débloquer le chapitre suivant
     chapitre_suivant = None
     chapitre_suivant_obj = Chapitre.objects.filter(
-        matiere=chapitre.matiere,
+        matiere_id=chapitre.matiere_id,
         ordre=chapitre.ordre + 1
     ).first()
     
@@ -355,11 +385,19 @@ def submit_qcm(request):
 def ma_progression(request):
     """
     Récupérer toute la progression de l'utilisateur
+    
+    Triée par date de début : contrairement à updated_at, modifiée à chaque
+    tentative, elle ne change pas pendant le parcours des pages.
+    
+    Query Parameters:
+    - cursor, page_size, count: Pagination par curseur (voir KeysetPagination)
     """
     progressions = ProgressionChapitre.objects.filter(
         user=request.user
-    ).select_related('chapitre', 'chapitre__matiere')
+    ).select_related('chapitre', 'chapitre__matiere').order_by('-created_at', '-id')
     
-    serializer = ProgressionChapitreSerializer(progressions, many=True)
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(progressions, request)
+    serializer = ProgressionChapitreSerializer(page, many=True)
     
-    return Response(serializer.data)
\ No newline at end of file
+    return paginator.get_paginated_response(serializer.data)
\ No newline at end of file
@@ -1,3 +1,5 @@
+# Worker ASGI : le flux de la file de revue (SSE) n'occupe pas de thread,
+# les vues synchrones sont exécutées dans le pool de threads de Django
+worker_class = 'uvicorn_worker.UvicornWorker'
 workers = 1
-threads = 2
 timeout = 120